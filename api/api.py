@@ -1,10 +1,862 @@
+import contextlib
+import contextvars
+import functools
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 import requests
+from urllib3.exceptions import ProtocolError, ReadTimeoutError, SSLError
 import settings
 from util import green_text, yellow_text, red_text, blue_text
+from .cache import DiskCache, MemoryCache, cache_key
+from .compression import DecodedStream, accept_encoding
+from .jsonstream import JsonArrayStream
+from .tracing import annotate, bind_context, span
+from .transport import mount_transport
 
-class Api():
+class ApiError(Exception):
+    """
+    Raised when an API call cannot return its error response to the caller directly,
+    for example while a generator is yielding paginated items.
+
+    Attributes:
+        response (dict): The error dictionary returned by `process_response`.
+    """
+
+    def __init__(self, response):
+        super().__init__(f"API error {response.get('error')}")
+        self.response = response
+
+def with_query(url, params):
+    """
+    Returns the URL with the given query parameters added or replaced.
+
+    Args:
+        url (str): A relative or absolute URL that may already have a query string.
+        params (dict): Query parameters to set.
+
+    Returns:
+        str: The URL with the merged query string.
+    """
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query.update(params)
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+class DeadlineExceeded(requests.Timeout):
+    """
+    Raised when a request cannot complete within the time left on the current `deadline`.
+
+    It subclasses `requests.Timeout`, so callers that already handle request timeouts handle it too.
+    """
+
+current_deadline = contextvars.ContextVar('current_deadline', default=None)
+
+@contextlib.contextmanager
+def deadline(seconds):
+    """
+    Limits the total time of the API calls made inside the block, including retries and
+    rate-limit waits. Each request's timeouts are clipped to the time remaining, and a call
+    that starts or would wait past the deadline raises `DeadlineExceeded`.
+
+    Deadlines nest; an inner block can only shorten the budget. They follow the calling
+    context into `Api.batch` workers and asyncio tasks.
+
+    Args:
+        seconds (float): The time budget of the block.
+
+    Example:
+        >>> with deadline(60):
+        ...     data = api.api_post('instances', body)
+        ...     api.api_get(f"instances/{data['instance']['id']}")
+    """
+    expires = time.monotonic() + seconds
+    outer = current_deadline.get()
+    token = current_deadline.set(expires if outer is None else min(outer, expires))
+    try:
+        yield
+    finally:
+        current_deadline.reset(token)
+
+current_quiet = contextvars.ContextVar('current_quiet', default=False)
+
+@contextlib.contextmanager
+def quiet(enabled=True):
+    """
+    Suppresses the response summaries and retry messages of the API calls made inside the
+    block, e.g. for background refreshes that must not print into the interactive menu.
+
+    Args:
+        enabled (bool, optional): Set to False to leave output as configured.
+    """
+    token = current_quiet.set(enabled or current_quiet.get())
+    try:
+        yield
+    finally:
+        current_quiet.reset(token)
+
+def remaining_time():
+    """
+    Returns the seconds left on the current deadline, or None if no deadline is set.
+    """
+    expires = current_deadline.get()
+    if expires is None:
+        return None
+    return expires - time.monotonic()
+
+def check_deadline(wait=0.0):
+    """
+    Raises `DeadlineExceeded` if the current deadline would pass within `wait` seconds.
+    """
+    remaining = remaining_time()
+    if remaining is not None and remaining <= wait:
+        if wait > 0:
+            raise DeadlineExceeded(f'A {wait:.2f} second wait would pass the deadline ({max(remaining, 0.0):.2f} seconds left).')
+        raise DeadlineExceeded('Deadline exceeded.')
+
+def request_timeout(provider):
+    """
+    Returns the `(connect, read)` timeout for a request to a provider.
+
+    Timeouts come from `settings.API_TIMEOUTS[provider]` and are clipped to the time
+    remaining on the current deadline.
+
+    Args:
+        provider (str): The provider name, e.g. 'vultr'.
+
+    Returns:
+        tuple: `(connect, read)` timeouts in seconds.
+
+    Raises:
+        DeadlineExceeded: If the current deadline has already passed.
+    """
+    limits = settings.API_TIMEOUTS.get(provider) or settings.API_TIMEOUTS['default']
+    connect, read = limits['connect'], limits['read']
+    remaining = remaining_time()
+    if remaining is not None:
+        check_deadline()
+        connect, read = min(connect, remaining), min(read, remaining)
+    return connect, read
+
+def deadline_expired(provider, timeout, error):
+    """
+    Returns whether a request timeout fired because `request_timeout` clipped it to the
+    time left on the current deadline, so the deadline, not the server, ended the request.
+
+    Args:
+        provider (str): The provider name, e.g. 'vultr'.
+        timeout (tuple): The `(connect, read)` timeout the request was sent with.
+        error (requests.RequestException): The error the request failed with.
+    """
+    if remaining_time() is None or not isinstance(error, requests.Timeout) or isinstance(error, DeadlineExceeded):
+        return False
+    limits = settings.API_TIMEOUTS.get(provider) or settings.API_TIMEOUTS['default']
+    if isinstance(error, requests.ConnectTimeout):
+        return timeout[0] < limits['connect']
+    return timeout[1] < limits['read']
+
+class RateLimiter():
+    """
+    Thread-safe token bucket that paces requests to one provider.
+
+    Tokens refill continuously at `rate` per second up to `burst`. Each request reserves a
+    token. When the bucket is empty, the caller waits until its token has refilled. Rate-limit
+    response headers can pause the bucket until the provider's window resets.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        burst (int): Maximum number of tokens the bucket holds.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Reserves a token for one request.
+
+        Returns:
+            float: The number of seconds the caller must wait before sending the request.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+
+    def acquire(self):
+        """
+        Blocks until a request may be sent.
+
+        Raises:
+            DeadlineExceeded: If the wait would outlast the current deadline.
+        """
+        wait = self.reserve()
+        if wait > 0:
+            check_deadline(wait)
+            time.sleep(wait)
+
+    def update_from_headers(self, status_code, headers):
+        """
+        Adjusts the bucket using the rate-limit information in a response.
+
+        Understands `Retry-After`, `X-RateLimit-Remaining`/`X-RateLimit-Reset`,
+        `RateLimit-Remaining`/`RateLimit-Reset` and the structured `RateLimit` header.
+
+        Args:
+            status_code (int): The HTTP status code of the response.
+            headers (Mapping): The response headers (case-insensitive).
+        """
+        remaining, reset = self.__parse_headers(headers)
+        pause = None
+        if status_code == 429:
+            pause = parse_retry_after(headers.get('Retry-After'))
+            if pause is None:
+                pause = reset if reset is not None else 1.0 / self.rate
+        elif remaining is not None and remaining <= 0 and reset is not None:
+            pause = reset
+
+        with self.lock:
+            if remaining is not None:
+                self.tokens = min(self.tokens, float(remaining))
+            if pause is not None:
+                self.paused_until = max(self.paused_until, time.monotonic() + pause)
+
+    def __parse_headers(self, headers):
+        """
+        Returns the remaining request count and seconds until reset advertised by the headers.
+
+        Either value is None when the headers do not provide it.
+        """
+        remaining = headers.get('X-RateLimit-Remaining', headers.get('RateLimit-Remaining'))
+        reset = headers.get('X-RateLimit-Reset', headers.get('RateLimit-Reset'))
+        structured = headers.get('RateLimit')
+        if structured:
+            for param in structured.replace(',', ';').split(';'):
+                name, _, value = param.strip().partition('=')
+                if name in ('r', 'remaining'):
+                    remaining = value
+                elif name in ('t', 'reset'):
+                    reset = value
+        try:
+            remaining = int(remaining) if remaining is not None else None
+        except ValueError:
+            remaining = None
+        try:
+            reset = float(reset) if reset is not None else None
+        except ValueError:
+            reset = None
+        if reset is not None and reset > 1e9: # An epoch timestamp rather than a delay
+            reset = max(0.0, reset - time.time())
+        return remaining, reset
+
+rate_limiters = {}
+rate_limiters_lock = threading.Lock()
+
+def get_rate_limiter(provider, token_fingerprint):
+    """
+    Returns the rate limiter shared by every client of a provider using the same token.
+
+    Limits are taken from `settings.API_RATE_LIMITS[provider]`.
+
+    Args:
+        provider (str): The provider name, e.g. 'vultr'.
+        token_fingerprint (str): A fingerprint of the API token, since limits apply per key.
+
+    Returns:
+        RateLimiter: The shared rate limiter.
+    """
+    key = (provider, token_fingerprint)
+    with rate_limiters_lock:
+        if key not in rate_limiters:
+            limits = settings.API_RATE_LIMITS[provider]
+            rate_limiters[key] = RateLimiter(limits['rate'], limits['burst'])
+        return rate_limiters[key]
+
+def parse_retry_after(value):
+    """
+    Parses a `Retry-After` header value.
+
+    Args:
+        value (str or None): Either a number of seconds or an HTTP date.
+
+    Returns:
+        float or None: The number of seconds to wait, or None if the value is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class RetryPolicy():
+    """
+    Decides whether and when a failed request is retried.
+
+    Requests that fail with one of `statuses`, a connection error or a timeout are retried
+    up to `max_attempts` attempts in total. The delay before each retry is exponential
+    backoff with full jitter, unless the response carries a `Retry-After` header, which is
+    honored instead. Only idempotent verbs are retried unless the caller opts in.
+
+    Attributes:
+        max_attempts (int): Total attempts per request, including the first one.
+        backoff_base (float): Backoff ceiling in seconds for the first retry.
+        backoff_max (float): Upper bound in seconds for any single backoff.
+        statuses (set): HTTP status codes treated as transient.
+    """
+    idempotent_methods = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+    def __init__(self, max_attempts, backoff_base, backoff_max, statuses):
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.statuses = set(statuses)
+
+    @classmethod
+    def from_settings(cls):
+        """Creates a retry policy from `settings.API_RETRY`."""
+        config = settings.API_RETRY
+        return cls(config['max_attempts'], config['backoff_base'], config['backoff_max'], config['statuses'])
+
+    def allows(self, method, retry=None):
+        """
+        Returns whether a request may be retried at all.
+
+        Args:
+            method (str): The HTTP verb.
+            retry (bool, optional): True to opt in for a non-idempotent verb, False to disable
+                retries. None applies the default for the verb.
+
+        Returns:
+            bool: True if failed attempts of this request may be retried.
+        """
+        if retry is None:
+            return method in self.idempotent_methods
+        return retry
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        Returns how many seconds to wait before the next attempt.
+
+        Args:
+            attempt (int): The number of the attempt that just failed, starting at 1.
+            retry_after (float, optional): The delay requested by the server, if any.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        if retry_after is not None:
+            return retry_after
+        ceiling = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+class SingleFlight():
+    """
+    Coalesces concurrent identical calls so that only one of them does the work.
+
+    The first caller for a key runs the function. Callers that arrive with the same key while
+    it is running wait for it and receive the same result, or the same exception.
+
+    Attributes:
+        calls (int): Number of calls that ran the function.
+        coalesced (int): Number of calls that shared another call's result.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """
+        Runs `fn` for `key`, or waits for the identical call already in flight.
+
+        Args:
+            key (Hashable): Identifies identical calls.
+            fn (callable): The function to run. It takes no arguments.
+
+        Returns:
+            Any: The result of `fn`, shared by every caller of the same in-flight call.
+        """
+        with self.lock:
+            call = self.in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = {'event': threading.Event(), 'result': None, 'error': None}
+                self.in_flight[key] = call
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call['event'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+
+        try:
+            call['result'] = fn()
+        except BaseException as e:
+            call['error'] = e
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+            call['event'].set()
+        return call['result']
+
+    def stats(self):
+        """Returns the call and coalesced counters as a dictionary."""
+        with self.lock:
+            return {'calls': self.calls, 'coalesced': self.coalesced}
+
+class CircuitBreaker():
+    """
+    Fails fast while an API host is down, instead of letting every call wait out its own failure.
+
+    The breaker starts closed and lets every request through. After `failure_threshold`
+    consecutive failures (connection errors, timeouts or 5xx responses) it opens, and requests
+    are rejected without being sent. Once `reset_timeout` seconds have passed it is half-open:
+    up to `half_open_max_calls` probe requests are let through, and the first probe's outcome
+    closes the breaker again or re-opens it for another `reset_timeout`.
+
+    Attributes:
+        failure_threshold (int): Consecutive failures that open the breaker. 0 disables it.
+        reset_timeout (float): Seconds the breaker stays open before probing the host.
+        half_open_max_calls (int): Probe requests allowed at once while half-open.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold, reset_timeout, half_open_max_calls=1):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self.lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.probes = 0
+        self.probe_started = 0.0
+
+    @classmethod
+    def from_settings(cls):
+        """Creates a circuit breaker from `settings.API_CIRCUIT_BREAKER`."""
+        config = settings.API_CIRCUIT_BREAKER
+        return cls(config['failure_threshold'], config['reset_timeout'], config['half_open_max_calls'])
+
+    def allow(self):
+        """
+        Returns whether a request may be sent now, counting it as a probe when half-open.
+
+        Returns:
+            bool: False if the request should be rejected without being sent.
+        """
+        if self.failure_threshold <= 0:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            if self.state == self.OPEN:
+                if now - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self.probes = 0
+            if self.state == self.HALF_OPEN:
+                # A probe that never reported back, e.g. one that raised, frees its slot after reset_timeout
+                if self.probes >= self.half_open_max_calls and now - self.probe_started < self.reset_timeout:
+                    return False
+                self.probes += 1
+                self.probe_started = now
+            return True
+
+    def record_success(self):
+        """Records a request that reached the host and did not fail, closing the breaker."""
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probes = 0
+
+    def record_failure(self):
+        """Records a failed request, opening the breaker at the threshold or after a failed probe."""
+        if self.failure_threshold <= 0:
+            return
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.times_opened += 1
+                self.probes = 0
+
+    def retry_in(self):
+        """Returns the seconds until an open breaker lets a probe through, or 0.0 if it is not open."""
+        with self.lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def stats(self):
+        """
+        Returns the breaker's state for display.
+
+        Returns:
+            dict: state, failures (consecutive), times_opened and retry_in (seconds).
+        """
+        retry_in = self.retry_in()
+        with self.lock:
+            state = self.HALF_OPEN if self.state == self.OPEN and retry_in == 0.0 else self.state
+            return {'state': state, 'failures': self.failures, 'times_opened': self.times_opened, 'retry_in': retry_in}
+
+circuit_breakers = {}
+circuit_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(base_url):
+    """
+    Returns the circuit breaker shared by every client, sync or async, of an API base URL.
+
+    Args:
+        base_url (str): The client's base URL, e.g. 'https://api.vultr.com/v2/'.
+
+    Returns:
+        CircuitBreaker: The shared circuit breaker.
+    """
+    with circuit_breakers_lock:
+        if base_url not in circuit_breakers:
+            circuit_breakers[base_url] = CircuitBreaker.from_settings()
+        return circuit_breakers[base_url]
+
+def circuit_open_message(base_url, breaker):
+    """
+    Returns the error message of a request rejected by an open circuit breaker.
+    """
+    return (f'{base_url} is failing ({breaker.failures} consecutive failures); '
+            f'requests are paused for {breaker.retry_in():.0f} more seconds.')
+
+ID_SEGMENT = re.compile(r'^(\d+|[0-9a-f]{32}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})$', re.IGNORECASE)
+
+def url_template(url):
+    """
+    Normalizes an endpoint path into a template by replacing resource IDs with `{id}`.
+
+    Args:
+        url (str): The endpoint path, e.g. 'instances/cb676a46-66fd-4dfb-b839-443f2e6c0b60?per_page=500'.
+
+    Returns:
+        str: The template, e.g. 'instances/{id}'. The query string is dropped.
+    """
+    path = url.split('?', 1)[0].strip('/')
+    return '/'.join('{id}' if ID_SEGMENT.match(segment) else segment for segment in path.split('/'))
+
+class MetricsRegistry():
+    """
+    Thread-safe registry of API request statistics, grouped by provider, verb and endpoint template.
+
+    For every series it counts requests, error responses and bytes sent and received (both as
+    decoded and as transferred on the wire, which differ for compressed responses), and keeps
+    the latencies of the most recent `sample_size` requests for p50/p95/p99. The registry can be
+    exported in the Prometheus text format (for the node exporter textfile collector) or as JSON.
+    """
+    sample_size = 2048
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def record(self, provider, method, url, status_code, seconds, bytes_sent=0, bytes_received=0, wire_bytes=None):
+        """
+        Records one HTTP request.
+
+        Args:
+            provider (str): The provider name, e.g. 'vultr'.
+            method (str): The HTTP verb.
+            url (str): The endpoint path. It is normalized with `url_template`.
+            status_code (int or None): The response status, or None if no response was received.
+            seconds (float): The request latency.
+            bytes_sent (int): Size of the request body.
+            bytes_received (int): Size of the response body after decompression.
+            wire_bytes (int, optional): Size of the response body as transferred. Defaults to `bytes_received`.
+        """
+        with self.lock:
+            series = self.__series(provider, method, url)
+            series['count'] += 1
+            if status_code is None or status_code >= 400:
+                series['errors'] += 1
+            series['bytes_sent'] += bytes_sent
+            series['bytes_received'] += bytes_received
+            series['bytes_received_wire'] += bytes_received if wire_bytes is None else wire_bytes
+            series['seconds'] += seconds
+            series['latencies'].append(seconds)
+
+    def record_body(self, provider, method, url, bytes_received, wire_bytes):
+        """
+        Adds the size of a response body that was read after its request was recorded, as
+        for streamed responses.
+
+        Args:
+            provider (str): The provider name, e.g. 'vultr'.
+            method (str): The HTTP verb.
+            url (str): The endpoint path. It is normalized with `url_template`.
+            bytes_received (int): Size of the response body after decompression.
+            wire_bytes (int): Size of the response body as transferred.
+        """
+        with self.lock:
+            series = self.__series(provider, method, url)
+            series['bytes_received'] += bytes_received
+            series['bytes_received_wire'] += wire_bytes
+
+    def __series(self, provider, method, url):
+        """
+        Returns the series of an endpoint, creating it if needed. The lock must be held.
+        """
+        key = (provider, method, url_template(url))
+        series = self.series.get(key)
+        if series is None:
+            series = {'count': 0, 'errors': 0, 'bytes_sent': 0, 'bytes_received': 0, 'bytes_received_wire': 0,
+                      'seconds': 0.0, 'latencies': deque(maxlen=self.sample_size)}
+            self.series[key] = series
+        return series
+
+    def snapshot(self):
+        """
+        Returns the current statistics of every series, busiest endpoints (by total time) first.
+
+        Returns:
+            list: One dictionary per series with provider, method, endpoint, count, errors,
+                  bytes_sent, bytes_received, bytes_received_wire, seconds (total), p50, p95
+                  and p99 (seconds).
+        """
+        with self.lock:
+            items = [(key, dict(series, latencies=sorted(series['latencies']))) for key, series in self.series.items()]
+        result = []
+        for (provider, method, endpoint), series in items:
+            latencies = series.pop('latencies')
+            series.update({
+                'provider': provider,
+                'method': method,
+                'endpoint': endpoint,
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+                'p99': percentile(latencies, 99),
+            })
+            result.append(series)
+        return sorted(result, key=lambda series: series['seconds'], reverse=True)
+
+    def to_json(self):
+        """Returns the snapshot as a JSON document."""
+        return json.dumps({'generated_at': time.time(), 'series': self.snapshot()}, indent=2)
+
+    def to_prometheus(self):
+        """
+        Returns the snapshot in the Prometheus text exposition format.
+
+        Request, error and byte totals are counters, and latency is a summary with 0.5, 0.95
+        and 0.99 quantiles over the recent sample window.
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        def metric(name, kind, help_text, rows):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(rows)
+
+        def labels(series, **extra):
+            pairs = {'provider': series['provider'], 'method': series['method'], 'endpoint': series['endpoint'], **extra}
+            return '{' + ','.join(f'{k}="{v}"' for k, v in pairs.items()) + '}'
+
+        metric('pyvultr_api_requests_total', 'counter', 'API requests sent.',
+               [f"pyvultr_api_requests_total{labels(s)} {s['count']}" for s in snapshot])
+        metric('pyvultr_api_errors_total', 'counter', 'API requests that failed or returned a 4xx/5xx status.',
+               [f"pyvultr_api_errors_total{labels(s)} {s['errors']}" for s in snapshot])
+        metric('pyvultr_api_bytes_total', 'counter', 'Request and response body bytes.',
+               [f"pyvultr_api_bytes_total{labels(s, direction='sent')} {s['bytes_sent']}" for s in snapshot] +
+               [f"pyvultr_api_bytes_total{labels(s, direction='received')} {s['bytes_received']}" for s in snapshot])
+        metric('pyvultr_api_wire_bytes_total', 'counter', 'Response body bytes as transferred, before decompression.',
+               [f"pyvultr_api_wire_bytes_total{labels(s)} {s['bytes_received_wire']}" for s in snapshot])
+        rows = []
+        for s in snapshot:
+            for quantile, key in (('0.5', 'p50'), ('0.95', 'p95'), ('0.99', 'p99')):
+                rows.append(f"pyvultr_api_request_duration_seconds{labels(s, quantile=quantile)} {s[key]:.6f}")
+            rows.append(f"pyvultr_api_request_duration_seconds_sum{labels(s)} {s['seconds']:.6f}")
+            rows.append(f"pyvultr_api_request_duration_seconds_count{labels(s)} {s['count']}")
+        metric('pyvultr_api_request_duration_seconds', 'summary', 'API request latency.', rows)
+        return '\n'.join(lines) + '\n'
+
+    def export(self):
+        """
+        Writes the configured exports, `settings.API_METRICS_PROMETHEUS_FILE` and
+        `settings.API_METRICS_JSON_FILE`, skipping any that are not set.
+
+        Returns:
+            list: The paths that were written.
+        """
+        written = []
+        for path, render in ((settings.API_METRICS_PROMETHEUS_FILE, self.to_prometheus),
+                             (settings.API_METRICS_JSON_FILE, self.to_json)):
+            if path:
+                write_atomic(path, render())
+                written.append(path)
+        return written
+
+def percentile(ordered, pct):
+    """
+    Returns the nearest-rank percentile of an already sorted list, or 0.0 if it is empty.
+    """
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+def write_atomic(path, text):
+    """
+    Writes text to a file through a temporary file and a rename, so readers such as the
+    Prometheus textfile collector never see a partial file.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+metrics = MetricsRegistry()
+
+def read_body(response, chunk_size=65536):
+    """
+    Reads the whole body of a response sent with `stream=True`, decompressing it as it
+    arrives, and stores it as the response's `content`.
+
+    Args:
+        response (requests.Response): The unread response.
+        chunk_size (int, optional): Bytes read from the connection at a time.
+
+    Returns:
+        tuple: The body's size as transferred and after decompression, in bytes.
+    """
+    stream = body_stream(response, chunk_size)
+    response._content = b''.join(stream)
+    response._content_consumed = True
+    return stream.wire_bytes, stream.decoded_bytes
+
+def body_stream(response, chunk_size=65536):
+    """
+    Returns a `DecodedStream` over the body of a response sent with `stream=True`.
+
+    Responses whose body a transport adapter has already read, such as replayed ones,
+    are served from `content` and count the same size on the wire and decoded.
+    """
+    if response._content is not False or response.raw is None:
+        return DecodedStream([response.content] if response.content else [])
+    return DecodedStream(raw_chunks(response.raw, chunk_size), response.headers.get('Content-Encoding'))
+
+def raw_chunks(raw, chunk_size):
+    """
+    Yields the body of a urllib3 response as transferred, raising `requests` exceptions
+    for broken or stalled transfers. A stalled read raises `requests.ReadTimeout`, so a
+    read timeout is handled the same whether it fires before or during the body.
+    """
+    try:
+        yield from raw.stream(chunk_size, decode_content=False)
+    except ProtocolError as e:
+        raise requests.exceptions.ChunkedEncodingError(e)
+    except ReadTimeoutError as e:
+        raise requests.exceptions.ReadTimeout(e)
+    except SSLError as e:
+        raise requests.exceptions.SSLError(e)
+
+def traced_call(fn):
+    """
+    Runs an `api_*` method in a tracing span named after the provider, verb and URL template,
+    e.g. 'vultr GET instances/{id}'. Costs one settings lookup when tracing is disabled.
+    """
+    verb = fn.__name__.removeprefix('api_').upper()
+
+    @functools.wraps(fn)
+    def wrapper(self, url, *args, **kwargs):
+        if not settings.TRACE_ENABLED:
+            return fn(self, url, *args, **kwargs)
+        with span(f'{self.provider} {verb} {url_template(url)}', url=url):
+            return fn(self, url, *args, **kwargs)
+    return wrapper
+
+class Provider():
+    """
+    What a client knows about its provider's API apart from sending requests: its name,
+    pagination scheme and response format.
+
+    `Api` and `AsyncApi` both derive from it, and each provider has one subclass, e.g.
+    `VultrProvider`, that its synchronous and asyncio clients share, so both handle pages
+    and responses identically.
+    """
+
+    provider = ''
+
+    def error_response(self, status, message):
+        """
+        Returns an error result in the provider's response format, for failures detected
+        before a request is sent. Subclasses shape it like their `process_response` errors.
+        """
+        return {'error': status, 'error_detail': {'error': message, 'status': status}}
+
+    def first_page_url(self, url):
+        """
+        Returns the URL of the first page of a list endpoint. Subclasses add their page size here.
+        """
+        return url
+
+    def next_page_url(self, url, data):
+        """
+        Returns the URL of the page following `data`, or None when `data` is the last page.
+        """
+        return None
+
+class Api(Provider):
     """
     Parent API class containing methods common to all API subclasses.
+
+    Each client owns a `requests.Session` backed by a pool of keep-alive connections that
+    all request verbs share. Clients should be closed when no longer needed, either by
+    calling `close()` or by using the client as a context manager.
+
+    Every request first takes a token from the provider's shared `RateLimiter`, so concurrent
+    callers stay within the provider's request rate. Subclasses set `provider` to select
+    their limits from `settings.API_RATE_LIMITS`. Transient failures are retried according
+    to the client's `RetryPolicy`.
+
+    GET requests for endpoints matching `settings.API_DISK_CACHE_PATTERNS` are revalidated
+    against an on-disk `DiskCache` with `If-None-Match`/`If-Modified-Since`, and a 304 is
+    answered from the cache. Within a session, GET responses are also kept in a `MemoryCache`
+    with per-endpoint TTLs from `settings.API_MEMORY_CACHE_TTLS`. Any POST, PUT, PATCH or
+    DELETE invalidates the cached entries of the resource it writes to. Concurrent identical
+    GETs are coalesced by `single_flight` into one request and share its parsed result.
+
+    Every HTTP attempt is recorded in the module-level `metrics` registry. Requests to a
+    base URL that keeps failing are rejected at once by its shared `CircuitBreaker`, with
+    the provider's `error_response`, until the host recovers.
     Methods
     -------
     api_get(url)
@@ -15,6 +867,18 @@ class Api():
         Sends an HTTP PUT request with the provided data to the specified URL and returns the processed response.
     api_delete(url)
         Sends an HTTP DELETE request to the specified URL and returns the processed response.
+    batch(request_list, max_workers)
+        Runs a list of (verb, url, body) requests concurrently and returns their results in order.
+    iter_pages(url, key)
+        Yields every item under `key` across all pages of a list endpoint.
+    api_get_all(url, key)
+        Collects every page of a list endpoint into a single response dictionary.
+    api_get_stream(url, key)
+        Yields every item under `key` across all pages, decoding each page incrementally.
+    circuit_breaker
+        The circuit breaker of this client's base URL.
+    close()
+        Closes the session and all pooled connections.
     __get_headers()
         Private method that returns the common HTTP request headers used in all API calls.
     """
@@ -23,12 +887,50 @@ class Api():
     yellow_codes = [404]
     red_codes = [400, 500]
 
-    def api_get(self, url):
+    def __init__(self):
+        """
+        Creates the pooled HTTP session used by all requests of this client.
+
+        Subclasses must set `token` and `base_url` before calling this.
+        """
+        self.token_fingerprint = hashlib.sha256(self.token.encode('utf-8')).hexdigest()[:16]
+        self.session = self.__create_session()
+        self.rate_limiter = get_rate_limiter(self.provider, self.token_fingerprint)
+        self.retry_policy = RetryPolicy.from_settings()
+        self.disk_cache = None
+        if settings.API_DISK_CACHE:
+            self.disk_cache = DiskCache(settings.API_DISK_CACHE_DIR, settings.API_DISK_CACHE_PATTERNS)
+        self.memory_cache = MemoryCache(settings.API_MEMORY_CACHE_SIZE, settings.API_MEMORY_CACHE_TTLS)
+        self.single_flight = SingleFlight()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Closes the HTTP session and every pooled connection it holds, and writes the
+        configured metrics exports.
+        """
+        self.session.close()
+        metrics.export()
+
+    @traced_call
+    def api_get(self, url, retry=None, fresh=False):
         """
         Sends an HTTP GET request to the specified API endpoint.
 
+        Successful responses are answered from the in-memory cache while their TTL lasts;
+        each hit is a fresh copy. Concurrent calls for the same URL share one request and
+        the same parsed result, which callers must therefore not modify. A call never joins,
+        or caches the result of, a request sent before a write that invalidated the cache.
+
         Args:
             url (str): The endpoint path to append to the base URL for the GET request.
+            retry (bool, optional): Set to False to disable retries of transient failures.
+            fresh (bool, optional): Set to True to skip the in-memory cache for reads that must be current.
 
         Returns:
             Any: The processed response from the API, as returned by `process_response`.
@@ -37,19 +939,28 @@ class Api():
             requests.RequestException: If the HTTP request fails.
             Exception: If response processing fails.
         """
-        call_url = self.base_url + url
-        headers = self.__get_headers()
-        response = requests.get(call_url, headers=headers)
-        self.__print_response_summary(response)
-        return self.process_response(response)
+        key = cache_key(self.token_fingerprint, self.base_url + url)
+        if not fresh:
+            hit, data = self.memory_cache.get(key)
+            if hit:
+                annotate(cache='memory')
+                return data
+        generation = self.memory_cache.generation
+        data = self.single_flight.do((key, generation), lambda: self.__request('GET', url, retry=retry))
+        if isinstance(data, dict) and not data.get('error'):
+            self.memory_cache.put(key, url, data, generation)
+        return data
 
-    def api_post(self, url, data):
+    @traced_call
+    def api_post(self, url, data, retry=None):
         """
         Sends an HTTP POST request to the specified API endpoint.
 
         Args:
             url (str): The API endpoint (relative to the base URL) to send the POST request to.
             data (dict): The JSON-serializable data to include in the body of the POST request.
+            retry (bool, optional): Set to True to retry transient failures. POST is not
+                idempotent, so it is only retried when the caller opts in.
 
         Returns:
             Any: The processed response from the API, as returned by `process_response`.
@@ -58,19 +969,17 @@ class Api():
             requests.RequestException: If the HTTP request fails.
             Exception: If the response processing fails.
         """
-        call_url = self.base_url + url
-        headers = self.__get_headers()
-        response = requests.post(call_url, json=data, headers=headers)
-        self.__print_response_summary(response)
-        return self.process_response(response)
+        return self.__request('POST', url, data, retry=retry)
 
-    def api_put(self, url, data):
+    @traced_call
+    def api_put(self, url, data, retry=None):
         """
         Sends an HTTP PUT request to the specified URL with the provided data.
 
         Args:
             url (str): The endpoint URL (relative to the base URL) to send the PUT request to.
             data (dict): The JSON-serializable data to include in the request body.
+            retry (bool, optional): Set to False to disable retries of transient failures.
 
         Returns:
             Any: The processed response from the server, as returned by `process_response`.
@@ -78,19 +987,18 @@ class Api():
         Raises:
             requests.RequestException: If the HTTP request fails.
         """
-        call_url = self.base_url + url
-        headers = self.__get_headers()
-        response = requests.put(call_url, json=data, headers=headers)
-        self.__print_response_summary(response)
-        return self.process_response(response)
+        return self.__request('PUT', url, data, retry=retry)
 
-    def api_patch(self, url, data):
+    @traced_call
+    def api_patch(self, url, data, retry=None):
         """
         Sends a PATCH request to the specified API endpoint with the provided data.
 
         Args:
             url (str): The API endpoint (relative to the base URL) to send the PATCH request to.
             data (dict): The JSON-serializable data to include in the PATCH request body.
+            retry (bool, optional): Set to True to retry transient failures. PATCH is not
+                idempotent, so it is only retried when the caller opts in.
 
         Returns:
             Any: The processed response from the API, as returned by `self.process_response`.
@@ -99,18 +1007,16 @@ class Api():
             requests.RequestException: If the PATCH request fails due to a network problem.
             Exception: If `self.process_response` raises an exception.
         """
-        call_url = self.base_url + url
-        headers = self.__get_headers()
-        response = requests.patch(call_url, json=data, headers=headers)
-        self.__print_response_summary(response)
-        return self.process_response(response)
+        return self.__request('PATCH', url, data, retry=retry)
 
-    def api_delete(self, url):
+    @traced_call
+    def api_delete(self, url, retry=None):
         """
         Sends an HTTP DELETE request to the specified URL.
 
         Args:
             url (str): The endpoint path to append to the base URL for the DELETE request.
+            retry (bool, optional): Set to False to disable retries of transient failures.
 
         Returns:
             Any: The processed response from the DELETE request.
@@ -119,11 +1025,269 @@ class Api():
             requests.RequestException: If the HTTP request fails.
             Exception: If response processing fails.
         """
+        return self.__request('DELETE', url, retry=retry)
+
+    def batch(self, request_list, max_workers=None):
+        """
+        Runs many requests concurrently on a bounded thread pool that shares this client's
+        connection pool, rate limiter and retry policy.
+
+        Args:
+            request_list (list): `(verb, url, body)` tuples, e.g. `('DELETE', 'firewalls/x/rules/1', None)`.
+                `body` is ignored for GET and DELETE.
+            max_workers (int, optional): The maximum number of requests in flight.
+                Defaults to `settings.API_BATCH_WORKERS`.
+
+        Returns:
+            list: One dictionary per request, in input order, with keys:
+                - 'request': The `(verb, url, body)` tuple.
+                - 'ok': True if the request completed without an error response or exception.
+                - 'result': The processed response, or None if an exception was raised.
+                - 'exception': The exception raised by the request, or None.
+        """
+        if not request_list:
+            return []
+        verbs = {
+            'GET': lambda url, body: self.api_get(url),
+            'POST': self.api_post,
+            'PUT': self.api_put,
+            'PATCH': self.api_patch,
+            'DELETE': lambda url, body: self.api_delete(url),
+        }
+
+        def run(request):
+            verb, url, body = request
+            try:
+                result = verbs[verb.upper()](url, body)
+            except Exception as e:
+                return {'request': request, 'ok': False, 'result': None, 'exception': e}
+            ok = not (isinstance(result, dict) and result.get('error'))
+            return {'request': request, 'ok': ok, 'result': result, 'exception': None}
+
+        workers = max(1, min(max_workers or settings.API_BATCH_WORKERS, len(request_list)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(bind_context(run), request_list))
+
+    def iter_pages(self, url, key, fresh=False):
+        """
+        Yields the items of a paginated list endpoint one at a time, fetching pages lazily.
+
+        Subclasses describe their pagination scheme through `first_page_url` and
+        `next_page_url`, so only one page is held in memory at a time.
+
+        Args:
+            url (str): The list endpoint path, e.g. 'instances'.
+            key (str): The key in each page's response that holds the list of items.
+            fresh (bool, optional): Set to True to skip the in-memory cache.
+
+        Yields:
+            dict: Each item of the listing, in API order.
+
+        Raises:
+            ApiError: If any page returns an error response.
+        """
+        page_url = self.first_page_url(url)
+        while page_url is not None:
+            data = self.api_get(page_url, fresh=fresh)
+            if data.get('error'):
+                raise ApiError(data)
+            yield from data.get(key, [])
+            page_url = self.next_page_url(url, data)
+
+    @traced_call
+    def api_get_all(self, url, key, fresh=False):
+        """
+        Fetches every page of a list endpoint and collects the items into one response.
+
+        Args:
+            url (str): The list endpoint path, e.g. 'instances'.
+            key (str): The key in each page's response that holds the list of items.
+            fresh (bool, optional): Set to True to skip the in-memory cache.
+
+        Returns:
+            dict: `{key: [...all items...], 'meta': {'total': count}}` on success, or the
+                  error response of the first page that failed.
+        """
+        try:
+            items = list(self.iter_pages(url, key, fresh))
+        except ApiError as e:
+            return e.response
+        return {key: items, 'meta': {'total': len(items)}}
+
+    def api_get_stream(self, url, key, chunk_size=65536):
+        """
+        Yields the items of a list endpoint across all pages, decoding each page's body
+        incrementally as it arrives.
+
+        Unlike `api_get_all`, no page is ever fully decoded into memory, so peak memory stays
+        flat however large the listing is. Streamed pages bypass the in-memory and on-disk
+        caches. Use it for large listings such as big DNS zones or instance lists.
+
+        Args:
+            url (str): The list endpoint path, e.g. 'instances'.
+            key (str): The key in each page's response that holds the list of items.
+            chunk_size (int, optional): Bytes read from the connection at a time.
+
+        Yields:
+            dict: Each item of the listing, in API order.
+
+        Raises:
+            ApiError: If any page returns an error response.
+        """
+        page_url = self.first_page_url(url)
+        while page_url is not None:
+            response = self.__request('GET', page_url, stream=True)
+            if not isinstance(response, requests.Response):
+                raise ApiError(response)
+            with response:
+                body = body_stream(response, chunk_size)
+                stream = JsonArrayStream(body, key)
+                yield from stream
+            metrics.record_body(self.provider, 'GET', page_url, body.decoded_bytes, body.wire_bytes)
+            page_url = self.next_page_url(url, stream.envelope)
+
+    @property
+    def circuit_breaker(self):
+        """The `CircuitBreaker` shared by every client of this client's base URL."""
+        return get_circuit_breaker(self.base_url)
+
+    def __request(self, method, url, data=None, retry=None, stream=False):
+        """
+        Sends an HTTP request with `__send`. A POST, PUT, PATCH or DELETE invalidates the
+        in-memory cache of the resource it writes to both before it is sent and once it has
+        finished, so a GET that was in flight during the write cannot leave the old data cached.
+        """
+        if method == 'GET':
+            return self.__send(method, url, data, retry, stream)
+        self.memory_cache.invalidate(url)
+        try:
+            return self.__send(method, url, data, retry, stream)
+        finally:
+            self.memory_cache.invalidate(url)
+
+    def __send(self, method, url, data=None, retry=None, stream=False):
+        """
+        Sends an HTTP request through the client's pooled session, retrying transient failures.
+
+        Response bodies are decompressed as they arrive, and the metrics record their size
+        both on the wire and decoded. Every attempt reports its outcome to the base URL's
+        `CircuitBreaker`. While the breaker is open, the request is not sent: a GET with an
+        on-disk cached copy returns it, and anything else returns `error_response(503, ...)`.
+
+        Args:
+            method (str): The HTTP verb, e.g. 'GET' or 'POST'.
+            url (str): The endpoint path to append to the base URL.
+            data (dict, optional): The JSON-serializable request body.
+            retry (bool, optional): Overrides whether the retry policy applies to this request.
+            stream (bool, optional): Set to True to return a successful response unread, so
+                its body can be consumed incrementally. Error responses are still processed.
+
+        Returns:
+            Any: The processed response from the API, as returned by `process_response`, or
+                 the unread `requests.Response` of a successful streamed request.
+
+        Raises:
+            requests.RequestException: If the request still fails to connect, or its body
+                transfer still breaks off, after all attempts.
+            DeadlineExceeded: If the current deadline passes before a response arrives.
+        """
         call_url = self.base_url + url
-        headers = self.__get_headers()
-        response = requests.delete(call_url, headers=headers)
-        self.__print_response_summary(response)
-        return self.process_response(response)
+        retry_allowed = self.retry_policy.allows(method, retry)
+        cached, headers = None, None
+        if method == 'GET' and not stream and self.disk_cache is not None and self.disk_cache.cacheable(url):
+            key = cache_key(self.token_fingerprint, call_url)
+            cached = self.disk_cache.get(key)
+            headers = self.disk_cache.validators(cached)
+        breaker = get_circuit_breaker(self.base_url)
+        attempt = 1
+        while True:
+            if not breaker.allow():
+                annotate(circuit=CircuitBreaker.OPEN)
+                if cached is not None:
+                    return cached['data']
+                return self.error_response(503, circuit_open_message(self.base_url, breaker))
+            self.rate_limiter.acquire()
+            timeout = request_timeout(self.provider)
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, call_url, json=data, headers=headers, timeout=timeout, stream=True)
+                streaming = stream and 200 <= response.status_code < 300
+                wire, received = (0, 0) if streaming else read_body(response)
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                metrics.record(self.provider, method, url, None, time.perf_counter() - start)
+                if deadline_expired(self.provider, timeout, e):
+                    raise DeadlineExceeded(f'Deadline exceeded while waiting for {method} {url}.') from e
+                breaker.record_failure()
+                if not retry_allowed or attempt >= self.retry_policy.max_attempts:
+                    raise
+                self.__wait_for_retry(attempt, self.retry_policy.backoff(attempt), type(e).__name__)
+                attempt += 1
+                continue
+
+            metrics.record(self.provider, method, url, response.status_code, time.perf_counter() - start,
+                           len(response.request.body or b''), received, wire)
+            annotate(status=response.status_code, attempts=attempt)
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            self.rate_limiter.update_from_headers(response.status_code, response.headers)
+            self.__print_response_summary(response)
+            if retry_allowed and attempt < self.retry_policy.max_attempts and response.status_code in self.retry_policy.statuses:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                self.__wait_for_retry(attempt, self.retry_policy.backoff(attempt, retry_after), response.status_code)
+                attempt += 1
+                continue
+            if response.status_code == 304 and cached is not None:
+                annotate(cache='revalidated')
+                return cached['data']
+            if streaming:
+                return response
+            output = self.process_response(response)
+            if headers is not None and 200 <= response.status_code < 300:
+                self.disk_cache.store(key, call_url, response.headers, output)
+            return output
+
+    def __wait_for_retry(self, attempt, delay, reason):
+        """
+        Sleeps before the next attempt of a request, noting the retry when summaries are enabled.
+
+        Args:
+            attempt (int): The number of the attempt that just failed.
+            delay (float): Seconds to wait.
+            reason: The status code or exception that caused the retry.
+
+        Raises:
+            DeadlineExceeded: If the wait would outlast the current deadline.
+        """
+        check_deadline(delay)
+        if settings.PRINT_API_RESPONSE_SUMMARY and not current_quiet.get():
+            print(yellow_text(f"Attempt {attempt} failed ({reason}). Retrying in {delay:.2f} seconds."))
+        time.sleep(delay)
+
+    def __create_session(self):
+        """
+        Creates a `requests.Session` with a connection pool sized from settings.
+
+        The same adapter is mounted for HTTP and HTTPS so that every verb reuses the
+        pooled keep-alive connections to the API host. `settings.API_TRANSPORT_MODE`
+        can swap it for one that records traffic to, or replays it from, a cassette.
+        Responses are requested compressed with every coding `accept_encoding` supports.
+
+        Returns:
+            requests.Session: The configured session.
+        """
+        session = mount_transport(
+            requests.Session(),
+            pool_connections=settings.API_POOL_CONNECTIONS,
+            pool_maxsize=settings.API_POOL_MAXSIZE,
+            pool_block=settings.API_POOL_BLOCK,
+        )
+        session.headers.update(self.__get_headers())
+        session.headers['Accept-Encoding'] = accept_encoding()
+        if not settings.API_KEEP_ALIVE:
+            session.headers['Connection'] = 'close'
+        return session
 
     def __get_headers(self):
         """
@@ -148,7 +1312,7 @@ class Api():
         Args:
             response (requests.Response): The HTTP response object to summarize.
         """
-        if settings.PRINT_API_RESPONSE_SUMMARY:
+        if settings.PRINT_API_RESPONSE_SUMMARY and not current_quiet.get():
             url = response.url
             url_display = url[:50] + "..." if len(url) > 30 else url
             print(blue_text(f"URL: {url_display}"))
@@ -0,0 +1,257 @@
+import asyncio
+import hashlib
+import json
+import time
+from datetime import timedelta
+import aiohttp
+import requests
+import jsoncodec
+import settings
+from .api import DeadlineExceeded, Provider, RetryPolicy, check_deadline, circuit_open_message, get_circuit_breaker, get_rate_limiter, metrics, parse_retry_after, remaining_time, request_timeout
+from .compression import DecodedStream, accept_encoding
+
+async def gather_bounded(coros, limit, return_exceptions=False):
+    """
+    Awaits many coroutines concurrently with at most `limit` of them running at once.
+
+    Args:
+        coros (iterable): The coroutines to run, e.g. `[api.get(f'instances/{i}') for i in ids]`.
+        limit (int): The maximum number of coroutines in flight.
+        return_exceptions (bool): If True, exceptions are returned in the results instead of raised.
+
+    Returns:
+        list: The results in the same order as `coros`.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(run(coro) for coro in coros), return_exceptions=return_exceptions)
+
+class AsyncResponse():
+    """
+    A fully read aiohttp response exposing the parts of the `requests.Response` interface
+    used by `process_response`, so the synchronous clients' response handling can be shared.
+
+    Attributes:
+        status_code (int): The HTTP status code.
+        headers (Mapping): The response headers (case-insensitive).
+        url (str): The final URL of the request.
+        elapsed (timedelta): Time between sending the request and reading the body.
+        content (bytes): The raw response body.
+    """
+
+    def __init__(self, response, content, elapsed):
+        self.status_code = response.status
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.elapsed = timedelta(seconds=elapsed)
+        self.content = content
+
+    def json(self):
+        """
+        Parses the body as JSON.
+
+        Raises:
+            requests.exceptions.JSONDecodeError: If the body is not valid JSON, matching `requests`.
+        """
+        try:
+            return jsoncodec.loads(self.content)
+        except jsoncodec.JSONDecodeError as e:
+            raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos)
+
+class AsyncApi(Provider):
+    """
+    Parent class of the asyncio API clients.
+
+    Mirrors `Api` with awaitable verbs, so many requests can be in flight on one thread.
+    The async clients share the synchronous clients' rate limiters, circuit breakers, retry
+    policy, metrics registry and response processing. Use as an async context manager, or call `close()` when done.
+    Methods
+    -------
+    get(url)
+        Sends an HTTP GET request and returns the processed response.
+    post(url, data)
+        Sends an HTTP POST request with the provided data and returns the processed response.
+    put(url, data)
+        Sends an HTTP PUT request with the provided data and returns the processed response.
+    patch(url, data)
+        Sends an HTTP PATCH request with the provided data and returns the processed response.
+    delete(url)
+        Sends an HTTP DELETE request and returns the processed response.
+    get_all(url, key)
+        Collects every page of a list endpoint into a single response dictionary.
+    close()
+        Closes the underlying aiohttp session.
+    """
+    def __init__(self):
+        """
+        Prepares the shared rate limiter and retry policy.
+
+        Subclasses must set `token` and `base_url` before calling this. The aiohttp session
+        is created on first use so that it belongs to the running event loop.
+        """
+        self.token_fingerprint = hashlib.sha256(self.token.encode('utf-8')).hexdigest()[:16]
+        self.rate_limiter = get_rate_limiter(self.provider, self.token_fingerprint)
+        self.retry_policy = RetryPolicy.from_settings()
+        self.session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """
+        Closes the aiohttp session and its connections.
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def get(self, url, retry=None):
+        """Sends an HTTP GET request to the endpoint path and returns the processed response."""
+        return await self.__request('GET', url, retry=retry)
+
+    async def post(self, url, data, retry=None):
+        """Sends an HTTP POST request with a JSON body. Only retried if `retry` is True."""
+        return await self.__request('POST', url, data, retry=retry)
+
+    async def put(self, url, data, retry=None):
+        """Sends an HTTP PUT request with a JSON body and returns the processed response."""
+        return await self.__request('PUT', url, data, retry=retry)
+
+    async def patch(self, url, data, retry=None):
+        """Sends an HTTP PATCH request with a JSON body. Only retried if `retry` is True."""
+        return await self.__request('PATCH', url, data, retry=retry)
+
+    async def delete(self, url, retry=None):
+        """Sends an HTTP DELETE request to the endpoint path and returns the processed response."""
+        return await self.__request('DELETE', url, retry=retry)
+
+    async def get_all(self, url, key):
+        """
+        Fetches every page of a list endpoint one after another and collects the items.
+
+        Args:
+            url (str): The list endpoint path, e.g. 'instances'.
+            key (str): The key in each page's response that holds the list of items.
+
+        Returns:
+            dict: `{key: [...all items...], 'meta': {'total': count}}` on success, or the
+                  error response of the first page that failed.
+        """
+        items = []
+        page_url = self.first_page_url(url)
+        while page_url is not None:
+            data = await self.get(page_url)
+            if data.get('error'):
+                return data
+            items.extend(data.get(key, []))
+            page_url = self.next_page_url(url, data)
+        return {key: items, 'meta': {'total': len(items)}}
+
+    async def __request(self, method, url, data=None, retry=None):
+        """
+        Sends an HTTP request, pacing it with the rate limiter and retrying transient failures.
+
+        Args:
+            method (str): The HTTP verb.
+            url (str): The endpoint path to append to the base URL.
+            data (dict, optional): The JSON-serializable request body.
+            retry (bool, optional): Overrides whether the retry policy applies to this request.
+
+        Returns:
+            Any: The processed response from the API, as returned by `process_response`.
+
+        Raises:
+            aiohttp.ClientError: If the request still fails to connect after all attempts.
+            DeadlineExceeded: If the current deadline passes before a response arrives.
+        """
+        call_url = self.base_url + url
+        retry_allowed = self.retry_policy.allows(method, retry)
+        breaker = get_circuit_breaker(self.base_url)
+        attempt = 1
+        while True:
+            if not breaker.allow():
+                return self.error_response(503, circuit_open_message(self.base_url, breaker))
+            await self.__sleep(self.rate_limiter.reserve())
+            connect, read = request_timeout(self.provider)
+            timeout = aiohttp.ClientTimeout(total=remaining_time(), sock_connect=connect, sock_read=read)
+            start = time.perf_counter()
+            try:
+                async with self.__get_session().request(method, call_url, json=data, timeout=timeout) as raw:
+                    body = DecodedStream(content_encoding=raw.headers.get('Content-Encoding'))
+                    chunks = [body.feed(chunk) async for chunk in raw.content.iter_chunked(65536)]
+                    chunks.append(body.finish())
+                    response = AsyncResponse(raw, b''.join(chunks), time.perf_counter() - start)
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+                metrics.record(self.provider, method, url, None, time.perf_counter() - start)
+                if self.__deadline_expired(connect, read, e):
+                    raise DeadlineExceeded(f'Deadline exceeded while waiting for {method} {url}.') from e
+                breaker.record_failure()
+                if not retry_allowed or attempt >= self.retry_policy.max_attempts:
+                    raise
+                await self.__sleep(self.retry_policy.backoff(attempt))
+                attempt += 1
+                continue
+
+            metrics.record(self.provider, method, url, response.status_code, response.elapsed.total_seconds(),
+                           len(json.dumps(data)) if data is not None else 0, body.decoded_bytes, body.wire_bytes)
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            self.rate_limiter.update_from_headers(response.status_code, response.headers)
+            if retry_allowed and attempt < self.retry_policy.max_attempts and response.status_code in self.retry_policy.statuses:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                await self.__sleep(self.retry_policy.backoff(attempt, retry_after))
+                attempt += 1
+                continue
+            return self.process_response(response)
+
+    def __deadline_expired(self, connect, read, error):
+        """
+        Returns whether a request timeout fired because its timeouts were clipped to the
+        current deadline. The total timeout is always the time left on the deadline.
+        """
+        if remaining_time() is None or not isinstance(error, asyncio.TimeoutError):
+            return False
+        limits = settings.API_TIMEOUTS.get(self.provider) or settings.API_TIMEOUTS['default']
+        if isinstance(error, aiohttp.ConnectionTimeoutError):
+            return connect < limits['connect']
+        if isinstance(error, aiohttp.SocketTimeoutError):
+            return read < limits['read']
+        return True
+
+    async def __sleep(self, delay):
+        """
+        Waits before a request, failing fast if the wait would outlast the current deadline.
+        """
+        if delay > 0:
+            check_deadline(delay)
+            await asyncio.sleep(delay)
+
+    def __get_session(self):
+        """
+        Returns the aiohttp session, creating it with the configured connection limits on first use.
+        """
+        if self.session is None:
+            connector = aiohttp.TCPConnector(
+                limit=settings.ASYNC_API_CONNECTION_LIMIT,
+                limit_per_host=settings.ASYNC_API_CONNECTION_LIMIT,
+                force_close=not settings.API_KEEP_ALIVE,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers={
+                    'Authorization': f'Bearer {self.token}',
+                    'Content-Type': 'application/json',
+                    'Accept-Encoding': accept_encoding(),
+                },
+                auto_decompress=False, # Decoded by DecodedStream, which also counts the wire bytes
+            )
+        return self.session
@@ -0,0 +1,58 @@
+from .async_api import AsyncApi, gather_bounded
+from .cloudflare import CloudflareProvider
+import settings
+
+class AsyncCloudflare(CloudflareProvider, AsyncApi):
+    """
+    An asyncio client for the Cloudflare v4 API.
+
+    Shares the pagination and response processing of `Cloudflare` through
+    `CloudflareProvider`, so awaiting `get('zones')` returns exactly what
+    `Cloudflare.api_get('zones')` would.
+    Args:
+        email (str): The email address associated with the Cloudflare account.
+        token (str): The API token for authenticating requests.
+    Attributes:
+        email (str): The email address used for authentication.
+        token (str): The API token used for authentication.
+        base_url (str): The base URL for the Cloudflare v4 API.
+    """
+    def __init__(self, email, token):
+        """
+        Initializes the async Cloudflare client with the provided email and API token.
+
+        Args:
+            email (str): The email address associated with the Cloudflare account.
+            token (str): The API token for authenticating requests to the Cloudflare API.
+        """
+        self.email = email
+        self.token = token
+        self.base_url = 'https://api.cloudflare.com/client/v4/'
+        super().__init__()
+
+    async def get_all(self, url, key):
+        """
+        Fetches every page of a Cloudflare list endpoint, requesting pages after the first concurrently.
+
+        Args:
+            url (str): The list endpoint path, e.g. 'zones'.
+            key (str): The key in each page's response that holds the list of items.
+
+        Returns:
+            dict: `{key: [...all items...], 'meta': {'total': count}}` on success, or the
+                  error response of the first page that failed.
+        """
+        first = await self.get(self.first_page_url(url))
+        if first.get('error'):
+            return first
+        items = list(first.get(key) or [])
+
+        pages = await gather_bounded(
+            [self.get(page_url) for page_url in self.remaining_page_urls(url, first)],
+            settings.CLOUDFLARE_PAGE_WORKERS,
+        )
+        for data in pages:
+            if data.get('error'):
+                return data
+            items.extend(data.get(key) or [])
+        return {key: items, 'meta': {'total': len(items)}}
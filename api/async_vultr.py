@@ -0,0 +1,25 @@
+from .async_api import AsyncApi
+from .vultr import VultrProvider
+
+class AsyncVultr(VultrProvider, AsyncApi):
+    """
+    An asyncio client for the Vultr API.
+
+    Shares the pagination and response processing of `Vultr` through `VultrProvider`, so awaiting
+    `get('instances')` returns exactly what `Vultr.api_get('instances')` would.
+    Args:
+        token (str): The API token used for authenticating requests.
+    Attributes:
+        token (str): The API token.
+        base_url (str): The base URL for the Vultr API.
+    """
+    def __init__(self, token):
+        """
+        Initialize the async API client with the provided authentication token.
+
+        Args:
+            token (str): The API token used for authenticating requests.
+        """
+        self.token = token
+        self.base_url = 'https://api.vultr.com/v2/'
+        super().__init__()
@@ -0,0 +1,232 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+import jsoncodec
+
+def cache_key(token_fingerprint, call_url):
+    """
+    Returns the cache key for a GET request.
+
+    The key includes the token fingerprint so that responses are never shared between
+    API keys, which may see different resources.
+
+    Args:
+        token_fingerprint (str): The fingerprint of the client's API token.
+        call_url (str): The absolute request URL, including any query string.
+
+    Returns:
+        str: A hex digest identifying the request.
+    """
+    return hashlib.sha256(f'{token_fingerprint} {call_url}'.encode('utf-8')).hexdigest()
+
+class DiskCache():
+    """
+    On-disk cache of GET responses and their validators, used for conditional requests.
+
+    Responses to URLs matching one of `patterns` are stored with their `ETag` and
+    `Last-Modified` headers. The next request for the same URL sends `If-None-Match` and
+    `If-Modified-Since`, and a 304 answer is served from the cache. Entries read from
+    disk are kept in memory in their encoded form, so the file is read only once, and
+    each `get` decodes a fresh copy that the caller is free to modify.
+
+    Attributes:
+        directory (str): The directory holding one JSON file per cached response.
+        patterns (list): Compiled regular expressions matched against the endpoint path.
+    """
+
+    def __init__(self, directory, patterns):
+        self.directory = directory
+        self.patterns = [re.compile(p) for p in patterns]
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def cacheable(self, url):
+        """
+        Returns whether responses for an endpoint path are cached.
+
+        Args:
+            url (str): The endpoint path relative to the base URL. Any query string is ignored.
+        """
+        path = url.split('?', 1)[0]
+        return any(p.search(path) for p in self.patterns)
+
+    def get(self, key):
+        """
+        Returns a copy of the cached entry for a key, or None if there is none.
+
+        Returns:
+            dict or None: `{'url', 'etag', 'last_modified', 'data'}`.
+        """
+        with self.lock:
+            encoded = self.entries.get(key)
+        try:
+            if encoded is None:
+                with open(self.__path(key), 'rb') as f:
+                    encoded = f.read()
+                entry = jsoncodec.loads(encoded)
+                with self.lock:
+                    self.entries[key] = encoded
+                return entry
+            return jsoncodec.loads(encoded)
+        except (OSError, ValueError):
+            return None
+
+    def validators(self, entry):
+        """
+        Returns the conditional request headers for a cached entry.
+
+        Args:
+            entry (dict or None): The cached entry.
+
+        Returns:
+            dict: `If-None-Match` and/or `If-Modified-Since` headers. Empty if nothing is cached.
+        """
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, key, url, headers, data):
+        """
+        Stores a successful response if it carries a validator.
+
+        The file is written to a temporary name and renamed, so readers never see a partial entry.
+
+        Args:
+            key (str): The cache key.
+            url (str): The request URL, kept for reference.
+            headers (Mapping): The response headers.
+            data (Any): The parsed response body.
+        """
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        encoded = jsoncodec.dumps({'url': url, 'etag': etag, 'last_modified': last_modified, 'data': data})
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.__path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(encoded)
+        os.replace(tmp_path, path)
+        with self.lock:
+            self.entries[key] = encoded
+
+    def __path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+class MemoryCache():
+    """
+    In-process cache of GET responses with per-endpoint TTLs and LRU eviction.
+
+    Each endpoint path is matched against `ttls` in order, and the first matching pattern
+    sets how long its responses stay fresh. Paths matching no pattern are not cached. When
+    the cache holds `max_entries` responses, the least recently used one is evicted.
+
+    Responses are stored encoded, and each hit decodes a fresh copy, so callers may modify
+    what they get without affecting the cache or each other.
+
+    Every invalidation advances `generation`. A GET records the generation before it is
+    sent and passes it to `put`, which drops the response if a write invalidated the cache
+    meanwhile, as the response may predate the write.
+
+    Attributes:
+        max_entries (int): The maximum number of cached responses.
+        ttls (list): `(compiled pattern, seconds)` pairs, checked in order.
+        generation (int): The number of invalidations so far.
+    """
+
+    def __init__(self, max_entries, ttls):
+        self.max_entries = max_entries
+        self.ttls = [(re.compile(pattern), seconds) for pattern, seconds in ttls.items()]
+        self.entries = OrderedDict()
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def ttl(self, url):
+        """
+        Returns the TTL in seconds for an endpoint path, or None if it is not cached.
+
+        Args:
+            url (str): The endpoint path relative to the base URL. Any query string is ignored.
+        """
+        path = url.split('?', 1)[0]
+        for pattern, seconds in self.ttls:
+            if pattern.search(path):
+                return seconds
+        return None
+
+    def get(self, key):
+        """
+        Returns a copy of the cached data for a key and marks it as recently used.
+
+        Returns:
+            tuple: `(True, data)` on a fresh hit, `(False, None)` on a miss or expired entry.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return False, None
+            expires, path, encoded = entry
+            if expires <= time.monotonic():
+                del self.entries[key]
+                return False, None
+            self.entries.move_to_end(key)
+        return True, jsoncodec.loads(encoded)
+
+    def put(self, key, url, data, generation=None):
+        """
+        Caches the response data for an endpoint path if a TTL applies to it.
+
+        Args:
+            key (str): The cache key.
+            url (str): The endpoint path, used for TTL lookup and invalidation.
+            data (Any): The parsed response body.
+            generation (int, optional): The `generation` when the request was sent. The data
+                is not cached if the cache has been invalidated since.
+        """
+        ttl = self.ttl(url)
+        if not ttl:
+            return
+        path = url.split('?', 1)[0].strip('/')
+        encoded = jsoncodec.dumps(data)
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            self.entries[key] = (time.monotonic() + ttl, path, encoded)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, url):
+        """
+        Drops every cached response related to a resource that was written to.
+
+        A write to `firewalls/abc/rules` invalidates that path, every path below it, and the
+        parent resources `firewalls/abc` and `firewalls`, whose listings or counts it changes.
+
+        Args:
+            url (str): The endpoint path of the POST, PUT, PATCH or DELETE request.
+        """
+        written = url.split('?', 1)[0].strip('/')
+        with self.lock:
+            self.generation += 1
+            stale = [
+                key for key, (expires, path, encoded) in self.entries.items()
+                if path == written or path.startswith(written + '/') or written.startswith(path + '/')
+            ]
+            for key in stale:
+                del self.entries[key]
+
+    def clear(self):
+        """Drops every cached response."""
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
@@ -1,7 +1,106 @@
-import requests
-from .api import Api
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import jsoncodec
+import settings
+from .api import Api, ApiError, Provider, with_query
+from .tracing import bind_context
 
-class Cloudflare(Api):
+class CloudflareProvider(Provider):
+    """
+    The Cloudflare v4 API's pagination and response format, shared by `Cloudflare` and
+    `AsyncCloudflare`.
+    Methods:
+        per_page(url):
+            Returns the largest page size a list endpoint accepts.
+        first_page_url(url), next_page_url(url, data):
+            Page-number pagination, used when pages are fetched one after another.
+        remaining_page_urls(url, first):
+            Returns the URLs of the pages after the first, for fetching them concurrently.
+        process_response(response):
+            Parses a response into its JSON output, or a dictionary with error details.
+        error_response(status, message):
+            Returns an error result in the Cloudflare error format for requests that were never sent.
+    """
+
+    provider = 'cloudflare'
+    page_size = 50 # Largest per_page value accepted by every Cloudflare list endpoint
+    page_sizes = {'dns_records': 500} # Endpoints that accept larger pages, keyed by last path segment
+
+    def per_page(self, url):
+        """
+        Returns the largest page size accepted by a list endpoint.
+        """
+        return self.page_sizes.get(url.split('?')[0].rstrip('/').split('/')[-1], self.page_size)
+
+    def first_page_url(self, url):
+        """
+        Returns the URL of the first page of a Cloudflare list endpoint at the largest page size.
+        """
+        return with_query(url, {'page': 1, 'per_page': self.per_page(url)})
+
+    def next_page_url(self, url, data):
+        """
+        Returns the URL of the page after `data` from its `result_info`, or None if it was the last page.
+        """
+        info = data.get('result_info') or {}
+        page = info.get('page') or 1
+        if page >= (info.get('total_pages') or 1):
+            return None
+        return with_query(url, {'page': page + 1, 'per_page': self.per_page(url)})
+
+    def remaining_page_urls(self, url, first):
+        """
+        Returns the URLs of every page after the first, from the first page's `result_info`,
+        so they can be fetched concurrently.
+
+        Args:
+            url (str): The list endpoint path.
+            first (dict): The parsed response of the first page.
+
+        Returns:
+            list: The page URLs, in page order.
+        """
+        total_pages = (first.get('result_info') or {}).get('total_pages') or 1
+        per_page = self.per_page(url)
+        return [with_query(url, {'page': page, 'per_page': per_page}) for page in range(2, total_pages + 1)]
+
+    def process_response(self, response):
+        """
+        Processes the API response specific to the Cloudflare API.
+        Attempts to parse the response body as JSON with the fastest available backend. If parsing fails, returns a dictionary
+        with an informational message and the HTTP status code. For successful responses
+        (status code 2xx), returns the parsed JSON output. For unsuccessful responses,
+        returns a dictionary containing the error status code and the parsed output or error details.
+        Args:
+            response (requests.Response or AsyncResponse): The HTTP response, from requests or from `AsyncApi`.
+        Returns:
+            dict: The parsed JSON output for successful responses, or a dictionary with error
+            information for unsuccessful responses.
+        """
+        try:
+            output = jsoncodec.loads(response.content)
+            # print(output)
+        except jsoncodec.JSONDecodeError:
+            output = {'info': 'No response body.', 'status': response.status_code}
+
+        if response.status_code >= 200 and response.status_code < 300:
+            return output
+        else:
+            return {'error': response.status_code, 'error_detail': output}
+
+    def error_response(self, status, message):
+        """
+        Returns an error result shaped like a Cloudflare error response, for failures detected
+        before a request is sent, such as an open circuit breaker.
+        Args:
+            status (int): The HTTP status code to report.
+            message (str): The error message.
+        Returns:
+            dict: The error result, as `process_response` returns for unsuccessful responses.
+        """
+        return {'error': status, 'error_detail': {'success': False, 'errors': [{'code': status, 'message': message}], 'messages': [], 'result': None}}
+
+class Cloudflare(CloudflareProvider, Api):
     """
     Cloudflare API client for interacting with the Cloudflare v4 API.
     Args:
@@ -12,11 +111,17 @@ class Cloudflare(Api):
         token (str): The API token used for authentication.
         base_url (str): The base URL for the Cloudflare v4 API.
     Methods:
+        iter_pages(url, key):
+            Yields every item of a list endpoint, fetching pages after the first concurrently.
+        first_page_url(url), next_page_url(url, data):
+            Page-number pagination, used when pages are fetched one after another.
         process_response(response):
             Processes the HTTP response from the Cloudflare API.
             Attempts to parse the response as JSON. If parsing fails, returns a dictionary with status code and info.
             Returns the parsed output for successful responses (status code 2xx).
             Returns a dictionary with error details for unsuccessful responses.
+        error_response(status, message):
+            Returns an error result in the Cloudflare error format for requests that were never sent.
     """
 
     def __init__(self, email, token):
@@ -30,27 +135,38 @@ class Cloudflare(Api):
         self.email = email
         self.token = token
         self.base_url = 'https://api.cloudflare.com/client/v4/'
+        super().__init__()
 
-    def process_response(self, response):
+    def iter_pages(self, url, key, fresh=False):
         """
-        Processes the API response specific to the Cloudflare API.
-        Attempts to parse the response body as JSON. If parsing fails, returns a dictionary
-        with an informational message and the HTTP status code. For successful responses
-        (status code 2xx), returns the parsed JSON output. For unsuccessful responses,
-        returns a dictionary containing the error status code and the parsed output or error details.
+        Yields the items of a Cloudflare list endpoint across all pages, in page order.
+
+        Page 1 is fetched first to learn `result_info.total_pages`. The remaining pages are
+        then fetched concurrently on a worker pool bounded by `CLOUDFLARE_PAGE_WORKERS`,
+        sharing this client's connection pool, and yielded in order.
+
         Args:
-            response (requests.Response): The HTTP response object returned by the API request.
-        Returns:
-            dict: The parsed JSON output for successful responses, or a dictionary with error
-            information for unsuccessful responses.
+            url (str): The list endpoint path, e.g. 'zones'.
+            key (str): The key in each page's response that holds the list of items.
+            fresh (bool, optional): Set to True to skip the in-memory cache.
+
+        Yields:
+            dict: Each item of the listing, in API order.
+
+        Raises:
+            ApiError: If any page returns an error response.
         """
-        try:
-            output = response.json()
-            # print(output)
-        except requests.exceptions.JSONDecodeError:
-            output = {'info': 'No response body.', 'status': response.status_code}
+        first = self.api_get(self.first_page_url(url), fresh=fresh)
+        if first.get('error'):
+            raise ApiError(first)
+        yield from first.get(key) or []
 
-        if response.status_code >= 200 and response.status_code < 300:
-            return output
-        else:
-            return {'error': response.status_code, 'error_detail': output}
+        page_urls = self.remaining_page_urls(url, first)
+        if not page_urls:
+            return
+        workers = max(1, min(settings.CLOUDFLARE_PAGE_WORKERS, len(page_urls)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for data in executor.map(bind_context(partial(self.api_get, fresh=fresh)), page_urls):
+                if data.get('error'):
+                    raise ApiError(data)
+                yield from data.get(key) or []
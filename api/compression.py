@@ -0,0 +1,197 @@
+"""
+Content-Encoding negotiation and streaming decompression of API response bodies.
+
+gzip and deflate are always supported. Brotli (`pip install brotli`) and Zstandard
+(`pip install zstandard`) are offered to the server only when their modules are
+installed. Bodies are decompressed chunk by chunk as they arrive, counting the bytes
+received on the wire and the bytes they decode to.
+"""
+import zlib
+import requests
+import settings
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+def supported_encodings():
+    """
+    Returns the content codings this client can decode, most preferred last.
+    """
+    encodings = ['gzip', 'deflate']
+    if brotli is not None:
+        encodings.append('br')
+    if zstandard is not None:
+        encodings.append('zstd')
+    return encodings
+
+def accept_encoding():
+    """
+    Returns the `Accept-Encoding` header value sent with API requests.
+
+    `settings.API_ACCEPT_ENCODING` overrides the negotiated list, e.g. 'identity' to
+    turn compression off.
+    """
+    return settings.API_ACCEPT_ENCODING or ', '.join(supported_encodings())
+
+class GzipDecoder():
+    """Decodes a gzip body, including bodies of several concatenated gzip members."""
+
+    def __init__(self):
+        self.decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def decompress(self, data):
+        output = [self.decoder.decompress(data)]
+        while self.decoder.eof and self.decoder.unused_data:
+            data = self.decoder.unused_data
+            self.decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            output.append(self.decoder.decompress(data))
+        return b''.join(output)
+
+    def flush(self):
+        return self.decoder.flush()
+
+class DeflateDecoder():
+    """
+    Decodes a deflate body. Servers send either zlib-wrapped or raw deflate data under
+    this name, so a raw stream is tried when the zlib header does not parse.
+    """
+
+    def __init__(self):
+        self.decoder = zlib.decompressobj()
+        self.head = b''
+
+    def decompress(self, data):
+        if self.head is None:
+            return self.decoder.decompress(data)
+        self.head += data
+        if len(self.head) < 2: # The zlib header is two bytes
+            return b''
+        try:
+            output = self.decoder.decompress(self.head)
+        except zlib.error:
+            self.decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+            output = self.decoder.decompress(self.head)
+        self.head = None
+        return output
+
+    def flush(self):
+        if self.head:
+            return self.decoder.decompress(self.head) + self.decoder.flush()
+        return self.decoder.flush()
+
+class BrotliDecoder():
+    """Decodes a Brotli body."""
+
+    def __init__(self):
+        self.decoder = brotli.Decompressor()
+
+    def decompress(self, data):
+        # brotli names the method `process`, brotlicffi names it `decompress`
+        return self.decoder.process(data) if hasattr(self.decoder, 'process') else self.decoder.decompress(data)
+
+    def flush(self):
+        return b''
+
+class ZstdDecoder():
+    """Decodes a Zstandard body, including bodies of several concatenated frames."""
+
+    def __init__(self):
+        self.decoder = zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(self, data):
+        output = [self.decoder.decompress(data)]
+        while self.decoder.eof and self.decoder.unused_data:
+            data = self.decoder.unused_data
+            self.decoder = zstandard.ZstdDecompressor().decompressobj()
+            output.append(self.decoder.decompress(data))
+        return b''.join(output)
+
+    def flush(self):
+        return b''
+
+DECODERS = {
+    'gzip': GzipDecoder,
+    'x-gzip': GzipDecoder,
+    'deflate': DeflateDecoder,
+    'br': BrotliDecoder if brotli is not None else None,
+    'zstd': ZstdDecoder if zstandard is not None else None,
+}
+
+class DecodedStream():
+    """
+    Decompresses a response body as its chunks arrive and counts its size on the wire
+    and once decoded.
+
+    Iterate over it to read decoded chunks from `chunks`, or call `feed()` with each raw
+    chunk and `finish()` at the end when the chunks arrive asynchronously.
+
+    Args:
+        chunks (iterable, optional): The raw body chunks, as received.
+        content_encoding (str, optional): The response's `Content-Encoding` header.
+            Several codings are undone in reverse order of application.
+
+    Attributes:
+        wire_bytes (int): Bytes received so far, before decoding.
+        decoded_bytes (int): Bytes produced so far, after decoding.
+
+    Raises:
+        requests.exceptions.ContentDecodingError: If a coding is not supported or the body is corrupt.
+    """
+
+    def __init__(self, chunks=None, content_encoding=None):
+        self.chunks = chunks
+        self.decoders = []
+        for coding in reversed([c.strip().lower() for c in (content_encoding or '').split(',')]):
+            if coding in ('', 'identity'):
+                continue
+            decoder = DECODERS.get(coding)
+            if decoder is None:
+                raise requests.exceptions.ContentDecodingError(f"Unsupported Content-Encoding '{coding}'.")
+            self.decoders.append(decoder())
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            data = self.feed(chunk)
+            if data:
+                yield data
+        data = self.finish()
+        if data:
+            yield data
+
+    def feed(self, chunk):
+        """
+        Decodes the next raw chunk and returns the decoded bytes available so far.
+        """
+        self.wire_bytes += len(chunk)
+        try:
+            for decoder in self.decoders:
+                chunk = decoder.decompress(chunk)
+        except Exception as e:
+            raise requests.exceptions.ContentDecodingError(f'Failed to decode the response body: {e}')
+        self.decoded_bytes += len(chunk)
+        return chunk
+
+    def finish(self):
+        """
+        Returns any decoded bytes still buffered once the whole body has been fed.
+        """
+        data = b''
+        try:
+            for decoder in self.decoders:
+                data = decoder.decompress(data) + decoder.flush() if data else decoder.flush()
+        except Exception as e:
+            raise requests.exceptions.ContentDecodingError(f'Failed to decode the response body: {e}')
+        self.decoded_bytes += len(data)
+        return data
@@ -0,0 +1,164 @@
+import codecs
+import json
+
+WHITESPACE = ' \t\r\n'
+
+class JsonArrayStream():
+    """
+    Incrementally parses the array under one top-level key of a JSON object, yielding
+    its items one at a time as chunks of the document arrive.
+
+    Only the item being decoded and the unread part of the current chunk are held in
+    memory, so peak memory does not grow with the length of the array. The other
+    top-level keys are kept and, once the stream is exhausted, are available as
+    `envelope` with the array replaced by an empty list, e.g. for reading pagination
+    links from `meta`.
+
+    Args:
+        chunks (iterable): Chunks of the JSON document, as bytes or str.
+        key (str): The top-level key holding the array, e.g. 'instances' or 'result'.
+
+    Example:
+        >>> stream = JsonArrayStream(response.iter_content(65536), 'instances')
+        >>> for instance in stream:
+        ...     print(instance['id'])
+        >>> stream.envelope['meta']
+    """
+
+    def __init__(self, chunks, key):
+        self.chunks = iter(chunks)
+        self.key = key
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.position = 0
+        self.finished = False
+        self.envelope = None
+
+    def __iter__(self):
+        prefix = self.__scan_to_array()
+        if prefix is None:
+            return
+        while True:
+            self.__skip(WHITESPACE)
+            if self.__peek() == ']':
+                self.position += 1
+                break
+            item = self.__decode_value()
+            yield item
+            self.__skip(WHITESPACE)
+            separator = self.__peek()
+            if separator == ',':
+                self.position += 1
+            elif separator != ']':
+                raise json.JSONDecodeError('Expected , or ] in array', self.buffer, self.position)
+        suffix = self.__read_rest()
+        self.envelope = json.loads(prefix + '[]' + suffix)
+
+    def __scan_to_array(self):
+        """
+        Reads up to the opening bracket of the array under `self.key` and returns the
+        document text before the array. If the key is absent, decodes the whole document
+        into `envelope` and returns None.
+        """
+        prefix = []
+        depth = 0
+        while True:
+            char = self.__peek()
+            if char is None:
+                self.envelope = json.loads(''.join(prefix))
+                return None
+            if char == '"':
+                token = self.__decode_value()
+                prefix.append(json.dumps(token))
+                if depth == 1 and token == self.key:
+                    self.__skip(WHITESPACE)
+                    if self.__peek() == ':':
+                        self.position += 1
+                        prefix.append(':')
+                        self.__skip(WHITESPACE)
+                        if self.__peek() == '[':
+                            self.position += 1
+                            return ''.join(prefix)
+                continue
+            if char in '{[':
+                depth += 1
+            elif char in '}]':
+                depth -= 1
+            prefix.append(char)
+            self.position += 1
+
+    def __decode_value(self):
+        """
+        Decodes the JSON value starting at the current position, reading more chunks until
+        it is complete.
+        """
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if not self.__fill():
+                    raise
+                continue
+            # A number at the very end of the buffer, or cut after its '.', exponent or sign,
+            # may continue in the next chunk
+            if not self.finished and (end == len(self.buffer) or self.__number_cut(value, end)):
+                self.__fill()
+                continue
+            self.position = end
+            return value
+
+    def __number_cut(self, value, end):
+        """
+        Returns whether the number decoded up to `end` stops before a '.', 'e', 'E', '+' or
+        '-' that can only belong to it, as when a chunk ends in '1.' or '2e'.
+        """
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and self.buffer[end] in '.eE+-'
+
+    def __skip(self, characters):
+        while True:
+            char = self.__peek()
+            if char is None or char not in characters:
+                return
+            self.position += 1
+
+    def __peek(self):
+        """
+        Returns the character at the current position, reading more chunks if needed, or
+        None at the end of the document.
+        """
+        while self.position >= len(self.buffer):
+            if not self.__fill():
+                return None
+        return self.buffer[self.position]
+
+    def __fill(self):
+        """
+        Appends the next chunk to the buffer, dropping the part already parsed.
+
+        Returns:
+            bool: False if the document has ended.
+        """
+        if self.finished:
+            return False
+        try:
+            chunk = next(self.chunks)
+        except StopIteration:
+            self.finished = True
+            text = self.text_decoder.decode(b'', final=True)
+        else:
+            text = self.text_decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        self.buffer = self.buffer[self.position:] + text
+        self.position = 0
+        return bool(text) or not self.finished
+
+    def __read_rest(self):
+        """
+        Returns the rest of the document after the array.
+        """
+        rest = [self.buffer[self.position:]]
+        self.position = len(self.buffer)
+        while self.__fill():
+            rest.append(self.buffer)
+            self.position = len(self.buffer)
+        return ''.join(rest)
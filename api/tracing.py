@@ -0,0 +1,215 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import settings
+
+current_span = contextvars.ContextVar('current_span', default=None)
+
+class Span():
+    """
+    A timed operation with attributes, nested under the span that was current when it started.
+
+    Use as a context manager. The span is exported by the tracer when the block exits.
+    """
+
+    def __init__(self, tracer, name, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.parent = current_span.get()
+        self.span_id = tracer.next_id()
+        self.thread_id = threading.get_ident()
+        self.start = None
+        self.duration = None
+        self.token = None
+
+    def set(self, **attributes):
+        """
+        Adds attributes to the span, e.g. the status code once a response arrives.
+        """
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        self.token = current_span.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        current_span.reset(self.token)
+        if exc_type is not None:
+            self.attributes['error'] = exc_type.__name__
+        self.tracer.export(self)
+        return False
+
+class NullSpan():
+    """
+    The span returned while tracing is disabled. Every operation is a no-op.
+    """
+
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NULL_SPAN = NullSpan()
+
+class Tracer():
+    """
+    Writes finished spans to `settings.TRACE_FILE`.
+
+    `settings.TRACE_FORMAT` selects the output:
+        - 'jsonl': one JSON object per span with its id, parent id, start offset and duration in seconds.
+        - 'chrome': Chrome trace-event "complete" events, which chrome://tracing, Perfetto and
+          speedscope open as a flame graph. The file is an unterminated JSON array, which
+          those viewers accept, so spans can be appended as they finish.
+
+    The file is opened on the first span and appended to by every thread.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.file = None
+        self.format = None
+        self.origin = time.perf_counter()
+        self.last_id = 0
+
+    def next_id(self):
+        with self.lock:
+            self.last_id += 1
+            return self.last_id
+
+    def export(self, span):
+        """
+        Appends a finished span to the trace file.
+
+        Args:
+            span (Span): The finished span.
+        """
+        with self.lock:
+            if self.file is None:
+                self.__open()
+            if self.format == 'chrome':
+                event = {
+                    'name': span.name,
+                    'ph': 'X',
+                    'ts': round((span.start - self.origin) * 1e6, 1),
+                    'dur': round(span.duration * 1e6, 1),
+                    'pid': os.getpid(),
+                    'tid': span.thread_id,
+                    'args': span.attributes,
+                }
+                self.file.write(json.dumps(event, default=str) + ',\n')
+            else:
+                record = {
+                    'name': span.name,
+                    'id': span.span_id,
+                    'parent': span.parent.span_id if span.parent else None,
+                    'thread': span.thread_id,
+                    'start': round(span.start - self.origin, 6),
+                    'duration': round(span.duration, 6),
+                    'attributes': span.attributes,
+                }
+                self.file.write(json.dumps(record, default=str) + '\n')
+            self.file.flush()
+
+    def close(self):
+        """
+        Closes the trace file. A later span opens it again in append mode.
+        """
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def __open(self):
+        """
+        Opens the trace file, starting the JSON array when a new Chrome trace is created.
+        """
+        self.format = settings.TRACE_FORMAT
+        directory = os.path.dirname(settings.TRACE_FILE)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        new_file = not os.path.exists(settings.TRACE_FILE) or os.path.getsize(settings.TRACE_FILE) == 0
+        self.file = open(settings.TRACE_FILE, 'a')
+        if self.format == 'chrome' and new_file:
+            self.file.write('[\n')
+
+tracer = Tracer()
+
+def span(name, **attributes):
+    """
+    Starts a span. Returns a shared no-op span when `settings.TRACE_ENABLED` is False.
+
+    Args:
+        name (str): The operation name, e.g. 'Instance.delete_dns'.
+        **attributes: Attributes recorded with the span.
+
+    Returns:
+        Span or NullSpan: A context manager for the span.
+    """
+    if not settings.TRACE_ENABLED:
+        return NULL_SPAN
+    return Span(tracer, name, attributes)
+
+def annotate(**attributes):
+    """
+    Adds attributes to the current span, if there is one.
+    """
+    active = current_span.get()
+    if active is not None:
+        active.set(**attributes)
+
+def bind_context(fn):
+    """
+    Wraps a function so it runs in a copy of the caller's context. Pass work handed to a
+    thread pool through this so its spans nest under the span that submitted it.
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+    return wrapper
+
+class TracedProxy():
+    """
+    Wraps an object so that each call to one of its public methods runs in a span named
+    `<Class>.<method>`. Attribute reads and writes pass through to the wrapped object.
+    """
+
+    def __init__(self, target):
+        object.__setattr__(self, '_target', target)
+        object.__setattr__(self, '_prefix', type(target).__name__)
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if name.startswith('_') or not callable(value):
+            return value
+
+        @functools.wraps(value)
+        def traced_method(*args, **kwargs):
+            with span(f'{self._prefix}.{name}'):
+                return value(*args, **kwargs)
+        return traced_method
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+
+    def __delattr__(self, name):
+        delattr(self._target, name)
+
+def traced(target):
+    """
+    Returns `target` wrapped in a `TracedProxy` when tracing is enabled, otherwise `target` itself.
+    """
+    if not settings.TRACE_ENABLED:
+        return target
+    return TracedProxy(target)
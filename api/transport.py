@@ -0,0 +1,196 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import timedelta
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+import settings
+
+class Cassette():
+    """
+    A JSONL file of recorded HTTP exchanges.
+
+    Each line holds one exchange: the request method, URL and a hash of its body, and the
+    response status, reason, headers, body and elapsed time. Request headers are not
+    recorded, so API tokens never reach the file.
+
+    When replaying, exchanges with the same method, URL and body are served in recorded
+    order, and the last one is repeated once they run out.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.served = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries.setdefault(self.__key(entry['method'], entry['url'], entry['body_hash']), []).append(entry)
+
+    def record(self, request, response, elapsed):
+        """
+        Appends an exchange to the cassette.
+
+        Args:
+            request (requests.PreparedRequest): The request that was sent.
+            response (requests.Response): The response received. Its body has been read.
+            elapsed (float): Seconds from sending the request to reading the whole body.
+        """
+        content = response.content
+        try:
+            body, encoding = content.decode('utf-8'), 'utf-8'
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(content).decode('ascii'), 'base64'
+        entry = {
+            'method': request.method,
+            'url': request.url,
+            'body_hash': body_hash(request.body),
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': dict(response.headers),
+            'body': body,
+            'body_encoding': encoding,
+            'elapsed': round(elapsed, 6),
+        }
+        with self.lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+            self.entries.setdefault(self.__key(entry['method'], entry['url'], entry['body_hash']), []).append(entry)
+
+    def find(self, request):
+        """
+        Returns the next recorded exchange for a request, or None if none was recorded.
+
+        Args:
+            request (requests.PreparedRequest): The request to answer.
+        """
+        key = self.__key(request.method, request.url, body_hash(request.body))
+        with self.lock:
+            entries = self.entries.get(key)
+            if not entries:
+                return None
+            index = self.served.get(key, 0)
+            self.served[key] = index + 1
+            return entries[min(index, len(entries) - 1)]
+
+    def __key(self, method, url, digest):
+        return (method, url, digest)
+
+def body_hash(body):
+    """
+    Returns a short hash of a request body, or None for requests without one.
+    """
+    if body is None:
+        return None
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return hashlib.sha256(body).hexdigest()[:16]
+
+cassettes = {}
+cassettes_lock = threading.Lock()
+
+def get_cassette(path):
+    """
+    Returns the cassette for a path, shared by every client so they append to one file.
+    """
+    with cassettes_lock:
+        if path not in cassettes:
+            cassettes[path] = Cassette(path)
+        return cassettes[path]
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    A transport adapter that sends requests over the network as usual and records each
+    exchange to a cassette.
+    """
+
+    def __init__(self, cassette, **kwargs):
+        self.cassette = cassette
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        response.content # Read the body so the recorded time covers the whole transfer
+        self.cassette.record(request, response, time.perf_counter() - start)
+        return response
+
+class ReplayAdapter(BaseAdapter):
+    """
+    A transport adapter that answers requests from a cassette without using the network.
+
+    Each response is delayed by its recorded elapsed time multiplied by `latency_scale`,
+    so 0 replays as fast as possible and 1 reproduces the recorded latency.
+    """
+
+    def __init__(self, cassette, latency_scale=0.0):
+        super().__init__()
+        self.cassette = cassette
+        self.latency_scale = latency_scale
+
+    def send(self, request, **kwargs):
+        entry = self.cassette.find(request)
+        if entry is None:
+            raise requests.ConnectionError(f'No recorded response for {request.method} {request.url}', request=request)
+        delay = entry['elapsed'] * self.latency_scale
+        if delay > 0:
+            time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = entry['reason']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        if entry['body_encoding'] == 'base64':
+            response._content = base64.b64decode(entry['body'])
+        else:
+            response._content = entry['body'].encode('utf-8')
+        # The recorded body is already decoded, so drop headers that describe the wire form
+        response.headers.pop('Content-Encoding', None)
+        response.headers['Content-Length'] = str(len(response._content))
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=entry['elapsed'])
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+def mount_transport(session, **pool_kwargs):
+    """
+    Mounts the transport selected by `settings.API_TRANSPORT_MODE` on a session.
+
+    Modes:
+        - 'live': a pooled `HTTPAdapter`.
+        - 'record': a pooled `RecordingAdapter` writing to `settings.API_CASSETTE_FILE`.
+        - 'replay': a `ReplayAdapter` reading `settings.API_CASSETTE_FILE`, delayed by
+          `settings.API_REPLAY_LATENCY_SCALE`.
+
+    Args:
+        session (requests.Session): The session to configure.
+        **pool_kwargs: Connection pool arguments passed to `HTTPAdapter`.
+
+    Returns:
+        requests.Session: The session.
+    """
+    mode = settings.API_TRANSPORT_MODE
+    if mode == 'record':
+        adapter = RecordingAdapter(get_cassette(settings.API_CASSETTE_FILE), **pool_kwargs)
+    elif mode == 'replay':
+        adapter = ReplayAdapter(get_cassette(settings.API_CASSETTE_FILE), settings.API_REPLAY_LATENCY_SCALE)
+    else:
+        adapter = HTTPAdapter(**pool_kwargs)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
@@ -1,55 +1,104 @@
-import requests
-from .api import Api
+import jsoncodec
+from .api import Api, Provider, with_query
 
-class Vultr(Api):
+class VultrProvider(Provider):
     """
-    A client for interacting with the Vultr API.
-    Args:
-        token (str): The API token used for authenticating requests.
-    Attributes:
-        token (str): The API token.
-        base_url (str): The base URL for the Vultr API.
+    The Vultr API's pagination and response format, shared by `Vultr` and `AsyncVultr`.
     Methods:
+        first_page_url(url):
+            Requests the largest allowed page size for a list endpoint.
+        next_page_url(url, data):
+            Follows the `meta.links.next` cursor of a list response.
         process_response(response):
-            Processes the HTTP response from the Vultr API.
-            Attempts to parse the response as JSON. If parsing fails, returns a dictionary with status code and info.
-            Returns the parsed output for successful responses (status code 2xx).
-            Returns a dictionary with error details for unsuccessful responses.
+            Parses a response into its JSON output, or a dictionary with error details.
     """
 
-    def __init__(self, token):
+    provider = 'vultr'
+    page_size = 500 # Largest per_page value accepted by the Vultr API
+
+    def first_page_url(self, url):
         """
-        Initialize the API client with the provided authentication token.
+        Returns the URL of the first page of a Vultr list endpoint at the largest page size.
 
         Args:
-            token (str): The API token used for authenticating requests.
+            url (str): The list endpoint path.
 
-        Attributes:
-            token (str): Stores the provided API token.
-            base_url (str): The base URL for the Vultr API v2.
+        Returns:
+            str: The URL with `per_page` set.
         """
-        self.token = token
-        self.base_url = 'https://api.vultr.com/v2/'
+        return with_query(url, {'per_page': self.page_size})
+
+    def next_page_url(self, url, data):
+        """
+        Returns the URL of the next page using the cursor in `meta.links.next`.
+
+        Args:
+            url (str): The list endpoint path.
+            data (dict): The parsed response of the current page.
+
+        Returns:
+            str or None: The next page URL, or None if this was the last page.
+        """
+        cursor = data.get('meta', {}).get('links', {}).get('next')
+        if not cursor:
+            return None
+        return with_query(url, {'per_page': self.page_size, 'cursor': cursor})
 
     def process_response(self, response):
         """
         Processes the API response specific to the Vultr API.
-        Attempts to parse the response body as JSON. If parsing fails, returns a dictionary
+        Attempts to parse the response body as JSON with the fastest available backend. If parsing fails, returns a dictionary
         with an informational message and the HTTP status code. For successful responses
         (status code 2xx), returns the parsed JSON output. For unsuccessful responses,
         returns a dictionary containing the error status code and the parsed output or error details.
         Args:
-            response (requests.Response): The HTTP response object returned by the requests library.
+            response (requests.Response or AsyncResponse): The HTTP response, from requests or from `AsyncApi`.
         Returns:
             dict: The parsed JSON response for successful requests, or a dictionary with error details for failed requests.
         """
         try:
-            output = response.json()
+            output = jsoncodec.loads(response.content)
             # print(output)
-        except requests.exceptions.JSONDecodeError:
+        except jsoncodec.JSONDecodeError:
             output = {'info': 'No response body.', 'status': response.status_code}
 
         if response.status_code >= 200 and response.status_code < 300:
             return output
         else:
             return {'error': response.status_code, 'error_detail': output}
+
+class Vultr(VultrProvider, Api):
+    """
+    A client for interacting with the Vultr API.
+    Args:
+        token (str): The API token used for authenticating requests.
+    Attributes:
+        token (str): The API token.
+        base_url (str): The base URL for the Vultr API.
+    Methods:
+        first_page_url(url):
+            Requests the largest allowed page size for a list endpoint.
+        next_page_url(url, data):
+            Follows the `meta.links.next` cursor of a list response.
+        process_response(response):
+            Processes the HTTP response from the Vultr API.
+            Attempts to parse the response as JSON. If parsing fails, returns a dictionary with status code and info.
+            Returns the parsed output for successful responses (status code 2xx).
+            Returns a dictionary with error details for unsuccessful responses.
+    """
+
+    def __init__(self, token):
+        """
+        Initialize the API client with the provided authentication token.
+
+        Args:
+            token (str): The API token used for authenticating requests.
+
+        Attributes:
+            token (str): Stores the provided API token.
+            base_url (str): The base URL for the Vultr API v2.
+            session (requests.Session): The pooled session shared by all requests.
+        """
+        self.token = token
+        self.base_url = 'https://api.vultr.com/v2/'
+        super().__init__()
@@ -0,0 +1,106 @@
+"""
+Compares the catalog cache formats by file size, load time and save time.
+
+Writes a scaled plans catalog, with long per-plan `locations` arrays, in every format
+`data.py` supports and times `read_data_cache` and `create_data_cache` on it. JSON is
+measured with the backend `jsoncodec` selects and, when that is orjson, also with the
+standard library. Run from the repository root:
+
+    python -m benchmarks.bench_cache_format --scale 10
+"""
+import argparse
+import contextlib
+import os
+import tempfile
+import timeit
+from tabulate import tabulate
+import settings
+from util import apply_setting_defaults
+
+apply_setting_defaults()
+
+import data
+import jsoncodec
+from benchmarks.standin_server import Dataset
+
+def build_catalog(scale):
+    """
+    Returns a plans catalog of `32 * 10 * scale` plans, each available in 40 of 100 regions.
+    """
+    dataset = Dataset(seed=0, instances=0, firewall_groups=0, snapshots=0, zones=0, dns_records=0)
+    region_ids = [f"{region['id']}{n}" for n in range(5) for region in dataset.regions]
+    plans = []
+    for n in range(10 * scale):
+        for plan in dataset.plans:
+            locations = sorted(dataset.random.sample(region_ids, 40))
+            plans.append(dict(plan, id=f"{plan['id']}-{n}", locations=locations))
+    return {'plans': plans, 'meta': {'total': len(plans)}}
+
+@contextlib.contextmanager
+def json_backend(name):
+    """
+    Makes `jsoncodec` use the standard library while the block runs if `name` is 'json'.
+    """
+    original = jsoncodec.orjson
+    if name == 'json':
+        jsoncodec.orjson = None
+    try:
+        yield
+    finally:
+        jsoncodec.orjson = original
+
+def measure(fn, repeat):
+    """
+    Returns the best time of one call to `fn` in seconds over `repeat` runs.
+    """
+    timer = timeit.Timer(fn)
+    number = max(1, int(0.2 / max(timer.timeit(1), 1e-6)))
+    return min(timer.repeat(repeat, number)) / number
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scale', type=int, default=10, help='Catalog multiplier. Scale 1 is 320 plans.')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per benchmark; the best is reported.')
+    args = parser.parse_args()
+
+    formats = [('json', jsoncodec.BACKEND)]
+    if jsoncodec.BACKEND != 'json':
+        formats.append(('json', 'json'))
+    if data.msgpack is not None:
+        formats.append(('msgpack', None))
+    else:
+        print('msgpack is not installed; only the JSON format is measured (pip install msgpack).')
+
+    catalog = build_catalog(args.scale)
+    file_name = 'vultr_plans.json'
+    cwd = os.getcwd()
+    rows = []
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            for fmt, backend in formats:
+                settings.DATA_CACHE_FORMAT = fmt
+                with json_backend(backend):
+                    data.create_data_cache(file_name, catalog)
+                    size = os.path.getsize(data.cache_path(file_name))
+                    load = measure(lambda: data.read_data_cache(file_name), args.repeat)
+                    # A changed TTL forces a full rewrite instead of the unchanged-content shortcut
+                    ttls = iter(range(10 ** 9))
+                    save = measure(lambda: data.create_data_cache(file_name, catalog, ttl=next(ttls)), args.repeat)
+                name = f'{fmt} ({backend})' if backend else fmt
+                results[name] = (size, load)
+                rows.append([name, f'{size / 1e6:.2f}', f'{load * 1000:.2f}', f'{save * 1000:.2f}'])
+        finally:
+            os.chdir(cwd)
+
+    print(f"{catalog['meta']['total']} plans")
+    print(tabulate(rows, headers=['Format', 'Size (MB)', 'Load (ms)', 'Save (ms)']))
+    if 'msgpack' in results:
+        msgpack_size, msgpack_load = results['msgpack']
+        for name, (size, load) in results.items():
+            if name != 'msgpack':
+                print(f'msgpack vs {name}: {size / msgpack_size:.1f}x smaller, {load / msgpack_load:.1f}x load speed')
+
+if __name__ == '__main__':
+    main()
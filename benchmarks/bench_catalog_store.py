@@ -0,0 +1,77 @@
+"""
+Compares the file and SQLite catalog stores on startup and on the catalog lookups.
+
+Writes scaled plan and region catalogs, as `bench_hot_paths` does, into each store and
+times constructing `Region` and `Plan`, `Region.city_from_id` and the plan filters.
+Run from the repository root:
+
+    python -m benchmarks.bench_catalog_store --scale 4
+"""
+import argparse
+import os
+import tempfile
+from tabulate import tabulate
+import settings
+from util import apply_setting_defaults
+
+apply_setting_defaults()
+
+import data
+from benchmarks.bench_hot_paths import build_fixtures, measure
+from endpoints.vultr.plan import Plan
+from endpoints.vultr.region import Region
+
+def lookups(region_id, preferred_plan_ids):
+    """
+    Returns the benchmarks as `(name, callable)` pairs, for the store currently selected.
+    """
+    region = Region(None)
+    region.region_id = region_id
+    plan = Plan(None, region)
+    plan.preferred_plan_ids = preferred_plan_ids
+
+    def startup():
+        Plan(None, Region(None))
+
+    return [
+        ('Region + Plan startup', startup),
+        ('Region.city_from_id', lambda: region.city_from_id(region_id)),
+        ('Plan.get_preferred_plans', plan.get_preferred_plans),
+        ('Plan.get_region_plans', plan.get_region_plans),
+        ('Plan.get_preferred_region_plans', plan.get_preferred_region_plans),
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scale', type=int, default=1, help='Dataset multiplier. Scale 1 is 320 plans and 100 regions.')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per benchmark; the best is reported.')
+    args = parser.parse_args()
+
+    if data.sqlite3 is None:
+        print('This Python has no sqlite3 module; only the file store can be used.')
+        return
+
+    cwd = os.getcwd()
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            settings.DATA_CACHE_STORE = 'file'
+            fixtures = build_fixtures(args.scale, workdir)
+            region_id = fixtures['region'].region_id
+            preferred_plan_ids = fixtures['plan'].preferred_plan_ids
+            for store in ('file', 'sqlite'):
+                settings.DATA_CACHE_STORE = store # The first load moves the catalogs into the database
+                for name, fn in lookups(region_id, preferred_plan_ids):
+                    results.setdefault(name, {})[store] = measure(fn, args.repeat)
+        finally:
+            os.chdir(cwd)
+
+    rows = []
+    for name, times in results.items():
+        rows.append([name, f"{times['file'] * 1e6:.1f}", f"{times['sqlite'] * 1e6:.1f}", f"{times['file'] / times['sqlite']:.2f}x"])
+    print(f"{len(fixtures['menu_options'])} plans")
+    print(tabulate(rows, headers=['Benchmark', 'File (us)', 'SQLite (us)', 'SQLite speedup']))
+
+if __name__ == '__main__':
+    main()
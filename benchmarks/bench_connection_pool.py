@@ -0,0 +1,71 @@
+"""
+Compares cold and pooled request latency against a local stand-in server.
+
+Cold requests use module-level `requests.get`, which opens a new connection for
+every call. Pooled requests go through a `Vultr` client, which reuses keep-alive
+connections from its session. Run from the repository root:
+
+    python -m benchmarks.bench_connection_pool --requests 500
+"""
+import argparse
+import statistics
+import time
+import requests
+from tabulate import tabulate
+import settings
+from util import apply_setting_defaults
+
+apply_setting_defaults()
+# Measure connection reuse only, without client-side rate limiting or console output
+settings.API_RATE_LIMITS = {'vultr': {'rate': 1e9, 'burst': 1e9}}
+settings.PRINT_API_RESPONSE_SUMMARY = False
+
+from api.vultr import Vultr
+from benchmarks.standin_server import start_server, vultr_url
+
+def time_calls(call, count):
+    """
+    Calls `call` `count` times and returns the latency of each call in seconds.
+    """
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def summarize(name, timings):
+    """
+    Returns a table row with the mean, median, p95 and total latency in milliseconds.
+    """
+    ordered = sorted(timings)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    return [
+        name,
+        f'{statistics.mean(ordered) * 1000:.3f}',
+        f'{statistics.median(ordered) * 1000:.3f}',
+        f'{p95 * 1000:.3f}',
+        f'{sum(ordered) * 1000:.1f}',
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=200, help='Number of requests per mode.')
+    args = parser.parse_args()
+
+    server = start_server()
+    base_url = vultr_url(server)
+    try:
+        cold = time_calls(lambda: requests.get(base_url + 'account'), args.requests)
+        with Vultr('benchmark-token') as api:
+            api.base_url = base_url
+            pooled = time_calls(lambda: api.api_get('account'), args.requests)
+    finally:
+        server.shutdown()
+
+    rows = [summarize('cold', cold), summarize('pooled', pooled)]
+    print(tabulate(rows, headers=['Mode', 'Mean ms', 'p50 ms', 'p95 ms', 'Total ms']))
+    print(f'Speedup (mean): {statistics.mean(cold) / statistics.mean(pooled):.2f}x')
+
+if __name__ == '__main__':
+    main()
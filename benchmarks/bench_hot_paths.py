@@ -0,0 +1,210 @@
+"""
+Benchmarks the client's hot paths on a scaled synthetic dataset and checks them against a baseline.
+
+Covers catalog loading (`Plan.load_plans`, `Region.load_regions`, both timed through the
+first lookup that decodes the catalog and, separately, opening alone), plan filtering,
+DNS record matching, `print_input_menu` rendering, `utc_str_to_local`, and `Api`
+request overhead against the local stand-in server. Each benchmark reports the best
+per-call time over several runs. Run from the repository root:
+
+    python -m benchmarks.bench_hot_paths --scale 4 --save-baseline
+    python -m benchmarks.bench_hot_paths --scale 4
+
+The second form exits with status 1 if any benchmark is slower than its baseline by
+more than `--threshold`, so it can gate CI. Baselines are machine-specific, so none is
+committed: the first run on a machine, when `--baseline` does not exist yet, records
+it, and later runs compare against it.
+"""
+import argparse
+import builtins
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import timeit
+from tabulate import tabulate
+import settings
+from util import apply_setting_defaults
+
+apply_setting_defaults()
+# Measure client overhead only, without client-side rate limiting or console output
+settings.API_RATE_LIMITS = {'vultr': {'rate': 1e9, 'burst': 1e9}, 'cloudflare': {'rate': 1e9, 'burst': 1e9}}
+settings.API_DISK_CACHE = False
+settings.PRINT_API_RESPONSE_SUMMARY = False
+
+from api.vultr import Vultr
+from benchmarks.standin_server import Dataset, start_server, vultr_url
+from data import create_data_cache
+from endpoints.cloudflare.zone import Zone
+from endpoints.vultr.plan import Plan
+from endpoints.vultr.region import Region
+from util import print_input_menu, utc_str_to_local
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'baselines', 'hot_paths.json')
+
+def build_fixtures(scale, workdir):
+    """
+    Writes scaled plan and region catalogs into `workdir/data` and returns the objects
+    and inputs shared by the benchmarks.
+
+    Args:
+        scale (int): Dataset multiplier. Scale 1 is 320 plans, 100 regions, 5000 DNS records and 5000 timestamps.
+        workdir (str): The directory the catalogs are written under. It must be the working directory.
+
+    Returns:
+        dict: The fixtures, keyed by name.
+    """
+    dataset = Dataset(seed=0, instances=0, firewall_groups=0, snapshots=0, zones=1, dns_records=5000 * scale)
+    region_ids = [f"{region['id']}{n}" for n in range(5 * scale) for region in dataset.regions]
+    regions = [dict(region, id=f"{region['id']}{n}") for n in range(5 * scale) for region in dataset.regions]
+    plans = []
+    for n in range(10 * scale):
+        for plan in dataset.plans:
+            locations = sorted(dataset.random.sample(region_ids, min(len(region_ids), 40)))
+            plans.append(dict(plan, id=f"{plan['id']}-{n}", locations=locations))
+    create_data_cache('vultr_plans.json', {'plans': plans, 'meta': {'total': len(plans)}})
+    create_data_cache('vultr_regions.json', {'regions': regions, 'meta': {'total': len(regions)}})
+
+    zone_detail = next(iter(dataset.zones.values()))
+    zone = Zone(None)
+    zone.zone_id = zone_detail['id']
+    zone.zone_detail = zone_detail
+    zone.dns_records = list(dataset.dns_records[zone_detail['id']].values())
+
+    region = Region(None)
+    region.region_id = region_ids[len(region_ids) // 2]
+    plan = Plan(None, region)
+    plan.preferred_plan_ids = [p['id'] for p in plans[::7]]
+
+    return {
+        'plan': plan,
+        'region': region,
+        'zone': zone,
+        'menu_options': plans,
+        'timestamps': [record['created_on'] for record in zone.dns_records],
+    }
+
+def hot_paths(fixtures, api):
+    """
+    Returns the benchmarks as `(name, callable)` pairs.
+    """
+    plan, region, zone = fixtures['plan'], fixtures['region'], fixtures['zone']
+    menu_options, timestamps = fixtures['menu_options'], fixtures['timestamps']
+    missing = {'name': 'missing', 'type': 'A', 'content': '192.0.2.1'}
+    last = zone.dns_records[-1]
+    last_name = last['name'].removesuffix('.' + zone.zone_detail['name'])
+    display = ['id', 'ram', 'disk', 'vcpu_count', 'bandwidth', 'monthly_cost_str', 'type']
+
+    def render_menu():
+        with scripted_input('1'), contextlib.redirect_stdout(io.StringIO()):
+            print_input_menu(menu_options, '', 'id', display, False)
+
+    def load_plans():
+        # Catalogs are decoded on first lookup; include the decode so this stays a full load
+        plan.load_plans()
+        plan.catalog.all()
+
+    def match_by_name_content():
+        with contextlib.redirect_stdout(io.StringIO()):
+            zone.get_dns_record_by_name_content(last_name, last['content'])
+
+    return [
+        ('Plan.load_plans', load_plans),
+        ('Region.load_regions', lambda: region.load_regions().all()),
+        ('Plan.load_plans (open only)', plan.load_plans),
+        ('Region.load_regions (open only)', region.load_regions),
+        ('Plan.get_region_plans', plan.get_region_plans),
+        ('Plan.get_preferred_region_plans', plan.get_preferred_region_plans),
+        ('Zone.__does_dns_record_exist (miss)', lambda: zone._Zone__does_dns_record_exist(missing)),
+        ('Zone.get_dns_record_by_name_content', match_by_name_content),
+        (f'print_input_menu ({len(menu_options)} options)', render_menu),
+        (f'utc_str_to_local ({len(timestamps)} timestamps)', lambda: [utc_str_to_local(t) for t in timestamps]),
+        ('Api.api_get (stand-in server)', lambda: api.api_get('account')),
+        ('Api.api_get (memory cache hit)', lambda: api.api_get('regions')),
+    ]
+
+@contextlib.contextmanager
+def scripted_input(answer):
+    """
+    Answers every `input()` prompt with `answer` while the block runs.
+    """
+    original = builtins.input
+    builtins.input = lambda prompt='': answer
+    try:
+        yield
+    finally:
+        builtins.input = original
+
+def measure(fn, repeat, min_time=0.05):
+    """
+    Returns the best per-call time of `fn` in seconds over `repeat` runs, each long enough
+    to take at least `min_time` seconds.
+    """
+    timer = timeit.Timer(fn)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    return min(timer.repeat(repeat, number)) / number
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scale', type=int, default=1, help='Dataset multiplier.')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per benchmark; the best is reported.')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='Baseline file to compare with or save to.')
+    parser.add_argument('--save-baseline', action='store_true', help='Save the results as the new baseline. Done automatically when none exists.')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed slowdown over the baseline, as a fraction.')
+    args = parser.parse_args()
+
+    baseline = {}
+    if not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}; this run will be saved as the baseline.')
+        args.save_baseline = True
+    elif not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('scale') != args.scale:
+            print(f"Baseline was recorded at scale {baseline.get('scale')}; rerun with --scale {baseline.get('scale')}.")
+            return 2
+
+    server = start_server()
+    cwd = os.getcwd()
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir, Vultr('benchmark-token') as api:
+        os.chdir(workdir)
+        try:
+            api.base_url = vultr_url(server)
+            api.api_get('regions')
+            for name, fn in hot_paths(build_fixtures(args.scale, workdir), api):
+                results[name] = measure(fn, args.repeat)
+        finally:
+            os.chdir(cwd)
+            server.shutdown()
+
+    rows = []
+    regressions = []
+    for name, seconds in results.items():
+        base = baseline.get('results', {}).get(name)
+        change = ''
+        if base:
+            ratio = seconds / base
+            change = f'{(ratio - 1) * 100:+.1f}%'
+            if ratio > 1 + args.threshold:
+                regressions.append(name)
+                change += ' REGRESSION'
+        rows.append([name, f'{seconds * 1e6:.1f}', f'{base * 1e6:.1f}' if base else '', change])
+    print(tabulate(rows, headers=['Benchmark', 'Time (us)', 'Baseline (us)', 'Change']))
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump({'scale': args.scale, 'python': sys.version.split()[0], 'results': results}, f, indent=2)
+        print(f'Baseline saved to {args.baseline}')
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Compares the standard library `json` module with orjson on the client's JSON workloads.
+
+Decodes a plans catalog and a large instance list the way `process_response` and
+`load_data_cache` do, and encodes them the way `create_data_cache` and the disk
+cache do. `jsoncodec` picks orjson automatically when it is installed. Run from the
+repository root:
+
+    python -m benchmarks.bench_json_codec --instances 10000
+"""
+import argparse
+import json
+import timeit
+from tabulate import tabulate
+from benchmarks.standin_server import Dataset
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def documents(instance_count):
+    """
+    Returns the benchmark documents as `(name, object)` pairs.
+    """
+    dataset = Dataset(seed=0, instances=instance_count, firewall_groups=0, snapshots=0, zones=0, dns_records=0)
+    plans = [dict(plan, id=f"{plan['id']}-{n}") for n in range(10) for plan in dataset.plans]
+    instances = list(dataset.instances.values())
+    return [
+        (f'plans catalog ({len(plans)} plans)', {'plans': plans, 'meta': {'total': len(plans)}}),
+        (f'instance list ({len(instances)} instances)', {'instances': instances, 'meta': {'total': len(instances)}}),
+    ]
+
+def codecs():
+    """
+    Returns the available backends as `(name, loads, dumps)` triples. Both take and
+    return UTF-8 bytes, as `jsoncodec` does.
+    """
+    backends = [('json', lambda data: json.loads(data.decode('utf-8')),
+                 lambda obj: json.dumps(obj, ensure_ascii=False).encode('utf-8'))]
+    if orjson is not None:
+        backends.append(('orjson', orjson.loads, orjson.dumps))
+    return backends
+
+def measure(fn, repeat):
+    """
+    Returns the best time of one call to `fn` in seconds over `repeat` runs.
+    """
+    timer = timeit.Timer(fn)
+    number = max(1, int(0.2 / max(timer.timeit(1), 1e-6)))
+    return min(timer.repeat(repeat, number)) / number
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--instances', type=int, default=10000, help='Instances in the instance list.')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per benchmark; the best is reported.')
+    args = parser.parse_args()
+
+    if orjson is None:
+        print('orjson is not installed; only the standard library backend is measured (pip install orjson).')
+
+    rows = []
+    for name, document in documents(args.instances):
+        encoded = orjson.dumps(document) if orjson is not None else json.dumps(document).encode('utf-8')
+        timings = {}
+        for backend, loads, dumps in codecs():
+            timings[backend] = (measure(lambda: loads(encoded), args.repeat), measure(lambda: dumps(document), args.repeat))
+        for backend, (load_time, dump_time) in timings.items():
+            speedup = ''
+            if backend != 'json':
+                speedup = f"{timings['json'][0] / load_time:.1f}x / {timings['json'][1] / dump_time:.1f}x"
+            rows.append([name, f'{len(encoded) / 1e6:.2f}', backend, f'{load_time * 1000:.2f}', f'{dump_time * 1000:.2f}', speedup])
+    print(tabulate(rows, headers=['Document', 'MB', 'Backend', 'loads ms', 'dumps ms', 'Speedup (loads / dumps)']))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Measures the catalog part of startup: what `Menu` spends building `Region`, `Plan`,
+`OS` and `Application` from their caches.
+
+"Before" loads and decodes all four caches with `load_data_cache`, as the constructors
+did before catalogs were opened lazily. "After" constructs the four objects, which only
+maps the cache files (or reads the SQLite metadata), and "After + lookup" adds one
+`Region.city_from_id` call, which decodes the regions catalog alone. Each is measured
+for every available store and format, with the memory held by the result. Run from
+the repository root:
+
+    python -m benchmarks.bench_startup --scale 4
+"""
+import argparse
+import os
+import tempfile
+import tracemalloc
+from tabulate import tabulate
+import settings
+from util import apply_setting_defaults
+
+apply_setting_defaults()
+
+import data
+from benchmarks.bench_hot_paths import build_fixtures, measure
+from benchmarks.standin_server import Dataset
+from endpoints.vultr.application import Application
+from endpoints.vultr.os import OS
+from endpoints.vultr.plan import Plan
+from endpoints.vultr.region import Region
+
+CACHE_FILES = ['vultr_regions.json', 'vultr_plans.json', 'vultr_os.json', 'vultr_applications.json']
+
+def before():
+    """
+    Loads every catalog cache in full, as startup did before catalogs were opened lazily.
+    """
+    return [data.load_data_cache(file_name) for file_name in CACHE_FILES]
+
+def after():
+    """
+    Constructs the catalog objects as `Menu` does.
+    """
+    region = Region(None)
+    return region, Plan(None, region), OS(None), Application(None)
+
+def after_lookup(region_id):
+    """
+    Returns a function that constructs the catalog objects and looks up one region.
+    """
+    def run():
+        objects = after()
+        objects[0].city_from_id(region_id)
+        return objects
+    return run
+
+def allocated(fn):
+    """
+    Returns the bytes still allocated by the result of `fn`.
+    """
+    tracemalloc.start()
+    try:
+        result = fn()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scale', type=int, default=1, help='Dataset multiplier. Scale 1 is 320 plans and 100 regions.')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per benchmark; the best is reported.')
+    args = parser.parse_args()
+
+    stores = [('file', 'json')]
+    if data.msgpack is not None:
+        stores.append(('file', 'msgpack'))
+    if data.sqlite3 is not None:
+        stores.append(('sqlite', 'json'))
+
+    cwd = os.getcwd()
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            settings.DATA_CACHE_STORE, settings.DATA_CACHE_FORMAT = stores[0]
+            fixtures = build_fixtures(args.scale, workdir)
+            dataset = Dataset(seed=0, instances=0, firewall_groups=0, snapshots=0, zones=0, dns_records=0)
+            data.create_data_cache('vultr_os.json', {'os': dataset.os, 'meta': {'total': len(dataset.os)}})
+            data.create_data_cache('vultr_applications.json', {'applications': dataset.applications, 'meta': {'total': len(dataset.applications)}})
+            region_id = fixtures['region'].region_id
+            for store, fmt in stores:
+                settings.DATA_CACHE_STORE, settings.DATA_CACHE_FORMAT = store, fmt
+                before() # Moves the caches into this store and format
+                times = [measure(fn, args.repeat) for fn in (before, after, after_lookup(region_id))]
+                sizes = [allocated(fn) for fn in (before, after, after_lookup(region_id))]
+                name = store if store == 'sqlite' else f'{store} ({fmt})'
+                rows.append([name] + [f'{t * 1000:.3f}' for t in times] + [f'{times[0] / times[1]:.0f}x']
+                            + [f'{size / 1e6:.2f}' for size in sizes])
+        finally:
+            os.chdir(cwd)
+
+    print(f"{len(fixtures['menu_options'])} plans")
+    print(tabulate(rows, headers=['Store', 'Before (ms)', 'After (ms)', 'After + lookup (ms)', 'Speedup',
+                                  'Before (MB)', 'After (MB)', 'After + lookup (MB)']))
+
+if __name__ == '__main__':
+    main()
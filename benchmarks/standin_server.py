@@ -0,0 +1,778 @@
+"""
+Local stand-in for the Vultr v2 and Cloudflare v4 APIs used by `endpoints/`.
+
+The server implements the subset of both APIs the clients call, against a seeded
+synthetic dataset: instances, firewall groups and rules, snapshots, plans, regions,
+os, applications, zones and DNS records. List endpoints paginate the way the real
+APIs do (Vultr cursors under `meta.links`, Cloudflare `page`/`result_info`), catalog
+responses carry ETags, large bodies are gzipped for clients that accept it, and the
+server can add latency and inject 429 responses so the client can be load-tested
+against large fleets. Vultr is served under `/v2/` and Cloudflare under `/client/v4/`.
+Run from the repository root:
+
+    python -m benchmarks.standin_server --instances 10000 --dns-records 5000 --latency 0.02
+
+and point a client at it by setting its `base_url`, e.g. `api.base_url = vultr_url(server)`.
+"""
+import argparse
+import base64
+import gzip
+import hashlib
+import ipaddress
+import json
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+VULTR_PREFIX = '/v2/'
+CLOUDFLARE_PREFIX = '/client/v4/'
+
+class Dataset():
+    """
+    A seeded synthetic Vultr account and Cloudflare zones.
+
+    The same seed and sizes always produce the same data, so benchmark runs are comparable.
+
+    Args:
+        seed (int): Seed of the random generator.
+        instances (int): Number of instances.
+        firewall_groups (int): Number of firewall groups.
+        firewall_rules (int): Number of rules in each firewall group.
+        snapshots (int): Number of snapshots.
+        zones (int): Number of Cloudflare zones.
+        dns_records (int): Number of DNS records in each zone.
+    """
+
+    def __init__(self, seed=0, instances=10000, firewall_groups=20, firewall_rules=500, snapshots=200, zones=3, dns_records=5000):
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.epoch = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.regions = self.__make_regions()
+        self.os = self.__make_os()
+        self.applications = self.__make_applications()
+        self.plans = self.__make_plans()
+        self.firewall_groups = {}
+        self.firewall_rules = {}
+        for _ in range(firewall_groups):
+            group = self.__make_firewall_group()
+            self.firewall_groups[group['id']] = group
+            self.firewall_rules[group['id']] = [self.__make_firewall_rule(n + 1) for n in range(firewall_rules)]
+            group['rule_count'] = firewall_rules
+        self.instances = {}
+        for n in range(instances):
+            instance = self.make_instance({'label': f'host-{n:05d}'})
+            self.instances[instance['id']] = instance
+        self.snapshots = {}
+        for n in range(snapshots):
+            snapshot = self.make_snapshot({'description': f'snapshot-{n:04d}'})
+            self.snapshots[snapshot['id']] = snapshot
+        self.zones = {}
+        self.dns_records = {}
+        for n in range(zones):
+            zone = self.__make_zone(f'example{n}.com')
+            self.zones[zone['id']] = zone
+            self.dns_records[zone['id']] = {}
+            for m in range(dns_records):
+                record = self.make_dns_record(zone, {})
+                self.dns_records[zone['id']][record['id']] = record
+
+    def timestamp(self, days=None):
+        """Returns an ISO 8601 timestamp, a random number of days after the dataset epoch unless given."""
+        if days is None:
+            days = self.random.uniform(0, 600)
+        return (self.epoch + timedelta(days=days)).strftime('%Y-%m-%dT%H:%M:%S+00:00')
+
+    def ip4(self):
+        return str(ipaddress.IPv4Address(self.random.randint(0x2D000000, 0xDFFFFFFF)))
+
+    def ip6(self):
+        return str(ipaddress.IPv6Address((0x2001 << 112) | self.random.getrandbits(96)))
+
+    def uuid(self):
+        return str(uuid.UUID(int=self.random.getrandbits(128), version=4))
+
+    def hex_id(self):
+        return f'{self.random.getrandbits(128):032x}'
+
+    def make_instance(self, body):
+        """Returns a new instance built from a create-instance request body."""
+        region = body.get('region') or self.random.choice(self.regions)['id']
+        plan = body.get('plan') or self.random.choice(self.plans)
+        plan = plan if isinstance(plan, dict) else next((p for p in self.plans if p['id'] == plan), self.plans[0])
+        os_id = body.get('os_id') or self.random.choice(self.os)['id']
+        os_name = next((o['name'] for o in self.os if o['id'] == os_id), 'Custom')
+        label = body.get('label', '')
+        return {
+            'id': self.uuid(),
+            'os': os_name,
+            'ram': plan['ram'],
+            'disk': plan['disk'],
+            'main_ip': self.ip4(),
+            'vcpu_count': plan['vcpu_count'],
+            'region': region,
+            'plan': plan['id'],
+            'date_created': self.timestamp(),
+            'status': 'active',
+            'allowed_bandwidth': plan['bandwidth'],
+            'netmask_v4': '255.255.254.0',
+            'gateway_v4': '10.0.0.1',
+            'power_status': 'running',
+            'server_status': 'ok',
+            'v6_network': '2001:19f0::',
+            'v6_main_ip': self.ip6() if body.get('enable_ipv6') == 'true' else '',
+            'v6_network_size': 64,
+            'label': label,
+            'internal_ip': '',
+            'kvm': '',
+            'hostname': body.get('hostname', label),
+            'tag': '',
+            'tags': list(body.get('tags') or self.random.choice([[], ['web'], ['prod'], ['dev', 'web']])),
+            'os_id': os_id,
+            'app_id': body.get('app_id', 0),
+            'image_id': body.get('image_id', ''),
+            'firewall_group_id': body.get('firewall_group_id', ''),
+            'features': [],
+            'user_scheme': 'root',
+            'pending_charges': round(self.random.uniform(0, 40), 2),
+        }
+
+    def make_snapshot(self, body):
+        """Returns a new snapshot built from a create-snapshot request body."""
+        size = self.random.randint(2, 80) * 1024 ** 3
+        return {
+            'id': self.uuid(),
+            'date_created': self.timestamp(),
+            'description': body.get('description', ''),
+            'size': size,
+            'compressed_size': size // 3,
+            'status': 'complete',
+            'os_id': self.random.choice(self.os)['id'],
+            'app_id': 0,
+        }
+
+    def make_firewall_rule(self, group_id, body):
+        """Returns a new firewall rule built from a create-rule request body."""
+        rules = self.firewall_rules[group_id]
+        rule_id = max((r['id'] for r in rules), default=0) + 1
+        ip_type = body.get('ip_type', 'v4')
+        return {
+            'id': rule_id,
+            'type': ip_type,
+            'ip_type': ip_type,
+            'action': 'accept',
+            'protocol': body.get('protocol', 'tcp'),
+            'port': body.get('port', ''),
+            'subnet': body.get('subnet', ''),
+            'subnet_size': body.get('subnet_size', 32),
+            'source': body.get('source', ''),
+            'notes': body.get('notes', ''),
+        }
+
+    def make_dns_record(self, zone, body):
+        """Returns a new DNS record built from a create-record request body."""
+        record_type = body.get('type') or self.random.choice(['A', 'A', 'A', 'AAAA', 'CNAME', 'TXT'])
+        if 'content' in body:
+            content = body['content']
+        elif record_type == 'A':
+            content = self.ip4()
+        elif record_type == 'AAAA':
+            content = self.ip6()
+        elif record_type == 'CNAME':
+            content = f"host-{self.random.randint(0, 99999):05d}.{zone['name']}"
+        else:
+            content = f'v=spf1 include:_spf.{zone["name"]} ~all'
+        now = self.timestamp()
+        return {
+            'id': self.hex_id(),
+            'zone_id': zone['id'],
+            'zone_name': zone['name'],
+            'name': body.get('name') or f"host-{self.random.randint(0, 99999):05d}.{zone['name']}",
+            'type': record_type,
+            'content': content,
+            'proxiable': record_type in ('A', 'AAAA', 'CNAME'),
+            'proxied': body.get('proxied', False),
+            'ttl': body.get('ttl', 1),
+            'settings': {},
+            'meta': {},
+            'comment': body.get('comment'),
+            'tags': [],
+            'created_on': now,
+            'modified_on': now,
+        }
+
+    def __make_regions(self):
+        cities = [
+            ('ewr', 'New Jersey', 'US', 'North America'), ('ord', 'Chicago', 'US', 'North America'),
+            ('dfw', 'Dallas', 'US', 'North America'), ('sea', 'Seattle', 'US', 'North America'),
+            ('lax', 'Los Angeles', 'US', 'North America'), ('atl', 'Atlanta', 'US', 'North America'),
+            ('yto', 'Toronto', 'CA', 'North America'), ('mex', 'Mexico City', 'MX', 'North America'),
+            ('sao', 'São Paulo', 'BR', 'South America'), ('lhr', 'London', 'GB', 'Europe'),
+            ('fra', 'Frankfurt', 'DE', 'Europe'), ('ams', 'Amsterdam', 'NL', 'Europe'),
+            ('cdg', 'Paris', 'FR', 'Europe'), ('waw', 'Warsaw', 'PL', 'Europe'),
+            ('nrt', 'Tokyo', 'JP', 'Asia'), ('icn', 'Seoul', 'KR', 'Asia'),
+            ('sgp', 'Singapore', 'SG', 'Asia'), ('bom', 'Mumbai', 'IN', 'Asia'),
+            ('syd', 'Sydney', 'AU', 'Australia'), ('jnb', 'Johannesburg', 'ZA', 'Africa'),
+        ]
+        return [{'id': i, 'city': c, 'country': k, 'continent': n, 'options': ['ddos_protection']} for i, c, k, n in cities]
+
+    def __make_os(self):
+        families = [('ubuntu', ['20.04', '22.04', '24.04']), ('debian', ['11', '12']), ('rockylinux', ['8', '9']),
+                    ('almalinux', ['8', '9']), ('fedora', ['39', '40']), ('freebsd', ['13', '14']), ('windows', ['2019', '2022'])]
+        os_list = []
+        os_id = 300
+        for family, versions in families:
+            for version in versions:
+                for arch in ('x64', 'arm64'):
+                    os_list.append({'id': os_id, 'name': f'{family.capitalize()} {version} {arch}', 'arch': arch, 'family': family})
+                    os_id += 1
+        return os_list
+
+    def __make_applications(self):
+        names = ['WordPress', 'Docker', 'GitLab', 'Nextcloud', 'Plesk', 'cPanel', 'LAMP', 'LEMP', 'Node.js', 'OpenVPN',
+                 'Jitsi', 'Minecraft', 'Mastodon', 'Grafana', 'Prometheus']
+        return [{'id': n + 1, 'name': name, 'short_name': name.lower().replace('.', ''), 'deploy_name': f'{name} on Ubuntu 24.04',
+                 'type': 'one-click' if n % 3 else 'marketplace', 'vendor': 'vultr', 'image_id': name.lower().replace('.', '')}
+                for n, name in enumerate(names)]
+
+    def __make_plans(self):
+        plans = []
+        for kind, prefix, disk_type in (('vc2', 'vc2', 'SSD'), ('vhf', 'vhf', 'NVMe'), ('vhp', 'vhp', 'NVMe'), ('voc', 'voc-g', 'NVMe')):
+            for vcpus, ram in ((1, 1024), (1, 2048), (2, 4096), (4, 8192), (6, 16384), (8, 32768), (16, 65536), (24, 98304)):
+                cost = round(ram / 1024 * 5 * (1.2 if kind != 'vc2' else 1.0), 2)
+                plans.append({
+                    'id': f'{prefix}-{vcpus}c-{ram // 1024}gb',
+                    'vcpu_count': vcpus,
+                    'ram': ram,
+                    'disk': ram // 1024 * 25,
+                    'disk_count': 1,
+                    'bandwidth': ram // 1024 * 1000,
+                    'monthly_cost': cost,
+                    'monthly_cost_str': f'${cost:.2f}',
+                    'type': kind,
+                    'locations': sorted(self.random.sample([r['id'] for r in self.regions], 12)),
+                    'storage_type': disk_type.lower(),
+                    'disk_type': disk_type,
+                    'cpu_vendor': self.random.choice(['Intel', 'AMD']),
+                    'vcpu_type': 'shared' if kind == 'vc2' else 'dedicated',
+                })
+        return plans
+
+    def __make_firewall_group(self):
+        return {
+            'id': self.uuid(),
+            'description': f'group-{self.random.randint(0, 9999):04d}',
+            'date_created': self.timestamp(),
+            'date_modified': self.timestamp(),
+            'instance_count': self.random.randint(0, 50),
+            'rule_count': 0,
+            'max_rule_count': 1000,
+        }
+
+    def __make_firewall_rule(self, rule_id):
+        ip_type = self.random.choice(['v4', 'v4', 'v6'])
+        return {
+            'id': rule_id,
+            'type': ip_type,
+            'ip_type': ip_type,
+            'action': 'accept',
+            'protocol': self.random.choice(['tcp', 'udp', 'icmp']),
+            'port': self.random.choice(['22', '80', '443', '1:65535', '']),
+            'subnet': self.ip4() if ip_type == 'v4' else self.ip6(),
+            'subnet_size': 32 if ip_type == 'v4' else 128,
+            'source': '',
+            'notes': self.random.choice(['office', 'home', 'vpn', 'ci', '']),
+        }
+
+    def __make_zone(self, name):
+        created = self.timestamp()
+        return {
+            'id': self.hex_id(),
+            'name': name,
+            'status': 'active',
+            'paused': False,
+            'type': 'full',
+            'name_servers': ['ada.ns.cloudflare.com', 'bob.ns.cloudflare.com'],
+            'original_registrar': 'example registrar',
+            'created_on': created,
+            'activated_on': created,
+            'modified_on': self.timestamp(),
+        }
+
+class StandinServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server holding the dataset and the fault-injection settings.
+
+    Args:
+        address (tuple): `(host, port)` to bind to.
+        dataset (Dataset): The data to serve.
+        latency (float): Seconds added to every response.
+        jitter (float): Extra random seconds, up to this value, added to every response.
+        rate_429 (float): Fraction of requests answered with 429 Too Many Requests.
+        retry_after (int): The `Retry-After` value, in seconds, sent with injected 429 responses.
+        seed (int): Seed of the fault-injection random generator.
+        compress (bool): Whether to gzip large bodies for clients that accept it.
+    """
+    daemon_threads = True
+    request_queue_size = 256 # Benchmarks open many connections at once
+
+    def __init__(self, address, dataset, latency=0.0, jitter=0.0, rate_429=0.0, retry_after=1, seed=0, compress=True):
+        self.dataset = dataset
+        self.compress = compress
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.requests_served = 0
+        super().__init__(address, StandinHandler)
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """
+    Routes requests to the Vultr and Cloudflare handlers over HTTP/1.1 keep-alive connections.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    routes = [
+        ('GET', r'account', 'vultr_account'),
+        ('GET', r'instances', 'vultr_list_instances'),
+        ('POST', r'instances', 'vultr_create_instance'),
+        ('GET', r'instances/(?P<id>[^/]+)', 'vultr_get_instance'),
+        ('PATCH', r'instances/(?P<id>[^/]+)', 'vultr_update_instance'),
+        ('DELETE', r'instances/(?P<id>[^/]+)', 'vultr_delete_instance'),
+        ('GET', r'firewalls', 'vultr_list_firewalls'),
+        ('GET', r'firewalls/(?P<id>[^/]+)', 'vultr_get_firewall'),
+        ('GET', r'firewalls/(?P<id>[^/]+)/rules', 'vultr_list_rules'),
+        ('POST', r'firewalls/(?P<id>[^/]+)/rules', 'vultr_create_rule'),
+        ('GET', r'firewalls/(?P<id>[^/]+)/rules/(?P<rule>\d+)', 'vultr_get_rule'),
+        ('DELETE', r'firewalls/(?P<id>[^/]+)/rules/(?P<rule>\d+)', 'vultr_delete_rule'),
+        ('GET', r'snapshots', 'vultr_list_snapshots'),
+        ('POST', r'snapshots', 'vultr_create_snapshot'),
+        ('GET', r'snapshots/(?P<id>[^/]+)', 'vultr_get_snapshot'),
+        ('PUT', r'snapshots/(?P<id>[^/]+)', 'vultr_update_snapshot'),
+        ('DELETE', r'snapshots/(?P<id>[^/]+)', 'vultr_delete_snapshot'),
+        ('GET', r'plans', 'vultr_list_plans'),
+        ('GET', r'regions', 'vultr_list_regions'),
+        ('GET', r'os', 'vultr_list_os'),
+        ('GET', r'applications', 'vultr_list_applications'),
+        ('GET', r'user/tokens/verify', 'cloudflare_verify_token'),
+        ('GET', r'zones', 'cloudflare_list_zones'),
+        ('GET', r'zones/(?P<zone>[^/]+)', 'cloudflare_get_zone'),
+        ('GET', r'zones/(?P<zone>[^/]+)/dns_records', 'cloudflare_list_records'),
+        ('POST', r'zones/(?P<zone>[^/]+)/dns_records', 'cloudflare_create_record'),
+        ('GET', r'zones/(?P<zone>[^/]+)/dns_records/(?P<id>[^/]+)', 'cloudflare_get_record'),
+        ('PATCH', r'zones/(?P<zone>[^/]+)/dns_records/(?P<id>[^/]+)', 'cloudflare_update_record'),
+        ('DELETE', r'zones/(?P<zone>[^/]+)/dns_records/(?P<id>[^/]+)', 'cloudflare_delete_record'),
+    ]
+    compiled_routes = [(method, re.compile(f'^{pattern}$'), handler) for method, pattern, handler in routes]
+
+    def setup(self):
+        super().setup()
+        # Headers and body are written separately, so disable Nagle to avoid delayed-ACK stalls.
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def do_PUT(self):
+        self.dispatch('PUT')
+
+    def do_PATCH(self):
+        self.dispatch('PATCH')
+
+    def do_DELETE(self):
+        self.dispatch('DELETE')
+
+    def dispatch(self, method):
+        """
+        Applies latency and 429 injection, then routes the request to its handler.
+        """
+        length = int(self.headers.get('Content-Length') or 0)
+        raw_body = self.rfile.read(length) if length else b''
+        server = self.server
+        with server.random_lock:
+            server.requests_served += 1
+            delay = server.latency + (server.random.uniform(0, server.jitter) if server.jitter else 0.0)
+            throttle = server.rate_429 and server.random.random() < server.rate_429
+        if delay > 0:
+            time.sleep(delay)
+
+        parts = urlsplit(self.path)
+        if parts.path.startswith(VULTR_PREFIX):
+            provider, path = 'vultr', parts.path[len(VULTR_PREFIX):]
+        elif parts.path.startswith(CLOUDFLARE_PREFIX):
+            provider, path = 'cloudflare', parts.path[len(CLOUDFLARE_PREFIX):]
+        else:
+            # Paths without a provider prefix are served as Vultr, for quick checks against the bare server URL
+            provider, path = 'vultr', parts.path.lstrip('/')
+        self.provider = provider
+        path = path.rstrip('/')
+
+        self.pending = None
+        if throttle:
+            self.respond_error(429, 'Rate limit exceeded.', {'Retry-After': str(server.retry_after)})
+        else:
+            self.route(method, path, parts.query, raw_body)
+        self.send_json(*self.pending)
+
+    def route(self, method, path, query_string, raw_body):
+        """
+        Runs the handler matching the request. Handlers read and change the dataset under
+        its lock and leave their response in `self.pending`; it is sent after the lock is released.
+        """
+        for route_method, pattern, handler in self.compiled_routes:
+            match = pattern.match(path)
+            if route_method == method and match and handler.startswith(self.provider):
+                try:
+                    body = json.loads(raw_body) if raw_body else {}
+                except ValueError:
+                    self.respond_error(400, 'Invalid JSON body.')
+                    return
+                query = {k: v[-1] for k, v in parse_qs(query_string).items()}
+                with self.server.dataset.lock:
+                    getattr(self, handler)(query=query, body=body, **match.groupdict())
+                return
+        self.respond_error(404, 'Not found.')
+
+    def respond(self, status, payload, etag=False, headers=None):
+        """
+        Sets the response of the current request. A `payload` of None sends no body.
+        """
+        self.pending = (status, None if payload is None else json.dumps(payload).encode('utf-8'), etag, headers)
+
+    def respond_error(self, status, message, headers=None):
+        """Sets an error response in the shape used by the provider of the request."""
+        if self.provider == 'cloudflare':
+            payload = {'success': False, 'errors': [{'code': status * 10, 'message': message}], 'messages': [], 'result': None}
+        else:
+            payload = {'error': message, 'status': status}
+        self.respond(status, payload, headers=headers)
+
+    def send_json(self, status, body, etag=False, headers=None):
+        """
+        Sends a response with an encoded JSON body, or an empty body if `body` is None.
+        With `etag`, adds an ETag and answers a matching `If-None-Match` with 304 Not Modified.
+        Bodies of 1 KiB or more are gzipped when the client accepts it and compression is on.
+        """
+        extra = dict(headers or {})
+        if body is None:
+            self.send_response(status)
+            for name, value in extra.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if etag:
+            tag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            extra['ETag'] = tag
+            if self.headers.get('If-None-Match') == tag:
+                self.send_response(304)
+                for name, value in extra.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+        if self.server.compress and len(body) >= 1024 and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=6)
+            extra['Content-Encoding'] = 'gzip'
+            extra['Vary'] = 'Accept-Encoding'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        for name, value in extra.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def vultr_page(self, key, items, query, etag=False):
+        """
+        Responds with one page of a Vultr list, following its `per_page` and `cursor` parameters.
+        Cursors are opaque base64 offsets, as in the real API.
+        """
+        per_page = max(1, min(int(query.get('per_page', 100)), 500))
+        cursor = query.get('cursor')
+        offset = int(base64.b64decode(cursor).decode('ascii').removeprefix('next__')) if cursor else 0
+        page = items[offset:offset + per_page]
+        next_cursor = base64.b64encode(f'next__{offset + per_page}'.encode('ascii')).decode('ascii') if offset + per_page < len(items) else ''
+        prev_cursor = base64.b64encode(f'next__{max(0, offset - per_page)}'.encode('ascii')).decode('ascii') if offset else ''
+        self.respond(200, {key: page, 'meta': {'total': len(items), 'links': {'next': next_cursor, 'prev': prev_cursor}}}, etag=etag)
+
+    def cloudflare_page(self, items, query, max_per_page):
+        """
+        Responds with one page of a Cloudflare list, following its `page` and `per_page` parameters.
+        """
+        per_page = max(5, min(int(query.get('per_page', 20)), max_per_page))
+        page = max(1, int(query.get('page', 1)))
+        result = items[(page - 1) * per_page:page * per_page]
+        total_pages = max(1, -(-len(items) // per_page))
+        self.respond(200, {
+            'success': True, 'errors': [], 'messages': [], 'result': result,
+            'result_info': {'page': page, 'per_page': per_page, 'count': len(result), 'total_count': len(items), 'total_pages': total_pages},
+        })
+
+    def cloudflare_result(self, status, result):
+        self.respond(status, {'success': True, 'errors': [], 'messages': [], 'result': result})
+
+    # Vultr v2
+
+    def vultr_account(self, query, body):
+        self.respond(200, {'account': {
+            'name': 'stand-in', 'email': 'stand-in@example.com', 'acls': [], 'balance': -25.5, 'pending_charges': 12.34,
+            'last_payment_date': '2024-06-01T12:00:00+00:00', 'last_payment_amount': -50,
+        }})
+
+    def vultr_list_instances(self, query, body):
+        self.vultr_page('instances', list(self.server.dataset.instances.values()), query)
+
+    def vultr_create_instance(self, query, body):
+        instance = self.server.dataset.make_instance(body)
+        self.server.dataset.instances[instance['id']] = instance
+        self.respond(202, {'instance': dict(instance, status='pending', default_password='stand-in-password')})
+
+    def vultr_get_instance(self, query, body, id):
+        instance = self.server.dataset.instances.get(id)
+        if instance is None:
+            self.respond_error(404, 'Invalid instance-id.')
+        else:
+            self.respond(200, {'instance': instance})
+
+    def vultr_update_instance(self, query, body, id):
+        instance = self.server.dataset.instances.get(id)
+        if instance is None:
+            self.respond_error(404, 'Invalid instance-id.')
+            return
+        instance.update({k: v if v is not None else '' for k, v in body.items() if k in instance})
+        self.respond(202, {'instance': instance})
+
+    def vultr_delete_instance(self, query, body, id):
+        if self.server.dataset.instances.pop(id, None) is None:
+            self.respond_error(404, 'Invalid instance-id.')
+        else:
+            self.respond(204, None)
+
+    def vultr_list_firewalls(self, query, body):
+        self.vultr_page('firewall_groups', list(self.server.dataset.firewall_groups.values()), query, etag=True)
+
+    def vultr_get_firewall(self, query, body, id):
+        group = self.server.dataset.firewall_groups.get(id)
+        if group is None:
+            self.respond_error(404, 'Invalid firewall group.')
+        else:
+            self.respond(200, {'firewall_group': group}, etag=True)
+
+    def vultr_list_rules(self, query, body, id):
+        if id not in self.server.dataset.firewall_rules:
+            self.respond_error(404, 'Invalid firewall group.')
+        else:
+            self.vultr_page('firewall_rules', self.server.dataset.firewall_rules[id], query, etag=True)
+
+    def vultr_create_rule(self, query, body, id):
+        dataset = self.server.dataset
+        if id not in dataset.firewall_rules:
+            self.respond_error(404, 'Invalid firewall group.')
+            return
+        rule = dataset.make_firewall_rule(id, body)
+        dataset.firewall_rules[id].append(rule)
+        dataset.firewall_groups[id]['rule_count'] += 1
+        self.respond(201, {'firewall_rule': rule})
+
+    def vultr_get_rule(self, query, body, id, rule):
+        found = next((r for r in self.server.dataset.firewall_rules.get(id, []) if r['id'] == int(rule)), None)
+        if found is None:
+            self.respond_error(404, 'Invalid firewall rule.')
+        else:
+            self.respond(200, {'firewall_rule': found})
+
+    def vultr_delete_rule(self, query, body, id, rule):
+        dataset = self.server.dataset
+        rules = dataset.firewall_rules.get(id, [])
+        remaining = [r for r in rules if r['id'] != int(rule)]
+        if len(remaining) == len(rules):
+            self.respond_error(404, 'Invalid firewall rule.')
+            return
+        dataset.firewall_rules[id] = remaining
+        dataset.firewall_groups[id]['rule_count'] -= 1
+        self.respond(204, None)
+
+    def vultr_list_snapshots(self, query, body):
+        self.vultr_page('snapshots', list(self.server.dataset.snapshots.values()), query)
+
+    def vultr_create_snapshot(self, query, body):
+        snapshot = self.server.dataset.make_snapshot(body)
+        self.server.dataset.snapshots[snapshot['id']] = snapshot
+        self.respond(201, {'snapshot': dict(snapshot, status='pending')})
+
+    def vultr_get_snapshot(self, query, body, id):
+        snapshot = self.server.dataset.snapshots.get(id)
+        if snapshot is None:
+            self.respond_error(404, 'Invalid snapshot.')
+        else:
+            self.respond(200, {'snapshot': snapshot})
+
+    def vultr_update_snapshot(self, query, body, id):
+        snapshot = self.server.dataset.snapshots.get(id)
+        if snapshot is None:
+            self.respond_error(404, 'Invalid snapshot.')
+            return
+        snapshot['description'] = body.get('description', snapshot['description'])
+        self.respond(204, None)
+
+    def vultr_delete_snapshot(self, query, body, id):
+        if self.server.dataset.snapshots.pop(id, None) is None:
+            self.respond_error(404, 'Invalid snapshot.')
+        else:
+            self.respond(204, None)
+
+    def vultr_list_plans(self, query, body):
+        self.vultr_page('plans', self.server.dataset.plans, query, etag=True)
+
+    def vultr_list_regions(self, query, body):
+        self.vultr_page('regions', self.server.dataset.regions, query, etag=True)
+
+    def vultr_list_os(self, query, body):
+        self.vultr_page('os', self.server.dataset.os, query, etag=True)
+
+    def vultr_list_applications(self, query, body):
+        self.vultr_page('applications', self.server.dataset.applications, query, etag=True)
+
+    # Cloudflare v4
+
+    def cloudflare_verify_token(self, query, body):
+        self.respond(200, {'success': True, 'errors': [], 'messages': [{'code': 10000, 'message': 'This API Token is valid and active'}],
+                             'result': {'id': 'stand-in-token', 'status': 'active'}})
+
+    def cloudflare_list_zones(self, query, body):
+        self.cloudflare_page(list(self.server.dataset.zones.values()), query, 50)
+
+    def cloudflare_get_zone(self, query, body, zone):
+        found = self.server.dataset.zones.get(zone)
+        if found is None:
+            self.respond_error(404, 'Invalid zone identifier.')
+        else:
+            self.cloudflare_result(200, found)
+
+    def cloudflare_list_records(self, query, body, zone):
+        records = self.server.dataset.dns_records.get(zone)
+        if records is None:
+            self.respond_error(404, 'Invalid zone identifier.')
+            return
+        items = [r for r in records.values()
+                 if all(r.get(field) == query[field] for field in ('name', 'type', 'content') if field in query)]
+        self.cloudflare_page(items, query, 5000)
+
+    def cloudflare_create_record(self, query, body, zone):
+        dataset = self.server.dataset
+        found = dataset.zones.get(zone)
+        if found is None:
+            self.respond_error(404, 'Invalid zone identifier.')
+            return
+        record = dataset.make_dns_record(found, body)
+        dataset.dns_records[zone][record['id']] = record
+        self.cloudflare_result(200, record)
+
+    def cloudflare_get_record(self, query, body, zone, id):
+        record = self.server.dataset.dns_records.get(zone, {}).get(id)
+        if record is None:
+            self.respond_error(404, 'Record not found.')
+        else:
+            self.cloudflare_result(200, record)
+
+    def cloudflare_update_record(self, query, body, zone, id):
+        record = self.server.dataset.dns_records.get(zone, {}).get(id)
+        if record is None:
+            self.respond_error(404, 'Record not found.')
+            return
+        record.update({k: v for k, v in body.items() if k in record})
+        record['modified_on'] = self.server.dataset.timestamp(days=700)
+        self.cloudflare_result(200, record)
+
+    def cloudflare_delete_record(self, query, body, zone, id):
+        if self.server.dataset.dns_records.get(zone, {}).pop(id, None) is None:
+            self.respond_error(404, 'Record not found.')
+        else:
+            self.cloudflare_result(200, {'id': id})
+
+    def log_message(self, format, *args):
+        """Silences the per-request access log."""
+        pass
+
+def start_server(host='127.0.0.1', port=0, dataset=None, latency=0.0, jitter=0.0, rate_429=0.0, retry_after=1, seed=0, compress=True):
+    """
+    Starts the stand-in server on a background thread.
+
+    Args:
+        host (str): The interface to bind to.
+        port (int): The port to bind to. 0 picks a free port.
+        dataset (Dataset, optional): The data to serve. Defaults to a small dataset.
+        latency (float): Seconds added to every response.
+        jitter (float): Extra random seconds, up to this value, added to every response.
+        rate_429 (float): Fraction of requests answered with 429 Too Many Requests.
+        retry_after (int): The `Retry-After` value sent with injected 429 responses.
+        seed (int): Seed of the fault-injection random generator.
+        compress (bool): Whether to gzip large bodies for clients that accept it.
+
+    Returns:
+        StandinServer: The running server. Call `shutdown()` to stop it.
+    """
+    if dataset is None:
+        dataset = Dataset(seed, instances=50, firewall_groups=3, firewall_rules=20, snapshots=10, zones=2, dns_records=100)
+    server = StandinServer((host, port), dataset, latency, jitter, rate_429, retry_after, seed, compress)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def server_url(server):
+    """Returns the base URL of a running stand-in server, ending with a slash."""
+    host, port = server.server_address[:2]
+    return f'http://{host}:{port}/'
+
+def vultr_url(server):
+    """Returns the base URL of the stand-in Vultr v2 API."""
+    return server_url(server) + VULTR_PREFIX.lstrip('/')
+
+def cloudflare_url(server):
+    """Returns the base URL of the stand-in Cloudflare v4 API."""
+    return server_url(server) + CLOUDFLARE_PREFIX.lstrip('/')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind to.')
+    parser.add_argument('--port', type=int, default=8080, help='Port to bind to.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic dataset and of fault injection.')
+    parser.add_argument('--instances', type=int, default=10000, help='Number of instances.')
+    parser.add_argument('--firewall-groups', type=int, default=20, help='Number of firewall groups.')
+    parser.add_argument('--firewall-rules', type=int, default=500, help='Rules in each firewall group.')
+    parser.add_argument('--snapshots', type=int, default=200, help='Number of snapshots.')
+    parser.add_argument('--zones', type=int, default=3, help='Number of DNS zones.')
+    parser.add_argument('--dns-records', type=int, default=5000, help='DNS records in each zone.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response.')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random seconds, up to this value, per response.')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Fraction of requests answered with 429.')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with injected 429 responses.')
+    parser.add_argument('--no-compress', action='store_true', help='Never gzip response bodies.')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    dataset = Dataset(args.seed, args.instances, args.firewall_groups, args.firewall_rules, args.snapshots, args.zones, args.dns_records)
+    print(f'Generated dataset in {time.perf_counter() - started:.2f} seconds.')
+    server = StandinServer((args.host, args.port), dataset, args.latency, args.jitter, args.rate_429, args.retry_after, args.seed, not args.no_compress)
+    print(f'Vultr:      {vultr_url(server)}')
+    print(f'Cloudflare: {cloudflare_url(server)}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
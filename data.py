@@ -1,41 +1,858 @@
 import os
-import json
 import base64
+import contextlib
+import hashlib
+import mmap
+import threading
+import time
 import requests
+import jsoncodec
+import settings
 
-def create_data_cache(file_name, data):
-    """
-    Creates a directory and a file for data caching if they do not exist.
-    The directory is './data' and the file is 'plans.json'.
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import sqlite3
+except ImportError: # Python built without SQLite
+    sqlite3 = None
+
+DATA_DIRECTORY = os.path.join('.', 'data')
+CACHE_EXTENSIONS = {'json': '.json', 'msgpack': '.msgpack'}
+CACHE_DECODE_ERRORS = (ValueError,) if msgpack is None else (ValueError, msgpack.exceptions.UnpackException)
+CATALOG_DATABASE = 'catalog.sqlite3'
+
+def create_data_cache(file_name, data, source_url=None, ttl=None):
     """
-    # Define the directory and file path
-    directory = './data'
-    file_path = os.path.join(directory, file_name)
+    Saves catalog data under './data', creating the directory if needed.
 
-    formatted_json = json.dumps(data, indent=2)
+    The file is written in `cache_format()`, with the extension of `file_name` replaced to
+    match, and any copy left in another format is removed. The data is stored in an
+    envelope with its fetch time, TTL, source URL and content hash.
+    The file is written to a temporary file first and renamed into place under an exclusive
+    `cache_lock`, so readers, background refreshes and other pyvultr processes never see a
+    partial file. If the cached content, TTL and source URL are unchanged, the file is not
+    rewritten; its modification time is updated to mark it as checked now.
+    With the SQLite store (`cache_store()`), the entry goes to the catalog database instead.
+
+    Args:
+        file_name (str): The logical cache file name, e.g. 'vultr_plans.json'.
+        data (dict): The catalog data to save.
+        source_url (str, optional): The API URL the data was fetched from.
+        ttl (float, optional): Seconds the data stays fresh. Defaults to `settings.DATA_CACHE_TTLS[file_name]`.
+
+    Returns:
+        bool: True if the file was written, False if the rewrite was skipped.
+    """
+    file_path = cache_path(file_name)
+    entry = {
+        'cache': {
+            'fetched_at': time.time(),
+            'ttl': settings.DATA_CACHE_TTLS.get(file_name) if ttl is None else ttl,
+            'source_url': source_url,
+            'sha256': content_hash(data),
+        },
+        'data': data,
+    }
+    if cache_store() == 'sqlite':
+        return get_catalog_store().save(file_name, entry)
 
     # Create directory if it doesn't exist
-    if not os.path.exists(directory):
-        os.makedirs(directory)
+    if not os.path.exists(DATA_DIRECTORY):
+        os.makedirs(DATA_DIRECTORY)
 
-    # Create file if it doesn't exist
-    # if not os.path.exists(file_path):
-    with open(file_path, 'w') as f:
-        f.write(formatted_json)  # You can write default content here
+    with cache_lock(file_path, exclusive=True):
+        current = read_cache_file(file_path, file_name)
+        if current is not None and all(current['cache'][k] == entry['cache'][k] for k in ('sha256', 'ttl', 'source_url')):
+            os.utime(file_path)
+            return False
+        write_cache_file(file_path, entry)
+    remove_other_formats(file_name)
+    return True
 
-def load_data_cache(file_name):
+def cache_store():
     """
-    Loads data from the cache file if it exists.
-    Returns the data as a dictionary or None if the file does not exist.
+    Returns where catalogs are cached, from `settings.DATA_CACHE_STORE`: 'file', or
+    'sqlite' when Python has the sqlite3 module.
     """
-    directory = 'data'
-    file_path = os.path.join('.', directory, file_name)
+    if settings.DATA_CACHE_STORE == 'sqlite' and sqlite3 is not None:
+        return 'sqlite'
+    return 'file'
 
-    if os.path.exists(file_path):
-        with open(file_path, 'r') as f:
-            return json.load(f)
+def cache_format():
+    """
+    Returns the catalog cache format from `settings.DATA_CACHE_FORMAT`: 'json', or
+    'msgpack' when the msgpack module is installed.
+    """
+    if settings.DATA_CACHE_FORMAT == 'msgpack' and msgpack is not None:
+        return 'msgpack'
+    return 'json'
+
+def cache_path(file_name, fmt=None):
+    """
+    Returns the path of a catalog cache file, with the extension of `file_name` replaced
+    by the one of format `fmt` (default `cache_format()`).
+    """
+    base = os.path.splitext(file_name)[0]
+    return os.path.join(DATA_DIRECTORY, base + CACHE_EXTENSIONS[fmt or cache_format()])
+
+def write_cache_file(file_path, entry):
+    """
+    Writes a cache entry through a temporary file renamed into place. Callers hold an
+    exclusive `cache_lock`. JSON files are indented for readability; msgpack files are
+    compact binary.
+    """
+    if file_path.endswith(CACHE_EXTENSIONS['msgpack']):
+        encoded = msgpack.packb(entry, use_bin_type=True)
     else:
+        encoded = jsoncodec.dumps(entry, indent=True)
+    tmp_path = f'{file_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(encoded)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+def remove_other_formats(file_name):
+    """
+    Removes copies of a catalog cache file in formats other than `cache_format()`, so that
+    switching formats back later never finds an outdated copy. Lock files are kept, as
+    another process may be holding them.
+    """
+    for fmt in CACHE_EXTENSIONS:
+        if fmt != cache_format():
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(cache_path(file_name, fmt))
+
+def load_data_cache(file_name, refresh=None):
+    """
+    Loads catalog data from the cache file if it exists.
+
+    A stale entry is still returned at once. If `refresh` is given, it is also started on a
+    background thread to fetch and save a fresh copy (stale-while-revalidate).
+
+    Args:
+        file_name (str): The cache file name, e.g. 'vultr_plans.json'.
+        refresh (callable, optional): Fetches and saves the catalog again, e.g. `lambda: plan.save_plans(verbose=False)`.
+
+    Returns:
+        dict or None: The cached data, or None if the file does not exist.
+    """
+    entry = read_data_cache(file_name)
+    if entry is None:
+        return None
+    if refresh is not None and data_cache_stale(entry):
+        refresh_data_cache(file_name, refresh)
+    return entry['data']
+
+def read_data_cache(file_name):
+    """
+    Reads a cache file with its metadata, under a shared `cache_lock`.
+
+    Files written before entries carried metadata are returned with their modification
+    time as `fetched_at` and the configured TTL. A file found only in another format is
+    migrated to `cache_format()` first, and a catalog found only in the other store is
+    moved to the one `cache_store()` selects.
+
+    Args:
+        file_name (str): The logical cache file name, e.g. 'vultr_plans.json'.
+
+    Returns:
+        dict or None: `{'cache': metadata, 'data': data}`, or None if the file does not exist.
+            The metadata also has `checked_at`, the last time the content was fetched or
+            confirmed unchanged.
+    """
+    if cache_store() == 'sqlite':
+        return get_catalog_store().read(file_name) or import_data_cache(file_name)
+    file_path = cache_path(file_name)
+    if not os.path.exists(file_path):
+        return migrate_data_cache(file_name) or export_data_cache(file_name)
+    with cache_lock(file_path, exclusive=False):
+        return read_cache_file(file_path, file_name)
+
+def migrate_data_cache(file_name):
+    """
+    Converts a catalog cache file found in another format to `cache_format()`, keeping its
+    metadata, and removes the old file.
+
+    Returns:
+        dict or None: The migrated entry, or None if no copy exists in any format.
+    """
+    file_path = cache_path(file_name)
+    for fmt in CACHE_EXTENSIONS:
+        old_path = cache_path(file_name, fmt)
+        if old_path == file_path or not os.path.exists(old_path) or (fmt == 'msgpack' and msgpack is None):
+            continue
+        with cache_lock(file_path, exclusive=True):
+            entry = read_cache_file(file_path, file_name) # Another process may have migrated it already
+            if entry is None:
+                with cache_lock(old_path, exclusive=False):
+                    entry = read_cache_file(old_path, file_name)
+                if entry is None:
+                    continue
+                checked_at = entry['cache'].pop('checked_at')
+                write_cache_file(file_path, entry)
+                os.utime(file_path, (checked_at, checked_at))
+                entry['cache']['checked_at'] = checked_at
+        remove_other_formats(file_name)
+        return entry
+    return None
+
+def import_data_cache(file_name):
+    """
+    Moves a catalog cache file, in any format, into the SQLite store, keeping its metadata.
+
+    Returns:
+        dict or None: The imported entry, or None if no cache file exists.
+    """
+    for fmt in CACHE_EXTENSIONS:
+        file_path = cache_path(file_name, fmt)
+        if not os.path.exists(file_path) or (fmt == 'msgpack' and msgpack is None):
+            continue
+        with cache_lock(file_path, exclusive=True):
+            entry = read_cache_file(file_path, file_name)
+            if entry is None:
+                continue
+            get_catalog_store().save(file_name, entry)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(file_path)
+        return entry
+    return None
+
+def export_data_cache(file_name):
+    """
+    Moves a catalog out of the SQLite store into a file in `cache_format()`, keeping its
+    metadata, for when the file store is selected again.
+
+    Returns:
+        dict or None: The exported entry, or None if the store does not have it.
+    """
+    database_path = os.path.join(DATA_DIRECTORY, CATALOG_DATABASE)
+    if sqlite3 is None or not os.path.exists(database_path):
+        return None
+    store = get_catalog_store()
+    entry = store.read(file_name)
+    if entry is None:
+        return None
+    file_path = cache_path(file_name)
+    with cache_lock(file_path, exclusive=True):
+        checked_at = entry['cache'].pop('checked_at')
+        write_cache_file(file_path, entry)
+        os.utime(file_path, (checked_at, checked_at))
+        entry['cache']['checked_at'] = checked_at
+    store.delete(file_name)
+    return entry
+
+def read_cache_file(file_path, file_name):
+    """
+    Reads a cache file in the format given by its extension, without locking it. Callers
+    hold `cache_lock`. A file that cannot be decoded, e.g. one left half-written by an
+    interrupted save, is treated as missing so the next save replaces it.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        checked_at = os.path.getmtime(file_path)
+    except FileNotFoundError:
+        return None
+    return decode_cache_file(raw, file_path, file_name, checked_at)
+
+def map_cache_file(file_path):
+    """
+    Maps a cache file read-only into memory without reading it. Callers hold `cache_lock`.
+
+    The mapping is backed by the page cache, so processes and forked workers mapping the
+    same file share one copy of it, and it keeps showing the file that was mapped after a
+    writer renames a new one into place. On Windows, where a mapped file cannot be
+    replaced, and for empty files, the contents are read instead.
+
+    Returns:
+        tuple or None: `(buffer, checked_at)`, or None if the file does not exist.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if fcntl is None or stat.st_size == 0:
+                return f.read(), stat.st_mtime
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), stat.st_mtime
+    except FileNotFoundError:
+        return None
+
+def decode_cache_file(raw, file_path, file_name, checked_at):
+    """
+    Decodes the contents of a cache file into an entry, `{'cache': metadata, 'data': data}`.
+
+    Args:
+        raw (bytes or buffer): The file contents.
+        file_path (str): The file they came from, whose extension gives the format.
+        file_name (str): The logical cache file name.
+        checked_at (float): The file's modification time.
+
+    Returns:
+        dict or None: The entry, or None if the contents are corrupt or truncated.
+    """
+    try:
+        if file_path.endswith(CACHE_EXTENSIONS['msgpack']):
+            entry = msgpack.unpackb(raw, raw=False)
+        else:
+            entry = jsoncodec.loads(raw)
+    except CACHE_DECODE_ERRORS:
         return None
+    if isinstance(entry, dict) and entry.keys() == {'cache', 'data'}:
+        entry['cache']['checked_at'] = checked_at
+        return entry
+    return {
+        'cache': {
+            'fetched_at': checked_at,
+            'checked_at': checked_at,
+            'ttl': settings.DATA_CACHE_TTLS.get(file_name),
+            'source_url': None,
+            'sha256': content_hash(entry),
+        },
+        'data': entry,
+    }
+
+@contextlib.contextmanager
+def cache_lock(file_path, exclusive):
+    """
+    Holds an advisory lock for a cache file while the block runs: shared for readers and
+    exclusive for writers, across threads and processes.
+
+    The lock is taken on a '<file>.lock' file beside the cache file, since writers replace
+    the cache file itself. msvcrt has no shared locks, so on Windows readers lock exclusively.
+
+    Args:
+        file_path (str): The cache file path.
+        exclusive (bool): True to lock for writing.
+    """
+    with open(file_path + '.lock', 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def data_cache_stale(entry):
+    """
+    Returns whether a cache entry has outlived its TTL since it was last fetched or
+    confirmed unchanged. Entries without a TTL never go stale.
+    """
+    ttl = entry['cache'].get('ttl')
+    checked_at = entry['cache'].get('checked_at', entry['cache']['fetched_at'])
+    return ttl is not None and time.time() - checked_at > ttl
+
+def content_hash(data):
+    """
+    Returns the SHA-256 hex digest of the JSON encoding of `data`.
+    """
+    return hashlib.sha256(jsoncodec.dumps(data)).hexdigest()
+
+refreshing = set()
+refreshing_lock = threading.Lock()
+
+def refresh_data_cache(file_name, refresh):
+    """
+    Runs `refresh` on a background daemon thread, unless a refresh of the same file is
+    already running.
+
+    Args:
+        file_name (str): The cache file being refreshed.
+        refresh (callable): Fetches and saves the catalog again.
+
+    Returns:
+        threading.Thread or None: The started thread, or None if one was already running.
+    """
+    with refreshing_lock:
+        if file_name in refreshing:
+            return None
+        refreshing.add(file_name)
+
+    def run():
+        try:
+            refresh()
+        except Exception:
+            pass # The stale copy stays in use; the next load tries again
+        finally:
+            with refreshing_lock:
+                refreshing.discard(file_name)
+
+    thread = threading.Thread(target=run, name=f'refresh {file_name}', daemon=True)
+    thread.start()
+    return thread
+
+def load_catalog(file_name, key, refresh=None):
+    """
+    Opens a cached catalog for lookups, with the same stale-while-revalidate behaviour as
+    `load_data_cache`.
+
+    Nothing is decoded here. With the SQLite store only the catalog's metadata is read;
+    items are read by indexed queries when they are looked up. With the file store the
+    file is mapped into memory and decoded on the first lookup, which is also when its
+    age is checked.
+
+    A stale catalog's refresh is started by its first lookup rather than here, so it only
+    runs once the caller holds the returned catalog and a refresh that finishes quickly
+    cannot be overwritten by the stale copy.
+
+    Args:
+        file_name (str): The cache file name, e.g. 'vultr_plans.json'.
+        key (str): The key of the item list in the catalog, e.g. 'plans'.
+        refresh (callable, optional): Fetches and saves the catalog again, e.g. `lambda: plan.save_plans(verbose=False)`.
+
+    Returns:
+        DocumentCatalog or MappedCatalog or SqliteCatalog or None: The catalog, or None if it is not cached.
+    """
+    if cache_store() == 'file':
+        file_path = cache_path(file_name)
+        if os.path.exists(file_path):
+            with cache_lock(file_path, exclusive=False):
+                mapped = map_cache_file(file_path)
+            if mapped is not None:
+                return MappedCatalog(file_path, file_name, key, *mapped, refresh=refresh)
+        entry = read_data_cache(file_name) # Migrates a copy in another format or store
+        if entry is None:
+            return None
+        return DocumentCatalog(entry['data'], key, file_name, refresh, data_cache_stale(entry))
+    store = get_catalog_store()
+    meta = store.meta(file_name)
+    if meta is None:
+        if import_data_cache(file_name) is None:
+            return None
+        meta = store.meta(file_name)
+    return SqliteCatalog(store, file_name, key, refresh, data_cache_stale({'cache': meta}))
+
+def open_catalog(file_name, key, data):
+    """
+    Returns the catalog for data just saved with `create_data_cache`.
+    """
+    if cache_store() == 'sqlite':
+        return SqliteCatalog(get_catalog_store(), file_name, key)
+    return DocumentCatalog(data, key)
+
+def catalog_key(data):
+    """
+    Returns the key of the item list in a catalog document, e.g. 'plans' in
+    `{'plans': [...], 'meta': {...}}`, or None if it has no list.
+    """
+    if isinstance(data, dict):
+        return next((key for key, value in data.items() if isinstance(value, list)), None)
+    return None
+
+class DocumentCatalog():
+    """
+    Lookups in a catalog document held in memory, as loaded from the file store.
+
+    Lookups by id use an index built on first use; other filters scan the items.
+
+    Args:
+        data (dict): The catalog document, e.g. `{'plans': [...], 'meta': {...}}`.
+        key (str): The key of the item list, e.g. 'plans'.
+        file_name (str, optional): The catalog's cache file name, e.g. 'vultr_plans.json'.
+        refresh (callable, optional): Fetches and saves the catalog again.
+        stale (bool, optional): Whether the catalog was past its TTL when loaded. If so,
+            `refresh` is started in the background on the first lookup.
+    """
+
+    def __init__(self, data, key, file_name=None, refresh=None, stale=False):
+        self.data = data
+        self.key = key
+        self.file_name = file_name
+        self.refresh = refresh
+        self.stale = stale
+        self.index = None
+
+    def revalidate(self):
+        """Starts `refresh` in the background, once, if the catalog is stale."""
+        if self.stale and self.refresh is not None:
+            self.stale = False
+            refresh_data_cache(self.file_name, self.refresh)
+
+    def document(self):
+        """Returns the whole catalog document."""
+        data = self.data
+        self.revalidate()
+        return data
+
+    def all(self):
+        """Returns every item, in catalog order."""
+        items = self.data.get(self.key, [])
+        self.revalidate()
+        return items
+
+    def get(self, item_id):
+        """Returns the item with id `item_id`, or None."""
+        if self.index is None:
+            index = {}
+            for item in self.all():
+                index.setdefault(item.get('id'), item)
+            self.index = index
+        return self.index.get(item_id)
+
+    def get_many(self, ids):
+        """Returns the items with the given ids, in the order of `ids`, skipping unknown ids."""
+        return [item for item in map(self.get, ids) if item is not None]
+
+    def find(self, region=None, item_type=None, max_monthly_cost=None, ids=None):
+        """
+        Returns the items matching every given filter, in catalog order.
+
+        Args:
+            region (str, optional): A region id the item's `locations` must include.
+            item_type (str, optional): The item's `type`.
+            max_monthly_cost (float, optional): The highest `monthly_cost` to include.
+            ids (iterable, optional): The item ids to include.
+        """
+        ids = None if ids is None else set(ids)
+        return [
+            item for item in self.all()
+            if (region is None or region in (item.get('locations') or []))
+            and (item_type is None or item.get('type') == item_type)
+            and (max_monthly_cost is None or (item.get('monthly_cost') is not None and item['monthly_cost'] <= max_monthly_cost))
+            and (ids is None or item.get('id') in ids)
+        ]
+
+class MappedCatalog(DocumentCatalog):
+    """
+    Lookups in a file-store catalog that is mapped into memory when opened and decoded
+    on the first lookup, so catalogs that are never used are never read.
+
+    When the catalog is decoded, it is checked against its TTL and, as with
+    `load_data_cache`, `refresh` is started in the background if it is stale. The mapping
+    is released once decoded.
+
+    Args:
+        file_path (str): The mapped cache file.
+        file_name (str): The logical cache file name, e.g. 'vultr_plans.json'.
+        key (str): The key of the item list, e.g. 'plans'.
+        buffer (mmap.mmap or bytes): The file contents, from `map_cache_file`.
+        checked_at (float): The file's modification time.
+        refresh (callable, optional): Fetches and saves the catalog again.
+    """
+
+    def __init__(self, file_path, file_name, key, buffer, checked_at, refresh=None):
+        self.file_path = file_path
+        self.file_name = file_name
+        self.key = key
+        self.buffer = buffer
+        self.checked_at = checked_at
+        self.refresh = refresh
+        self.stale = False
+        self.index = None
+        self.entry = None
+        self.lock = threading.Lock()
+
+    @property
+    def data(self):
+        """The catalog document, decoded on first use."""
+        if self.entry is None:
+            with self.lock:
+                if self.entry is None:
+                    self.entry = self.decode()
+        return self.entry['data']
+
+    def decode(self):
+        """
+        Decodes the mapped file, releases the mapping and notes whether it is stale.
+
+        If the file turns out to be corrupt, the catalog is refreshed in the foreground and
+        read again; if that fails too, the catalog is empty.
+        """
+        entry = None
+        if self.buffer is not None: # Released by an earlier decode that raised
+            try:
+                with memoryview(self.buffer) as view:
+                    entry = decode_cache_file(view, self.file_path, self.file_name, self.checked_at)
+            finally:
+                if isinstance(self.buffer, mmap.mmap):
+                    self.buffer.close()
+                self.buffer = None
+        if entry is None and self.refresh is not None:
+            self.refresh()
+            entry = read_data_cache(self.file_name)
+        if entry is None:
+            return {'cache': None, 'data': {self.key: []}}
+        self.stale = data_cache_stale(entry)
+        return entry
+
+class SqliteCatalog():
+    """
+    Lookups in a catalog kept in the SQLite store. Each lookup is an indexed query that
+    decodes only the items it returns. It has the same methods as `DocumentCatalog`.
+
+    Args:
+        store (CatalogStore): The store holding the catalog.
+        name (str): The catalog's cache file name, e.g. 'vultr_plans.json'.
+        key (str): The key of the item list, e.g. 'plans'.
+        refresh (callable, optional): Fetches and saves the catalog again.
+        stale (bool, optional): Whether the catalog was past its TTL when opened. If so,
+            `refresh` is started in the background on the first lookup.
+    """
+
+    def __init__(self, store, name, key, refresh=None, stale=False):
+        self.store = store
+        self.name = name
+        self.key = key
+        self.refresh = refresh
+        self.stale = stale
+        self.data = None
+
+    def revalidate(self):
+        """Starts `refresh` in the background, once, if the catalog is stale."""
+        if self.stale and self.refresh is not None:
+            self.stale = False
+            refresh_data_cache(self.name, self.refresh)
+
+    def document(self):
+        """Returns the whole catalog document, read from the store on first use."""
+        self.revalidate()
+        if self.data is None:
+            entry = self.store.read(self.name)
+            self.data = entry['data'] if entry is not None else {self.key: []}
+        return self.data
+
+    def all(self):
+        """Returns every item, in catalog order."""
+        self.revalidate()
+        return self.store.items(self.name)
+
+    def get(self, item_id):
+        """Returns the item with id `item_id`, or None."""
+        self.revalidate()
+        items = self.store.items(self.name, ids=[item_id], limit=1)
+        return items[0] if items else None
+
+    def get_many(self, ids):
+        """Returns the items with the given ids, in the order of `ids`, skipping unknown ids."""
+        self.revalidate()
+        ids = list(ids)
+        by_id = {}
+        for item in self.store.items(self.name, ids=ids):
+            by_id.setdefault(item.get('id'), item)
+        return [by_id[item_id] for item_id in ids if item_id in by_id]
+
+    def find(self, region=None, item_type=None, max_monthly_cost=None, ids=None):
+        """Returns the items matching every given filter, in catalog order. See `DocumentCatalog.find`."""
+        self.revalidate()
+        return self.store.items(self.name, region=region, item_type=item_type, max_monthly_cost=max_monthly_cost,
+                                ids=None if ids is None else list(ids))
+
+CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalogs (
+    name TEXT PRIMARY KEY,
+    item_key TEXT,
+    envelope BLOB NOT NULL,
+    fetched_at REAL,
+    checked_at REAL,
+    ttl REAL,
+    source_url TEXT,
+    sha256 TEXT
+);
+CREATE TABLE IF NOT EXISTS items (
+    catalog TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    id,
+    type TEXT,
+    monthly_cost REAL,
+    body BLOB NOT NULL,
+    PRIMARY KEY (catalog, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS items_id ON items (catalog, id);
+CREATE INDEX IF NOT EXISTS items_type ON items (catalog, type);
+CREATE INDEX IF NOT EXISTS items_monthly_cost ON items (catalog, monthly_cost);
+CREATE TABLE IF NOT EXISTS item_locations (
+    catalog TEXT NOT NULL,
+    region TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (catalog, region, position)
+) WITHOUT ROWID;
+"""
+
+class CatalogStore():
+    """
+    Catalog caches kept in one SQLite database, with their items indexed by id, type,
+    region (the plans' `locations`) and monthly cost.
+
+    Each item is stored as its JSON encoding with those fields in indexed columns, and
+    the rest of the document, such as 'meta', is kept with the cache metadata. Writes
+    replace a catalog in one transaction, so readers in any thread or process see either
+    the old or the new catalog. Each thread uses its own connection.
+
+    Args:
+        path (str): The database file, created if needed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+
+    def connection(self):
+        """
+        Returns this thread's connection, opening it and creating the schema on first use.
+        """
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None) # Transactions are explicit
+            conn.execute('PRAGMA journal_mode=WAL') # Readers do not block the writer
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(CATALOG_SCHEMA)
+            self.local.conn = conn
+        return conn
+
+    def save(self, name, entry):
+        """
+        Replaces a catalog with a cache entry, `{'cache': metadata, 'data': document}`.
+
+        If the content hash, TTL and source URL are unchanged, only `checked_at` is updated.
+
+        Returns:
+            bool: True if the catalog was written, False if the rewrite was skipped.
+        """
+        cache = entry['cache']
+        checked_at = cache.get('checked_at', cache['fetched_at'])
+        conn = self.connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            current = conn.execute('SELECT sha256, ttl, source_url FROM catalogs WHERE name = ?', (name,)).fetchone()
+            if current == (cache['sha256'], cache['ttl'], cache['source_url']):
+                conn.execute('UPDATE catalogs SET checked_at = ? WHERE name = ?', (checked_at, name))
+                conn.execute('COMMIT')
+                return False
+            data = entry['data']
+            key = catalog_key(data)
+            items = data[key] if key is not None else []
+            envelope = {k: v for k, v in data.items() if k != key} if key is not None else data
+            conn.execute('DELETE FROM items WHERE catalog = ?', (name,))
+            conn.execute('DELETE FROM item_locations WHERE catalog = ?', (name,))
+            conn.executemany('INSERT INTO items VALUES (?, ?, ?, ?, ?, ?)', (
+                (name, position, item.get('id'), item.get('type'), item.get('monthly_cost'), jsoncodec.dumps(item))
+                for position, item in enumerate(items)
+            ))
+            conn.executemany('INSERT OR IGNORE INTO item_locations VALUES (?, ?, ?)', (
+                (name, region, position)
+                for position, item in enumerate(items)
+                for region in item.get('locations') or []
+            ))
+            conn.execute('INSERT OR REPLACE INTO catalogs VALUES (?, ?, ?, ?, ?, ?, ?, ?)', (
+                name, key, jsoncodec.dumps(envelope), cache['fetched_at'], checked_at,
+                cache['ttl'], cache['source_url'], cache['sha256'],
+            ))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return True
+
+    def meta(self, name):
+        """
+        Returns a catalog's cache metadata, or None if the store does not have it.
+        """
+        row = self.connection().execute(
+            'SELECT fetched_at, checked_at, ttl, source_url, sha256 FROM catalogs WHERE name = ?', (name,)
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('fetched_at', 'checked_at', 'ttl', 'source_url', 'sha256'), row))
+
+    def read(self, name):
+        """
+        Returns a whole catalog as a cache entry, `{'cache': metadata, 'data': document}`,
+        or None if the store does not have it.
+        """
+        conn = self.connection()
+        conn.execute('BEGIN')
+        try:
+            meta = self.meta(name)
+            if meta is None:
+                return None
+            key, envelope = conn.execute('SELECT item_key, envelope FROM catalogs WHERE name = ?', (name,)).fetchone()
+            data = jsoncodec.loads(envelope)
+            if key is not None:
+                data = {key: self.items(name), **data}
+        finally:
+            conn.execute('COMMIT')
+        return {'cache': meta, 'data': data}
+
+    def items(self, name, region=None, item_type=None, max_monthly_cost=None, ids=None, limit=None):
+        """
+        Returns a catalog's items matching every given filter, in catalog order.
+
+        Args:
+            name (str): The catalog's cache file name.
+            region (str, optional): A region id the item's `locations` must include.
+            item_type (str, optional): The item's `type`.
+            max_monthly_cost (float, optional): The highest `monthly_cost` to include.
+            ids (list, optional): The item ids to include.
+            limit (int, optional): The most items to return.
+        """
+        sql = 'SELECT items.body FROM items'
+        where = ['items.catalog = ?']
+        params = [name]
+        if region is not None:
+            sql += ' JOIN item_locations ON item_locations.catalog = items.catalog AND item_locations.position = items.position'
+            where.append('item_locations.region = ?')
+            params.append(region)
+        if item_type is not None:
+            where.append('items.type = ?')
+            params.append(item_type)
+        if max_monthly_cost is not None:
+            where.append('items.monthly_cost <= ?')
+            params.append(max_monthly_cost)
+        if ids is not None:
+            where.append(f"items.id IN ({', '.join('?' * len(ids))})")
+            params.extend(ids)
+        sql += ' WHERE ' + ' AND '.join(where) + ' ORDER BY items.position'
+        if limit is not None:
+            sql += f' LIMIT {int(limit)}'
+        return [jsoncodec.loads(body) for body, in self.connection().execute(sql, params)]
+
+    def delete(self, name):
+        """
+        Removes a catalog from the store.
+        """
+        conn = self.connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for table, column in (('items', 'catalog'), ('item_locations', 'catalog'), ('catalogs', 'name')):
+                conn.execute(f'DELETE FROM {table} WHERE {column} = ?', (name,))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+catalog_stores = {}
+catalog_stores_lock = threading.Lock()
+
+def get_catalog_store():
+    """
+    Returns the shared `CatalogStore` for the catalog database under `DATA_DIRECTORY`.
+    """
+    path = os.path.abspath(os.path.join(DATA_DIRECTORY, CATALOG_DATABASE))
+    with catalog_stores_lock:
+        if path not in catalog_stores:
+            catalog_stores[path] = CatalogStore(path)
+        return catalog_stores[path]
 
 def load_cloud_init_http(url):
     """
@@ -0,0 +1,55 @@
+from api.api import CircuitBreaker, metrics
+from util import print_output_table, red_text, yellow_text
+
+def print_api_stats(apis):
+    """
+    Prints the API request statistics gathered this session, busiest endpoints first,
+    and writes the configured metrics exports.
+
+    Args:
+        apis (list): The API clients whose request coalescing counts and circuit breakers should be shown.
+
+    Returns:
+        None. Prints a table of per-endpoint statistics to the console.
+    """
+    rows = [
+        [s['provider'], s['method'], s['endpoint'], s['count'], s['errors'],
+         f"{s['seconds']:.2f}", f"{s['p50'] * 1000:.0f}", f"{s['p95'] * 1000:.0f}", f"{s['p99'] * 1000:.0f}",
+         s['bytes_sent'], s['bytes_received'], s['bytes_received_wire'],
+         f"{s['bytes_received'] / s['bytes_received_wire']:.1f}x" if s['bytes_received_wire'] else '']
+        for s in metrics.snapshot()
+    ]
+    headers = ['Provider', 'Verb', 'Endpoint', 'Requests', 'Errors', 'Total (s)', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'Sent (B)', 'Received (B)', 'Wire (B)', 'Compression']
+    print_output_table(rows, headers)
+
+    coalesced = [[api.provider, stats['calls'], stats['coalesced']] for api in apis for stats in [api.single_flight.stats()]]
+    print()
+    print_output_table(coalesced, ['Provider', 'GETs', 'Coalesced'])
+
+    breakers = [[api.provider, api.base_url, stats['state'], stats['failures'], stats['times_opened'],
+                 f"{stats['retry_in']:.0f}" if stats['retry_in'] else '']
+                for api in apis for stats in [api.circuit_breaker.stats()]]
+    print()
+    print_output_table(breakers, ['Provider', 'Base URL', 'Circuit', 'Failures', 'Times Opened', 'Retry In (s)'])
+
+    for path in metrics.export():
+        print(f"Metrics written to {path}")
+
+def print_circuit_status(apis):
+    """
+    Prints a warning for every API client whose circuit breaker is not closed, so that
+    a provider outage is visible before choosing an action.
+
+    Args:
+        apis (list): The API clients to check.
+
+    Returns:
+        None. Prints nothing while every breaker is closed.
+    """
+    for api in apis:
+        stats = api.circuit_breaker.stats()
+        if stats['state'] == CircuitBreaker.OPEN:
+            print(red_text(f"{api.provider}: circuit open after {stats['failures']} consecutive failures. "
+                           f"Requests fail immediately for {stats['retry_in']:.0f} more seconds."))
+        elif stats['state'] == CircuitBreaker.HALF_OPEN:
+            print(yellow_text(f"{api.provider}: circuit half-open. The next request tests whether the API has recovered."))
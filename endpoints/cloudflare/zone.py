@@ -100,7 +100,7 @@ class Zone:
             - Calls self.get_dns_records() to retrieve DNS records for the selected zone.
         """
         url = 'zones'
-        data = self.api.api_get(url)
+        data = self.api.api_get_all(url, 'result')
         if valid_response_cloudflare(data):
             option, inst_list = print_input_menu(data['result'], 'What zone to select?: ', 'id', ['name'], True)
             self.zone_id = inst_list[int(option)][0]
@@ -158,7 +158,7 @@ class Zone:
         """
         if self.zone_id != '':
             url = f'zones/{self.zone_id}/dns_records'
-            data = self.api.api_get(url)
+            data = self.api.api_get_all(url, 'result')
             self.dns_records = data['result']
         else:
             self.dns_records = {}
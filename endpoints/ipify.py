@@ -1,12 +1,17 @@
-from requests import get
+import requests
+from api.api import request_timeout
+from api.transport import mount_transport
 
 class Ipify:
 
+    def __init__(self):
+        self.session = mount_transport(requests.Session())
+
     def get_ip4(self):
-        return get('https://api.ipify.org').content.decode('utf8')
+        return self.session.get('https://api.ipify.org', timeout=request_timeout('ipify')).content.decode('utf8')
 
     def get_ip6(self):
-        return get('https://api64.ipify.org').content.decode('utf8')
+        return self.session.get('https://api64.ipify.org', timeout=request_timeout('ipify')).content.decode('utf8')
 
     def print_ip(self):
         """
@@ -1,5 +1,6 @@
 from util import print_input_menu, print_output_table, valid_response_vultr, yellow_text
-from data import create_data_cache, load_data_cache
+from data import create_data_cache, load_catalog, open_catalog
+from api.api import quiet
 import settings
 
 class Application:
@@ -30,40 +31,53 @@ class Application:
         """
         self.api = api
         self.cache_file = 'vultr_applications.json'
-        self.applications = self.load_applications()
+        self.catalog = self.load_applications()
+
+    @property
+    def applications(self):
+        """
+        The whole cached applications data, `{'applications': [...], 'meta': {...}}`.
+        """
+        return self.catalog.document()
 
     def load_applications(self):
         """
-        Loads application data from the local JSON cache.
+        Opens the cached application data for lookups.
 
-        If no cached data exists, fetches and saves it from the Vultr API first.
+        If no cached data exists, fetches and saves it from the Vultr API first. A cache
+        older than its TTL is used as is while a fresh copy is fetched in the background.
 
         Returns:
-            dict: The applications data, structured as returned by the Vultr API.
+            DocumentCatalog or SqliteCatalog: Lookups in the applications data.
         """
-        data = load_data_cache(self.cache_file)
-        if data is None:
+        catalog = load_catalog(self.cache_file, 'applications', refresh=lambda: self.save_applications(verbose=False))
+        if catalog is None:
             print('No cached applications found, retrieving from API.')
             self.save_applications()
-            data = load_data_cache(self.cache_file)
-        return data
+            catalog = load_catalog(self.cache_file, 'applications')
+        return catalog
 
-    def save_applications(self):
+    def save_applications(self, verbose=True):
         """
         Fetches application data from the Vultr API and saves it to the local cache.
 
-        Validates the API response before writing. Reloads the in-memory applications
-        data after saving.
+        Validates the API response before writing. Swaps the saved data into the in-memory
+        applications data.
+
+        Args:
+            verbose (bool, optional): Set to False to print nothing, including API response summaries, as for background refreshes.
 
         Returns:
             None
         """
         url = 'applications'
-        data = self.api.api_get(url)
-        if valid_response_vultr(data):
-            print('Saving application data')
-            create_data_cache(self.cache_file, data)
-            self.load_applications()
+        with quiet(not verbose):
+            data = self.api.api_get_all(url, 'applications', fresh=True)
+        if (valid_response_vultr(data) if verbose else not data.get('error')):
+            if verbose:
+                print('Saving application data')
+            create_data_cache(self.cache_file, data, self.api.base_url + url)
+            self.catalog = open_catalog(self.cache_file, 'applications', data)
 
     def print_application(self):
         """
@@ -76,7 +90,7 @@ class Application:
             None
         """
         if self.__application_selected():
-            sel_application = next((application for application in self.applications['applications'] if application['id'] == self.application_id), None)
+            sel_application = self.catalog.get(self.application_id)
             if sel_application:
                 print(sel_application)
                 data = [
@@ -100,9 +114,9 @@ class Application:
         Returns:
             None
         """
-        option, r_list = print_input_menu(self.applications['applications'], 'What Application to select?: ', 'id', ['id', 'name', 'type'], True)
+        option, r_list = print_input_menu(self.catalog.all(), 'What Application to select?: ', 'id', ['id', 'name', 'type'], True)
         self.application_id = r_list[int(option) - 1][0]
-        app = next((app for app in self.applications['applications'] if app['id'] == self.application_id), None)
+        app = self.catalog.get(self.application_id)
         self.application_desc = app['name']
         self.application_image_id = app['image_id']
 
@@ -117,16 +131,11 @@ class Application:
         Returns:
             None
         """
-        applications_out = []
-        for a in self.preferred_application_ids:
-            for app in self.applications['applications']:
-                if app.get('id') == a:
-                    applications_out.append(app)
-                    break
+        applications_out = self.catalog.get_many(self.preferred_application_ids)
         option, r_list = print_input_menu(applications_out, 'What Application to select?: ', 'id', ['id', 'name', 'type'], False)
 
         self.application_id = r_list[int(option) - 1][0]
-        app = next((app for app in self.applications['applications'] if app['id'] == self.application_id), None)
+        app = self.catalog.get(self.application_id)
         self.application_desc = app['name']
         self.application_image_id = app['image_id']
 
@@ -1,4 +1,4 @@
-from util import utc_str_to_local, print_input_menu, valid_response_vultr, print_output_table, print_text_prompt, yellow_text
+from util import utc_str_to_local, print_input_menu, valid_response_vultr, print_output_table, print_text_prompt, yellow_text, red_text
 
 class Firewall:
     """
@@ -66,7 +66,7 @@ class Firewall:
             - Calls `self.get_firewall_rules()` for the selected firewall group.
         """
         url = 'firewalls'
-        data = self.api.api_get(url)
+        data = self.api.api_get_all(url, 'firewall_groups')
         if valid_response_vultr(data):
             option, fw_list = print_input_menu(data['firewall_groups'], 'What firewall to select?: ', 'id', ['description'], True)
             self.firewall_id = fw_list[int(option)][0]
@@ -190,7 +190,7 @@ class Firewall:
         """
         if self.firewall_selected():
             url = f'firewalls/{self.firewall_id}/rules'
-            data = self.api.api_get(url)
+            data = self.api.api_get_all(url, 'firewall_rules')
             if valid_response_vultr(data):
                 result = []
                 for i in data['firewall_rules']:
@@ -242,24 +242,18 @@ class Firewall:
         """
         Deletes all firewall rules associated with the current firewall.
 
-        This method retrieves the current list of firewall rules and iteratively deletes each rule
-        by sending a DELETE request to the API. For each successful deletion, it prints the status
+        This method retrieves the current list of firewall rules and deletes them all in one
+        concurrent batch of DELETE requests. For each successful deletion, it prints the status
         and additional information returned by the API.
 
-        Raises:
-            Any exceptions raised by the underlying API calls are not explicitly handled.
-
         Note:
             Assumes that `self.get_firewall_rules()` populates `self.firewall_rules` with a list of
             rules, where each rule is an iterable and the first element (`i[0]`) is the rule ID.
-            Also assumes the existence of `self.api.api_delete()` and `valid_response_vultr()`.
         """
         if not self.firewall_selected():
             return
         self.get_firewall_rules()
-        for i in self.firewall_rules:
-            self.firewall_rule_id = i[0]
-            self.delete_firewall_rule()
+        self.__delete_firewall_rules([i[0] for i in self.firewall_rules])
 
     def delete_firewall_rule_with_notes(self):
         """
@@ -283,10 +277,7 @@ class Firewall:
         option, fw_list = print_input_menu(notes, 'What firewall to select?: ', 'name', ['name'], False)
 
         # Delete firewall rules with matching notes
-        for i in self.firewall_rules:
-            if i[9] == fw_list[int(option) - 1][0]:
-                self.firewall_rule_id = i[0]
-                self.delete_firewall_rule()
+        self.__delete_firewall_rules([i[0] for i in self.firewall_rules if i[9] == fw_list[int(option) - 1][0]])
 
     def delete_firewall_rule(self):
         """
@@ -353,7 +344,7 @@ class Firewall:
         Returns:
             None
         Side Effects:
-            - Sends POST requests to the API to add firewall rules for TCP, UDP, and ICMP protocols.
+            - Sends POST requests to the API to add firewall rules for TCP, UDP, and ICMP protocols, concurrently in one batch.
             - Prints a message for each successfully added rule.
             - Displays a table of the added firewall rules.
         Preconditions:
@@ -370,6 +361,7 @@ class Firewall:
         )
 
         url = f'firewalls/{self.firewall_id}/rules'
+        calls = []
         for p in params:
             body = {
                     "ip_type": type,
@@ -380,9 +372,13 @@ class Firewall:
                     "source": "",
                     "notes": notes
                 }
+            calls.append(('POST', url, body))
 
-            data = self.api.api_post(url, body)
-            if valid_response_vultr(data):
+        for item in self.api.batch(calls):
+            data = item['result']
+            if item['exception'] is not None:
+                print(red_text(f" {item['request'][2]['protocol']}: {item['exception']}"))
+            elif valid_response_vultr(data):
                 print('Added Firewall Rule')
                 detail_row = [
                     data['firewall_rule']['type'],
@@ -410,6 +406,24 @@ class Firewall:
             print(yellow_text('No Firewall Selected!'))
             return False
 
+    def __delete_firewall_rules(self, rule_ids):
+        """
+        Deletes the given rules from the selected firewall in one concurrent batch.
+
+        Args:
+            rule_ids (list): IDs of the firewall rules to delete.
+
+        Side Effects:
+            Prints the status and info for each deleted rule, or the error for each failed one.
+        """
+        calls = [('DELETE', f'firewalls/{self.firewall_id}/rules/{rule_id}', None) for rule_id in rule_ids]
+        for item in self.api.batch(calls):
+            data = item['result']
+            if item['exception'] is not None:
+                print(red_text(f" {item['request'][1]}: {item['exception']}"))
+            elif valid_response_vultr(data):
+                print(f" {data['status']}: {data['info']}")
+
     def __firewall_rule_selected(self):
         """
         Checks if a firewall rule is currently selected.
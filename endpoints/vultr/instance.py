@@ -1,6 +1,8 @@
 from util import utc_str_to_local, print_input_menu, valid_response_vultr, print_output_table, \
     format_currency, print_yes_no, hour_minutee_day_diff, print_text_prompt, green_text, yellow_text, red_text
 from data import load_cloud_init_local, load_cloud_init_http
+import requests
+from api.api import deadline
 import settings
 
 class Instance:
@@ -80,14 +82,16 @@ class Instance:
         Fetches all Vultr compute instances and prompts the user to select one.
 
         Retrieves the list of instances from the Vultr API, displays them in a menu for user selection,
-        sets the selected instance's ID, and loads its details into the object's attributes.
+        sets the selected instance's ID, and loads its details from the listing into the object's attributes.
         """
         url = 'instances'
-        data = self.api.api_get(url)
+        data = self.api.api_get_all(url, 'instances')
         if valid_response_vultr(data):
             option, inst_list = print_input_menu(data['instances'], 'What instance to select?: ', 'id', ['label'], True)
             self.instance_id = inst_list[int(option)][0]
-            self.get_instance()
+            selected = next((i for i in data['instances'] if i['id'] == self.instance_id), None)
+            if selected:
+                self.__load_instance(selected)
 
     def get_instance(self):
         """
@@ -106,10 +110,19 @@ class Instance:
         url = f'instances/{self.instance_id}'
         data = self.api.api_get(url)
         if valid_response_vultr(data):
-            self.instance_tags = data['instance']['tags']
-            self.instance_hostname = data['instance']['hostname']
-            self.instance_ip4 = data['instance']['main_ip']
-            self.instance_ip6 = data['instance']['v6_main_ip']
+            self.__load_instance(data['instance'])
+
+    def __load_instance(self, instance):
+        """
+        Updates the selected instance's attributes from an instance object returned by the API.
+
+        Args:
+            instance (dict): An instance as found in the `instances` listing or the `instance` detail.
+        """
+        self.instance_tags = instance['tags']
+        self.instance_hostname = instance['hostname']
+        self.instance_ip4 = instance['main_ip']
+        self.instance_ip6 = instance['v6_main_ip']
 
     def print_instance(self):
         """
@@ -134,7 +147,7 @@ class Instance:
         """
         if self.instance_selected():
             url = f'instances/{self.instance_id}'
-            data = self.api.api_get(url)
+            data = self.api.api_get(url, fresh=True)
             if valid_response_vultr(data):
                 self.fw_obj.firewall_id = data['instance']['firewall_group_id']
                 self.fw_obj.get_firewall()
@@ -266,16 +279,22 @@ class Instance:
         Side Effects:
             - Sends a POST request to the 'instances' endpoint.
             - If the response is valid, sets `self.instance_id` to the new instance's ID and calls `self.get_instance()`.
+            - Both calls share one deadline of `settings.OPERATION_DEADLINE` seconds.
 
         Prints:
             - 'Instance created and selected' if the instance is successfully created and selected.
+            - An error if the deadline passes first.
         """
         url = 'instances'
-        data = self.api.api_post(url, body)
-        if valid_response_vultr(data):
-            print('Instance created and selected')
-            self.instance_id = data['instance']['id']
-            self.get_instance()
+        try:
+            with deadline(settings.OPERATION_DEADLINE):
+                data = self.api.api_post(url, body)
+                if valid_response_vultr(data):
+                    print('Instance created and selected')
+                    self.instance_id = data['instance']['id']
+                    self.get_instance()
+        except requests.Timeout as e: # Includes DeadlineExceeded
+            print(red_text(f'Instance creation did not complete in time: {e}'))
 
     def delete_instance(self):
         """
@@ -1,5 +1,6 @@
 from util import print_input_menu, print_output_table, valid_response_vultr, yellow_text
-from data import create_data_cache, load_data_cache
+from data import create_data_cache, load_catalog, open_catalog
+from api.api import quiet
 import settings
 
 class OS:
@@ -8,7 +9,8 @@ class OS:
         os_id (str): The ID of the currently selected operating system.
         os_desc (str): The description (name) of the currently selected operating system.
         preferred_os_ids (list): List of preferred OS IDs, typically loaded from settings.
-        os (dict or list): The loaded operating system data.
+        catalog: Lookups in the loaded operating system data.
+        os (dict): The whole loaded operating system data, read on first use.
     Methods:
         __init__(self, api):
             Initializes the OS class with the provided API client, sets up caching, and loads OS data.
@@ -41,52 +43,64 @@ class OS:
         Attributes:
             api: Stores the provided API client instance.
             cache_file (str): The filename used for caching OS data.
-            os: The loaded operating system data.
+            catalog: Lookups in the loaded operating system data.
         """
         self.api = api
         self.cache_file = 'vultr_os.json'
-        self.os = self.load_os()
+        self.catalog = self.load_os()
+
+    @property
+    def os(self):
+        """
+        The whole cached operating system data, `{'os': [...], 'meta': {...}}`.
+        """
+        return self.catalog.document()
 
     def load_os(self):
         """
-        Loads the operating system data from the cache file.
+        Opens the cached operating system data for lookups.
 
         If the cache does not exist or is empty, retrieves the data from the API,
-        saves it to the cache, and then loads it again.
+        saves it to the cache, and then opens it. A cache older than its TTL is
+        used as is while fresh data is fetched in the background.
 
         Returns:
-            dict or list: The cached operating system data, or the data retrieved from the API if not cached.
+            DocumentCatalog or SqliteCatalog: The cached operating system data, or the data retrieved from the API if not cached.
         """
-        data = load_data_cache(self.cache_file)
-        if data is None:
+        catalog = load_catalog(self.cache_file, 'os', refresh=lambda: self.save_os(verbose=False))
+        if catalog is None:
             print('No cached operating systems found, retrieving from API.')
             self.save_os()
-            data = load_data_cache(self.cache_file)
-        return data
+            catalog = load_catalog(self.cache_file, 'os')
+        return catalog
 
-    def save_os(self):
+    def save_os(self, verbose=True):
         """
         Retrieves operating system data from the Vultr API, saves it to a cache file,
         and reloads the operating system data.
         The method performs the following steps:
         1. Sends a GET request to the 'os' endpoint using the API client.
         2. Validates the response using `valid_response_vultr`.
-        3. If the response is valid, saves the data to a cache file and reloads the OS data.
+        3. If the response is valid, saves the data to a cache file and swaps it into `self.catalog`.
+        Args:
+            verbose (bool, optional): Set to False to print nothing, including API response summaries, as for background refreshes.
         Returns:
             None
         """
         url = 'os'
-        data = self.api.api_get(url)
-        if valid_response_vultr(data):
-            print('Saving operating system data')
-            create_data_cache(self.cache_file, data)
-            self.load_os()
+        with quiet(not verbose):
+            data = self.api.api_get_all(url, 'os', fresh=True)
+        if (valid_response_vultr(data) if verbose else not data.get('error')):
+            if verbose:
+                print('Saving operating system data')
+            create_data_cache(self.cache_file, data, self.api.base_url + url)
+            self.catalog = open_catalog(self.cache_file, 'os', data)
 
     def print_os(self):
         """
         Prints information about the currently selected operating system.
 
-        If an OS is selected, this method retrieves its details from the internal OS list
+        If an OS is selected, this method looks up its details in the OS catalog
         and prints both the raw OS dictionary and a formatted table containing its ID, name,
         architecture, and family.
 
@@ -94,7 +108,7 @@ class OS:
             None
         """
         if self.__os_selected():
-            sel_os = next((os for os in self.os['os'] if os['id'] == self.os_id), None)
+            sel_os = self.catalog.get(self.os_id)
             if sel_os:
                 data = [
                     ['ID', sel_os['id']],
@@ -116,7 +130,7 @@ class OS:
             Sets self.os_id to the ID of the selected OS.
             Sets self.os_desc to the description (name) of the selected OS.
         """
-        option, r_list = print_input_menu(self.os['os'], 'What OS to select?: ', 'id', ['id', 'name', 'arch', 'family'], False)
+        option, r_list = print_input_menu(self.catalog.all(), 'What OS to select?: ', 'id', ['id', 'name', 'arch', 'family'], False)
         self.os_id = r_list[int(option) - 1][0]
         self.os_desc = r_list[int(option) - 1][1]
 
@@ -124,19 +138,14 @@ class OS:
         """
         Presents a menu of preferred operating systems to the user and allows selection.
 
-        Iterates through the list of preferred OS IDs, matches them with available OS entries,
+        Looks up the preferred OS IDs among the available OS entries, in the order they are listed,
         and displays a selection menu. Updates the instance's `os_id` and `os_desc` attributes
         based on the user's choice.
 
         Returns:
             None
         """
-        os_out = []
-        for o in self.preferred_os_ids:
-            for os in self.os['os']:
-                if os.get('id') == o:
-                    os_out.append(os)
-                    break
+        os_out = self.catalog.get_many(self.preferred_os_ids)
         option, r_list = print_input_menu(os_out, 'What OS to select?: ', 'id', ['id', 'name', 'arch', 'family'], False)
         self.os_id = r_list[int(option) - 1][0]
         self.os_desc = r_list[int(option) - 1][1]
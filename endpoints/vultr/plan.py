@@ -1,5 +1,6 @@
 from util import print_input_menu, valid_response_vultr, print_output_table, format_currency, yellow_text
-from data import create_data_cache, load_data_cache
+from data import create_data_cache, load_catalog, open_catalog
+from api.api import quiet
 import settings
 
 class Plan:
@@ -9,15 +10,17 @@ class Plan:
         plan_desc (str): The description of the selected plan.
         api: Instance of the API client used for making requests.
         cache_file (str): The filename used for caching plan data.
-        plans (list): List of plans loaded from the cache or API.
+        catalog: Lookups in the plans loaded from the cache or API.
+        plans (dict): The whole cached plan data, read on first use.
         obj_region: The region object associated with the plan.
     Methods:
         __init__(api, region):
             Initializes the Plan class with the provided API client and region, sets up caching, and loads available plans.
         load_plans():
             Loads plans from the cache file if available, otherwise retrieves them from the API and caches them.
-        save_plans():
-            Retrieves plan data from the Vultr API and saves it to the cache file.
+            A stale cache is refreshed in the background.
+        save_plans(verbose):
+            Retrieves plan data from the Vultr API, saves it to the cache file and swaps it into `catalog`.
         get_all_plan():
             Displays a menu of all available plans for user selection and sets the selected plan's ID and description.
         get_preferred_plan():
@@ -28,8 +31,7 @@ class Plan:
     plan_id = str('')
     plan_desc = str('')
     preferred_plan_ids = settings.PREFERRED_PLAN_IDS
-    plans = {}
-    preferred_plans = []
+    catalog = None
     region_plans = []
     preferred_region_plans = []
 
@@ -40,34 +42,50 @@ class Plan:
         Attributes:
             api: Stores the provided API client instance.
             cache_file: The filename used for caching plan data.
-            plans: A list of plans loaded from the cache or API.
+            catalog: Lookups in the plans loaded from the cache or API.
         """
         self.api = api
         self.obj_region = region
         self.cache_file = 'vultr_plans.json'
+        self.__preferred_plans = None
         self.load_plans()
-        self.get_preferred_plans()
+
+    @property
+    def plans(self):
+        """
+        The whole cached plan data, `{'plans': [...], 'meta': {...}}`.
+        """
+        return self.catalog.document()
+
+    @property
+    def preferred_plans(self):
+        """
+        The plans listed in `preferred_plan_ids`, looked up on first use.
+        """
+        if self.__preferred_plans is None:
+            self.get_preferred_plans()
+        return self.__preferred_plans
 
     def load_plans(self):
         """
-        Loads plan data from the cache file into the `self.plans` attribute.
+        Opens the cached plan data for lookups as the `self.catalog` attribute.
 
         If the cache file does not exist or contains no data, retrieves the plans from the API,
-        saves them to the cache, and reloads the plans from the cache file.
+        saves them to the cache, and reopens the cache. If the cache is
+        older than its TTL, it is used as is while fresh plans are fetched in the background.
 
         Side Effects:
-            - Updates `self.plans` with the loaded or retrieved plan data.
+            - Updates `self.catalog` with the loaded or retrieved plan data.
             - May print a message if no cached plans are found.
             - May call `self.save_plans()` to fetch and cache plans from the API.
         """
-        self.plans = {}
-        self.plans = load_data_cache(self.cache_file)
-        if self.plans is None:
+        self.catalog = load_catalog(self.cache_file, 'plans', refresh=lambda: self.save_plans(verbose=False))
+        if self.catalog is None:
             print('No cached plans found, retrieving from API.')
             self.save_plans()
-            self.plans = load_data_cache(self.cache_file)
+            self.catalog = load_catalog(self.cache_file, 'plans')
 
-    def save_plans(self):
+    def save_plans(self, verbose=True):
         """
         Fetches plan data from the API, formats the monthly cost for each plan, and saves the processed data to a cache file.
 
@@ -75,18 +93,25 @@ class Plan:
         1. Retrieves plan data from the API endpoint.
         2. Validates the API response.
         3. Formats the 'monthly_cost' field for each plan into a currency string and adds it as 'monthly_cost_str'.
-        4. Saves the updated plan data to a cache file.
+        4. Saves the updated plan data to a cache file and swaps it into `self.catalog`.
+
+        Args:
+            verbose (bool, optional): Set to False to print nothing, including API response summaries, as for background refreshes.
 
         Returns:
             None
         """
         url = 'plans'
-        data = self.api.api_get(url)
-        if valid_response_vultr(data):
+        with quiet(not verbose):
+            data = self.api.api_get_all(url, 'plans', fresh=True)
+        if (valid_response_vultr(data) if verbose else not data.get('error')):
             for plan in data["plans"]:
                 plan["monthly_cost_str"] = format_currency(plan['monthly_cost'])
-            print('Saving plans data')
-            create_data_cache(self.cache_file, data)
+            if verbose:
+                print('Saving plans data')
+            create_data_cache(self.cache_file, data, self.api.base_url + url)
+            self.catalog = open_catalog(self.cache_file, 'plans', data)
+            self.__preferred_plans = None # Looked up again in the new plans on next use
 
     def print_plan(self):
         """
@@ -100,7 +125,7 @@ class Plan:
             None
         """
         if self.__plan_selected():
-            sel_plan = next((plan for plan in self.plans['plans'] if plan['id'] == self.plan_id), None)
+            sel_plan = self.catalog.get(self.plan_id)
             if sel_plan:
                 result = [
                     ['ID', sel_plan['id']],
@@ -122,36 +147,26 @@ class Plan:
         """
         Filters and stores the plans whose IDs are listed in `self.preferred_plan_ids`.
 
-        Iterates through the list of preferred plan IDs and searches for matching plans in `self.plans['plans']`.
-        Each matching plan is appended to `self.preferred_plans`.
+        Looks up the preferred plan IDs in `self.catalog`, keeping the order they are listed in.
 
         Returns:
             None
         """
-        self.preferred_plans = []
-        for o in self.preferred_plan_ids:
-            for plan in self.plans['plans']:
-                if plan.get("id") == o:
-                    self.preferred_plans.append(plan)
-                    break
+        self.__preferred_plans = self.catalog.get_many(self.preferred_plan_ids) # Swapped in whole, as a background refresh may rebuild it
 
     def get_region_plans(self):
         """
         Filters and stores plans available for the currently selected region.
 
-        Iterates through all available plans and checks if the selected region's ID
-        is present in each plan's 'locations'. If so, the plan is added to the
-        'region_plans' list. Returns True if a region is selected and plans are filtered,
+        Looks up the plans whose 'locations' include the selected region's ID and
+        stores them in the 'region_plans' list. Returns True if a region is selected and plans are filtered,
         otherwise returns False.
 
         Returns:
             bool: True if a region is selected and plans are filtered, False otherwise.
         """
         if self.obj_region.region_selected():
-            self.region_plans = []
-            for plan in self.plans['plans']:
-                if self.obj_region.region_id in plan.get('locations'):
-                    self.region_plans.append(plan)
+            self.region_plans = self.catalog.find(region=self.obj_region.region_id)
             return True
         else:
             return False
@@ -167,10 +182,7 @@ class Plan:
             Updates self.preferred_region_plans with plans that are available in the selected region and whose IDs are in self.preferred_plan_ids.
         """
         if self.obj_region.region_selected():
-            self.preferred_region_plans = []
-            for plan in self.plans['plans']:
-                if self.obj_region.region_id in plan.get('locations') and plan.get('id') in self.preferred_plan_ids:
-                    self.preferred_region_plans.append(plan)
+            self.preferred_region_plans = self.catalog.find(region=self.obj_region.region_id, ids=self.preferred_plan_ids)
             return True
         else:
             return False
@@ -179,13 +191,13 @@ class Plan:
         """
         Displays all available plans by printing the list of plans.
 
-        This method retrieves the 'plans' from the instance's `plans` attribute and
+        This method retrieves every plan from the instance's `catalog` and
         passes them to the internal `__print_plans` method for display.
 
         Returns:
             None
         """
-        self.__print_plans(self.plans['plans'], zero_row)
+        self.__print_plans(self.catalog.all(), zero_row)
 
     def select_preferred_plans(self, zero_row = True):
         """
@@ -231,7 +243,7 @@ class Plan:
         """
         Prints all available plans in a formatted table.
 
-        Utilizes the `print_output_table` function to display the plans stored in `self.plans['plans']`.
+        Utilizes the `print_input_menu` function to display the plans in `plan_set`.
         Returns:
             None
         """
@@ -1,6 +1,7 @@
 from requests import options
 from util import print_input_menu, valid_response_vultr, print_output_table, format_option, yellow_text
-from data import create_data_cache, load_data_cache
+from data import create_data_cache, load_catalog, open_catalog
+from api.api import quiet
 import settings
 
 class Region:
@@ -11,13 +12,14 @@ class Region:
         region_desc (str): The description/name of the selected region.
         api: An API client instance used to interact with Vultr endpoints.
         cache_file (str): The filename for caching region data.
-        regions: Cached region data loaded from file.
+        catalog: Lookups in the cached region data.
+        regions: The whole cached region data, read on first use.
     Methods:
         __init__(api):
             Initializes the Region instance with the provided API client, sets up the cache file, and loads region data.
         load_regions():
             Loads region data from the cache file. If no cached data is found, retrieves data from the API and caches it.
-        save_regions():
+        save_regions(verbose):
             Retrieves region data from the Vultr API and saves it to the cache file if the response is valid.
         get_preferred_region():
             Prompts the user to select a preferred region from a hardcoded list, and sets the region_id and region_desc attributes accordingly.
@@ -36,56 +38,70 @@ class Region:
         Attributes:
             api: Stores the provided API client.
             cache_file (str): The filename for caching region data.
-            regions: The loaded region data from the cache file.
+            catalog: Lookups in the cached region data.
         """
         self.api = api
         self.cache_file = 'vultr_regions.json'
-        self.regions = self.load_regions()
+        self.catalog = self.load_regions()
+
+    @property
+    def regions(self):
+        """
+        The whole cached region data, `{'regions': [...], 'meta': {...}}`.
+        """
+        return self.catalog.document()
 
     def load_regions(self):
         """
-        Loads region data from the cache file. If no cached data is found, retrieves region data from the API,
-        saves it to the cache, and then loads it from the cache.
+        Opens the cached region data for lookups. If no cached data is found, retrieves region data from the API,
+        saves it to the cache, and then opens it. A cache older than its TTL is used
+        as is while fresh regions are fetched in the background.
 
         Returns:
-            dict or None: The cached region data if available, otherwise None.
+            DocumentCatalog or SqliteCatalog or None: The cached region data if available, otherwise None.
         """
-        data = load_data_cache(self.cache_file)
-        if data is None:
+        catalog = load_catalog(self.cache_file, 'regions', refresh=lambda: self.save_regions(verbose=False))
+        if catalog is None:
             print('No cached regions found, retrieving from API.')
             self.save_regions()
-            data = load_data_cache(self.cache_file)
-        return data
+            catalog = load_catalog(self.cache_file, 'regions')
+        return catalog
 
-    def save_regions(self):
+    def save_regions(self, verbose=True):
         """
         Retrieves region data from the Vultr API and saves it to a cache file.
 
         This method sends a GET request to the 'regions' endpoint using the API client.
-        If the response is valid, it prints a message and caches the region data.
+        If the response is valid, it prints a message, caches the region data and swaps it into `self.catalog`.
+
+        Args:
+            verbose (bool, optional): Set to False to print nothing, including API response summaries, as for background refreshes.
 
         Returns:
             None
         """
         url = 'regions'
-        data = self.api.api_get(url)
-        if valid_response_vultr(data):
-            print('Saving regions data')
-            create_data_cache(self.cache_file, data)
+        with quiet(not verbose):
+            data = self.api.api_get_all(url, 'regions', fresh=True)
+        if (valid_response_vultr(data) if verbose else not data.get('error')):
+            if verbose:
+                print('Saving regions data')
+            create_data_cache(self.cache_file, data, self.api.base_url + url)
+            self.catalog = open_catalog(self.cache_file, 'regions', data)
 
     def print_region(self):
         """
         Prints information about the currently selected region.
 
-        If a region is selected, this method retrieves the region details from the list of regions
-        using the region ID, prints the region dictionary, and then displays a formatted table
+        If a region is selected, this method looks up the region details by the region ID,
+        prints the region dictionary, and then displays a formatted table
         containing the region's ID, city, country, continent, and options.
 
         Returns:
             None
         """
         if self.region_selected():
-            sel_region = next((region for region in self.regions['regions'] if region['id'] == self.region_id), None)
+            sel_region = self.catalog.get(self.region_id)
             if sel_region:
                 options = sel_region['options']
                 options_formatted = '\n'.join(f'- {format_option(opt)}' for opt in options)
@@ -109,34 +125,30 @@ class Region:
         Returns:
             None
         """
-        option, r_list = print_input_menu(self.regions['regions'], 'What region to select?: ', 'id', ['city', 'country', 'continent'], False)
+        option, r_list = print_input_menu(self.catalog.all(), 'What region to select?: ', 'id', ['city', 'country', 'continent'], False)
         self.region_id = r_list[int(option) - 1][0]
         self.region_desc = r_list[int(option) - 1][1]
 
     def get_preferred_region(self):
         """
         Prompts the user to select a preferred region from a list of region IDs.
-        Iterates through the preferred region IDs and matches them with available regions.
+        Looks up the preferred region IDs among the available regions, in the order they are listed.
         Displays a menu for the user to choose a region, showing details such as city, country, and continent.
         Sets the selected region's ID and description as instance attributes.
         Returns:
             None
         """
-        regions = []
-        for o in self.preferred_region_ids:
-            for region in self.regions["regions"]:
-                if region.get("id") == o:
-                    regions.append(region)
-                    break
+        regions = self.catalog.get_many(self.preferred_region_ids)
         option, r_list = print_input_menu(regions, 'What region to select?: ', 'id', ['city', 'country', 'continent'], False)
         self.region_id = r_list[int(option) - 1][0]
         self.region_desc = r_list[int(option) - 1][1]
 
-    def city_from_id(selct, region_id):
-        for region in selct.regions['regions']:
-            if region['id'] == region_id:
-                return region['city']
-        return region_id
+    def city_from_id(self, region_id):
+        """
+        Returns the city of a region, or `region_id` itself if the region is unknown.
+        """
+        region = self.catalog.get(region_id)
+        return region['city'] if region else region_id
 
     def region_selected(self):
         """
@@ -50,7 +50,7 @@ class Snapshot:
             Sets self.snapshot_id and self.snapshot_desc based on the user's selection.
         """
         url = 'snapshots'
-        data = self.api.api_get(url)
+        data = self.api.api_get_all(url, 'snapshots')
         if valid_response_vultr(data):
             option, ss_list = print_input_menu(data['snapshots'], 'What snapshot to select?: ', 'id', ['description', 'status'], True)
             self.snapshot_id = ss_list[int(option)][0]
@@ -69,7 +69,7 @@ class Snapshot:
         """
         if self.snapshot_selected():
             url = f'snapshots/{self.snapshot_id}'
-            data = self.api.api_get(url)
+            data = self.api.api_get(url, fresh=True)
             if valid_response_vultr(data):
                 result = [
                     # ['id', data['snapshot']['id']],
@@ -0,0 +1,53 @@
+"""
+JSON encoding and decoding with the fastest available backend.
+
+orjson is used when it is installed (`pip install orjson`); otherwise the standard
+library `json` module is used. Both backends produce the same objects, and decode
+errors are always `json.JSONDecodeError` (orjson's error type subclasses it).
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+JSONDecodeError = json.JSONDecodeError
+
+def loads(data):
+    """
+    Decodes a JSON document.
+
+    Args:
+        data (bytes, str or buffer): The JSON text, e.g. a memoryview of a mapped file.
+
+    Returns:
+        Any: The decoded object.
+
+    Raises:
+        JSONDecodeError: If `data` is not valid JSON, including when it is empty or not valid UTF-8.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    if not isinstance(data, str):
+        try:
+            data = str(data, 'utf-8')
+        except UnicodeDecodeError as e:
+            raise JSONDecodeError(f'Invalid UTF-8: {e.reason}', str(data, 'utf-8', 'replace'), e.start) from e
+    return json.loads(data)
+
+def dumps(obj, indent=False):
+    """
+    Encodes an object as UTF-8 JSON.
+
+    Args:
+        obj (Any): The object to encode.
+        indent (bool, optional): Set to True to indent by two spaces for readability.
+
+    Returns:
+        bytes: The JSON text.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
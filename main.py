@@ -3,7 +3,7 @@ from pathlib import Path
 from dotenv import load_dotenv
 import os
 import importlib.util
-from util import yellow_text, red_text
+from util import yellow_text, red_text, apply_setting_defaults
 
 def module_exists(module_name):
     return importlib.util.find_spec(module_name) is not None
@@ -33,6 +33,8 @@ if not hasattr(settings, 'PRINT_API_RESPONSE_SUMMARY'):
     print(yellow_text('PRINT_API_RESPONSE_SUMMARY setting not found. Disabling.'))
     settings.PRINT_API_RESPONSE_SUMMARY = False
 
+apply_setting_defaults() # Optional API tuning settings fall back to defaults silently
+
 # Validate required settings.py variables
 required_settings = [
     'PREFERRED_APPLICATION_ONLY',
@@ -71,7 +73,8 @@ from api.cloudflare import Cloudflare
 from menu import Menu
 
 # Load APIs using keys from config file. Display main menu.
-vultr_api = Vultr(str(os.getenv('VULTR_API_KEY')))
-cloudflare_api = Cloudflare(str(os.getenv('CLOUDFLARE_EMAIL')), str(os.getenv('CLOUDFLARE_API_KEY')))
-menu = Menu(vultr_api, cloudflare_api)
-menu.main_menu()
+# The clients are closed on exit so their pooled connections are released cleanly.
+with Vultr(str(os.getenv('VULTR_API_KEY'))) as vultr_api, \
+        Cloudflare(str(os.getenv('CLOUDFLARE_EMAIL')), str(os.getenv('CLOUDFLARE_API_KEY'))) as cloudflare_api:
+    menu = Menu(vultr_api, cloudflare_api)
+    menu.main_menu()
@@ -9,6 +9,8 @@ from endpoints.vultr.region import Region
 from endpoints.vultr.snapshot import Snapshot
 from endpoints.cloudflare.zone import Zone
 from endpoints.ipify import Ipify
+from endpoints.api_stats import print_api_stats, print_circuit_status
+from api.tracing import traced
 from util import print_input_menu, print_text_prompt
 
 class Menu():
@@ -60,18 +62,21 @@ class Menu():
             obj_ss: Snapshot object for Vultr snapshots.
             obj_cf: Zone object for Cloudflare zones.
             obj_i: Instance object for Vultr compute instances, initialized with dependencies.
+
+        The resource objects are wrapped by `traced()`, so when tracing is enabled each
+        menu action records a span with the API calls it makes nested beneath it.
         """
         self.vultr_api = vultr_api                # Vultr API Object
         self.cloudflare_api = cloudflare_api      # Cloudflare API Object
-        self.obj_ip = Ipify()                     # Ipify Zone Object
-        self.obj_fw = Firewall(self.vultr_api, self.obj_ip) # Firewall Object
-        self.obj_r = Region(self.vultr_api)       # Vultr Region Object
-        self.obj_p = Plan(self.vultr_api, self.obj_r) # Vultr Compute Plan Object
-        self.obj_ss = Snapshot(self.vultr_api)    # Vultr Snapshot Object
-        self.obj_os = OS(self.vultr_api)          # Initialize Operating System Object
-        self.obj_ap = Application(self.vultr_api) # Initialize Application Object
-        self.obj_cf = Zone(self.cloudflare_api)   # Cloudflare Zone Object
-        self.obj_i = Instance(self.vultr_api, self.obj_fw, self.obj_ss, self.obj_cf, self.obj_p, self.obj_r, self.obj_os, self.obj_ap) # Vultr Compute Instance Object
+        self.obj_ip = traced(Ipify())             # Ipify Zone Object
+        self.obj_fw = traced(Firewall(self.vultr_api, self.obj_ip)) # Firewall Object
+        self.obj_r = traced(Region(self.vultr_api)) # Vultr Region Object
+        self.obj_p = traced(Plan(self.vultr_api, self.obj_r)) # Vultr Compute Plan Object
+        self.obj_ss = traced(Snapshot(self.vultr_api)) # Vultr Snapshot Object
+        self.obj_os = traced(OS(self.vultr_api))  # Initialize Operating System Object
+        self.obj_ap = traced(Application(self.vultr_api)) # Initialize Application Object
+        self.obj_cf = traced(Zone(self.cloudflare_api)) # Cloudflare Zone Object
+        self.obj_i = traced(Instance(self.vultr_api, self.obj_fw, self.obj_ss, self.obj_cf, self.obj_p, self.obj_r, self.obj_os, self.obj_ap)) # Vultr Compute Instance Object
 
     def main_menu(self):
         """
@@ -79,7 +84,9 @@ class Menu():
 
         Presents a list of options to the user, including Account, Instances, Firewall, Snapshot, DNS Zones, and Exit.
         Based on the user's input, calls the corresponding method to handle the selected area or exits the application.
+        Any API whose circuit breaker is open or half-open is flagged above the options.
         """
+        print_circuit_status([self.vultr_api, self.cloudflare_api])
         options = [
             {'id': 1, 'name': 'Account'},
             {'id': 2, 'name': 'Instances'},
@@ -528,12 +535,14 @@ class Menu():
         Displays a menu with additional options for the user, such as viewing their IP address or returning to the main menu.
         Presents the user with a list of actions:
             1. Display the user's IP address by calling `self.obj_ip.print_ip()` and then redisplays this menu.
-            2. Return to the main menu by calling `self.main_menu()`.
+            2. Display per-endpoint API request statistics by calling `print_api_stats()` and then redisplays this menu.
+            3. Return to the main menu by calling `self.main_menu()`.
         Utilizes `print_input_menu` to render the menu and handle user input.
         """
         options = [
             {'id': 1, 'name': 'My IP Address'},
-            {'id': 2, 'name': 'Go Back'},
+            {'id': 2, 'name': 'Show API Stats'},
+            {'id': 3, 'name': 'Go Back'},
         ]
         option, inst_list = print_input_menu(options, 'What action?: ', 'id', ['name'], False)
         match option:
@@ -541,4 +550,7 @@ class Menu():
                 self.obj_ip.print_ip()
                 self.other()
             case '2':
+                print_api_stats([self.vultr_api, self.cloudflare_api])
+                self.other()
+            case '3':
                 self.main_menu()
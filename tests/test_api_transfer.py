@@ -0,0 +1,95 @@
+import http.server
+import threading
+import time
+import unittest
+from unittest import mock
+import requests
+import settings
+from util import apply_setting_defaults
+
+apply_setting_defaults()
+
+from api.api import DeadlineExceeded, deadline, get_circuit_breaker
+from api.vultr import Vultr
+
+BODY = b'{"account": {"name": "test", "balance": 0}}'
+
+class ScriptedHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Answers every GET and POST with `BODY`. The first `server.truncate` responses break off after
+    a few body bytes, and every body is sent `server.body_delay` seconds after the headers.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        self.server.hits += 1
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.flush()
+        if self.server.hits <= self.server.truncate:
+            self.wfile.write(BODY[:5])
+            self.close_connection = True
+            return
+        time.sleep(self.server.body_delay)
+        self.wfile.write(BODY)
+
+    do_POST = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+class TransferTest(unittest.TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), ScriptedHandler)
+        self.server.daemon_threads = True
+        self.server.hits = 0
+        self.server.truncate = 0
+        self.server.body_delay = 0.0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        for name, value in {
+            'PRINT_API_RESPONSE_SUMMARY': False,
+            'API_DISK_CACHE': False,
+            'API_RATE_LIMITS': {'vultr': {'rate': 1e9, 'burst': 1e9}, 'cloudflare': {'rate': 1e9, 'burst': 1e9}},
+            'API_RETRY': dict(settings.API_RETRY, backoff_base=0.01, backoff_max=0.01),
+        }.items():
+            patcher = mock.patch.object(settings, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.api = Vultr('test-token')
+        self.addCleanup(self.api.close)
+        self.api.base_url = f'http://127.0.0.1:{self.server.server_address[1]}/{self.id()}/'
+
+    def test_get_broken_off_mid_body_is_retried(self):
+        self.server.truncate = 1
+        self.assertEqual(self.api.api_get('account'), {'account': {'name': 'test', 'balance': 0}})
+        self.assertEqual(self.server.hits, 2)
+
+    def test_post_broken_off_mid_body_is_not_retried(self):
+        self.server.truncate = 1
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            self.api.api_post('account', {})
+        self.assertEqual(self.server.hits, 1)
+
+    def test_deadline_clipping_a_slow_body_read(self):
+        self.server.body_delay = 1.0
+        start = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            with deadline(0.3):
+                self.api.api_get('account')
+        self.assertLess(time.monotonic() - start, 0.9)
+        self.assertEqual(self.server.hits, 1) # Not retried
+        self.assertEqual(get_circuit_breaker(self.api.base_url).stats()['failures'], 0)
+
+    def test_slow_body_read_without_deadline_is_a_read_timeout(self):
+        self.server.body_delay = 1.0
+        with mock.patch.object(settings, 'API_TIMEOUTS', {'default': {'connect': 5, 'read': 0.2}}):
+            with self.assertRaises(requests.ReadTimeout):
+                self.api.api_post('account', {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import asyncio
+import unittest
+from unittest import mock
+import settings
+from util import apply_setting_defaults
+
+apply_setting_defaults()
+
+from api.async_cloudflare import AsyncCloudflare
+from api.async_vultr import AsyncVultr
+from api.cloudflare import Cloudflare
+from api.vultr import Vultr
+from benchmarks.standin_server import Dataset, cloudflare_url, start_server, vultr_url
+
+class AsyncPaginationTest(unittest.TestCase):
+    def setUp(self):
+        self.server = start_server(dataset=Dataset(instances=1200, zones=1, dns_records=1200))
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        for name, value in {'PRINT_API_RESPONSE_SUMMARY': False, 'API_DISK_CACHE': False}.items():
+            patcher = mock.patch.object(settings, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def get_all(self, client, url, key):
+        async def run():
+            async with client:
+                return await client.get_all(url, key)
+        return asyncio.run(run())
+
+    def test_vultr_matches_sync_client(self):
+        sync = Vultr('test-token')
+        self.addCleanup(sync.close)
+        sync.base_url = vultr_url(self.server)
+        client = AsyncVultr('test-token')
+        client.base_url = vultr_url(self.server)
+        self.assertEqual(self.get_all(client, 'instances', 'instances'), sync.api_get_all('instances', 'instances'))
+
+    def test_cloudflare_matches_sync_client(self):
+        sync = Cloudflare('user@example.com', 'test-token')
+        self.addCleanup(sync.close)
+        sync.base_url = cloudflare_url(self.server)
+        zone = next(iter(self.server.dataset.zones))
+        url = f'zones/{zone}/dns_records'
+        client = AsyncCloudflare('user@example.com', 'test-token')
+        client.base_url = cloudflare_url(self.server)
+        result = self.get_all(client, url, 'result')
+        self.assertEqual(result['meta']['total'], 1200)
+        self.assertEqual(result, sync.api_get_all(url, 'result'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+import settings
+from util import apply_setting_defaults
+
+apply_setting_defaults()
+
+from api.cache import DiskCache, MemoryCache
+from api.vultr import Vultr
+
+class MemoryCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = MemoryCache(16, {r'^instances': 60})
+
+    def test_hits_are_copies(self):
+        data = {'instances': [{'id': 'a'}]}
+        self.cache.put('k', 'instances', data)
+        data['instances'].append({'id': 'b'})
+        hit, first = self.cache.get('k')
+        self.assertTrue(hit)
+        first['instances'].clear()
+        self.assertEqual(self.cache.get('k'), (True, {'instances': [{'id': 'a'}]}))
+
+    def test_put_after_invalidation_is_dropped(self):
+        generation = self.cache.generation
+        self.cache.invalidate('instances')
+        self.cache.put('k', 'instances', {'instances': []}, generation)
+        self.assertEqual(self.cache.get('k'), (False, None))
+        self.cache.put('k', 'instances', {'instances': []}, self.cache.generation)
+        self.assertEqual(self.cache.get('k'), (True, {'instances': []}))
+
+class DiskCacheTest(unittest.TestCase):
+    def test_entries_are_copies(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = DiskCache(directory, [r'^plans$'])
+            cache.store('k', 'https://example/plans', {'ETag': '"1"'}, {'plans': [{'id': 'p'}]})
+            cache.get('k')['data']['plans'].clear()
+            self.assertEqual(cache.get('k')['data'], {'plans': [{'id': 'p'}]})
+            self.assertEqual(DiskCache(directory, [r'^plans$']).get('k')['etag'], '"1"')
+
+class WriteInvalidationTest(unittest.TestCase):
+    def test_get_in_flight_during_write_is_not_cached(self):
+        with mock.patch.object(settings, 'API_DISK_CACHE', False):
+            api = Vultr('test-token')
+        self.addCleanup(api.close)
+        listing = {'instances': [{'id': 'old'}]}
+        get_sent, write_done = threading.Event(), threading.Event()
+
+        def send(method, url, data=None, retry=None, stream=False):
+            if method == 'GET':
+                response = {'instances': list(listing['instances'])} # Read before the write lands
+                get_sent.set()
+                write_done.wait(5)
+                return response
+            listing['instances'] = [{'id': 'new'}]
+            return {'instance': {'id': 'new'}}
+
+        with mock.patch.object(api, '_Api__send', send):
+            reader = threading.Thread(target=api.api_get, args=('instances',))
+            reader.start()
+            get_sent.wait(5)
+            api.api_post('instances', {})
+            write_done.set()
+            reader.join(5)
+            self.assertEqual(api.api_get('instances'), {'instances': [{'id': 'new'}]})
+
+if __name__ == '__main__':
+    unittest.main()
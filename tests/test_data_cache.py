@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import settings
+from util import apply_setting_defaults
+
+apply_setting_defaults()
+
+import data
+from api.vultr import Vultr
+from benchmarks.standin_server import start_server, vultr_url
+from endpoints.vultr.region import Region
+
+class CorruptCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.server = start_server()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        cwd = os.getcwd()
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        os.chdir(workdir.name)
+        self.addCleanup(os.chdir, cwd)
+        for name, value in {
+            'PRINT_API_RESPONSE_SUMMARY': False,
+            'API_DISK_CACHE': False,
+            'DATA_CACHE_STORE': 'file',
+        }.items():
+            patcher = mock.patch.object(settings, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.api = Vultr('test-token')
+        self.addCleanup(self.api.close)
+        self.api.base_url = vultr_url(self.server)
+        self.region_id = self.server.dataset.regions[0]['id']
+        self.city = self.server.dataset.regions[0]['city']
+
+    def truncate_cache(self):
+        """Leaves the region cache half-written, as an interrupted save would."""
+        data.create_data_cache('vultr_regions.json', {'regions': [{'id': self.region_id, 'city': 'Old'}], 'meta': {}}, ttl=60)
+        file_path = data.cache_path('vultr_regions.json')
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        with open(file_path, 'wb') as f:
+            f.write(raw[:len(raw) // 2])
+        return file_path
+
+    def test_save_repairs_truncated_file(self):
+        for fmt in ('json', 'msgpack'):
+            with self.subTest(fmt=fmt), mock.patch.object(settings, 'DATA_CACHE_FORMAT', fmt):
+                file_path = self.truncate_cache()
+                self.assertIsNone(data.read_data_cache('vultr_regions.json'))
+
+                region = Region.__new__(Region)
+                region.api = self.api
+                region.cache_file = 'vultr_regions.json'
+                region.save_regions(verbose=False)
+
+                entry = data.read_cache_file(file_path, 'vultr_regions.json')
+                self.assertEqual(entry['data']['regions'][0]['city'], self.city)
+
+    def test_lookup_in_truncated_file_refreshes(self):
+        self.truncate_cache()
+        region = Region(self.api)
+        self.assertEqual(region.city_from_id(self.region_id), self.city)
+        self.assertEqual(region.city_from_id(self.region_id), self.city)
+        self.assertIsNotNone(data.read_data_cache('vultr_regions.json'))
+
+    def test_truncated_file_without_refresh_is_empty(self):
+        self.truncate_cache()
+        catalog = data.load_catalog('vultr_regions.json', 'regions')
+        self.assertEqual(catalog.all(), [])
+        self.assertIsNone(catalog.get(self.region_id))
+        self.assertEqual(catalog.find(region=self.region_id), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import contextlib
+import io
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+import settings
+from util import apply_setting_defaults
+
+apply_setting_defaults()
+
+import data
+from api.vultr import Vultr
+from benchmarks.standin_server import start_server, vultr_url
+from endpoints.vultr.region import Region
+
+class BackgroundRefreshTest(unittest.TestCase):
+    def setUp(self):
+        self.server = start_server()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        cwd = os.getcwd()
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        os.chdir(workdir.name)
+        self.addCleanup(os.chdir, cwd)
+        for name, value in {
+            'PRINT_API_RESPONSE_SUMMARY': True,
+            'API_DISK_CACHE': False,
+            'DATA_CACHE_STORE': 'file',
+            'DATA_CACHE_FORMAT': 'json',
+        }.items():
+            patcher = mock.patch.object(settings, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.api = Vultr('test-token')
+        self.addCleanup(self.api.close)
+        self.api.base_url = vultr_url(self.server)
+
+    def test_refresh_prints_nothing(self):
+        region_id = self.server.dataset.regions[0]['id']
+        data.create_data_cache('vultr_regions.json', {'regions': [{'id': region_id, 'city': 'Stale'}], 'meta': {}}, ttl=60)
+        os.utime(data.cache_path('vultr_regions.json'), (0, 0)) # Checked long ago, so stale
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            region = Region(self.api)
+            self.assertEqual(region.city_from_id(region_id), 'Stale') # Served stale, refreshing in the background
+            deadline = time.monotonic() + 10
+            while region.city_from_id(region_id) == 'Stale' and time.monotonic() < deadline:
+                time.sleep(0.01)
+            while data.refreshing and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        self.assertEqual(region.city_from_id(region_id), self.server.dataset.regions[0]['city'])
+        self.assertEqual(output.getvalue(), '')
+
+    def test_refresh_finishing_first_is_kept(self):
+        region_id = self.server.dataset.regions[0]['id']
+        data.create_data_cache('vultr_regions.json', {'regions': [{'id': region_id, 'city': 'Stale'}], 'meta': {}}, ttl=60)
+        os.utime(data.cache_path('vultr_regions.json'), (0, 0)) # Checked long ago, so stale
+
+        # Migrated to msgpack on load, and refreshed before the background thread could even yield
+        with mock.patch.object(settings, 'DATA_CACHE_FORMAT', 'msgpack'), \
+                mock.patch.object(data, 'refresh_data_cache', lambda file_name, refresh: refresh()):
+            region = Region(self.api)
+            region.city_from_id(region_id)
+
+        self.assertEqual(region.city_from_id(region_id), self.server.dataset.regions[0]['city'])
+
+    def test_foreground_save_still_prints(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            Region(self.api)
+        self.assertIn('URL:', output.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
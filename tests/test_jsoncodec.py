@@ -0,0 +1,35 @@
+import unittest
+from unittest import mock
+import jsoncodec
+
+class JsonCodecTest(unittest.TestCase):
+    def backends(self):
+        """
+        Yields inside each available backend in turn.
+        """
+        with mock.patch.object(jsoncodec, 'orjson', None):
+            yield 'json'
+        if jsoncodec.orjson is not None:
+            yield 'orjson'
+
+    def test_round_trip(self):
+        document = {'plans': [{'id': 'vc2-1c-1gb', 'monthly_cost': 5.0, 'locations': ['ewr']}], 'name': 'é中'}
+        for backend in self.backends():
+            with self.subTest(backend=backend):
+                self.assertEqual(jsoncodec.loads(jsoncodec.dumps(document)), document)
+                self.assertEqual(jsoncodec.loads(memoryview(jsoncodec.dumps(document, indent=True))), document)
+
+    def test_invalid_utf8_is_a_decode_error(self):
+        for backend in self.backends():
+            with self.subTest(backend=backend):
+                with self.assertRaises(jsoncodec.JSONDecodeError):
+                    jsoncodec.loads(b'{"name": "\xff\xfe"}')
+
+    def test_empty_is_a_decode_error(self):
+        for backend in self.backends():
+            with self.subTest(backend=backend):
+                with self.assertRaises(jsoncodec.JSONDecodeError):
+                    jsoncodec.loads(b'')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import json
+import unittest
+from api.jsonstream import JsonArrayStream
+
+def splits(document):
+    """
+    Yields `document` as two chunks, split at every position.
+    """
+    encoded = document.encode('utf-8')
+    for i in range(len(encoded) + 1):
+        yield [encoded[:i], encoded[i:]]
+
+class JsonArrayStreamTest(unittest.TestCase):
+    ITEMS = {
+        'objects': [{'id': 'a', 'tags': ['x', 'y'], 'n': 1}, {'id': 'b', 'nested': {'k': [1, 2]}}],
+        'numbers': [1.5, -2, 3e10, 4.25E-3, 0, 12345, -0.5, 6e+2],
+        'strings': ['plain', 'esc"aped\\', 'unicode é中', ''],
+        'literals': [True, False, None, True],
+    }
+
+    def test_every_chunk_split(self):
+        for name, items in self.ITEMS.items():
+            document = json.dumps({'instances': items, 'meta': {'total': len(items)}}, ensure_ascii=False)
+            for chunks in splits(document):
+                with self.subTest(items=name, chunks=chunks):
+                    stream = JsonArrayStream(chunks, 'instances')
+                    self.assertEqual(list(stream), items)
+                    self.assertEqual(stream.envelope, {'instances': [], 'meta': {'total': len(items)}})
+
+    def test_number_split_after_decimal_point(self):
+        self.assertEqual(list(JsonArrayStream([b'{"instances": [1.', b'5]}'], 'instances')), [1.5])
+
+    def test_number_split_after_exponent(self):
+        self.assertEqual(list(JsonArrayStream([b'{"instances": [2e', b'+', b'3]}'], 'instances')), [2000.0])
+
+    def test_invalid_number_still_fails(self):
+        with self.assertRaises(json.JSONDecodeError):
+            list(JsonArrayStream([b'{"instances": [1.', b']}'], 'instances'))
+
+    def test_missing_key(self):
+        stream = JsonArrayStream([b'{"meta": ', b'{"total": 0}}'], 'instances')
+        self.assertEqual(list(stream), [])
+        self.assertEqual(stream.envelope, {'meta': {'total': 0}})
+
+if __name__ == '__main__':
+    unittest.main()
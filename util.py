@@ -406,3 +406,75 @@ def red_text(text):
 def blue_text(text):
     """Wraps text in blue ANSI color codes."""
     return f'{Fore.BLUE}{text}{Style.RESET_ALL}'
+
+SETTING_DEFAULTS = {
+    'API_POOL_CONNECTIONS': 4,
+    'API_POOL_MAXSIZE': 10,
+    'API_POOL_BLOCK': False,
+    'API_KEEP_ALIVE': True,
+    'API_ACCEPT_ENCODING': None,
+    'CLOUDFLARE_PAGE_WORKERS': 8,
+    'API_RATE_LIMITS': {
+        'vultr': {'rate': 30, 'burst': 30},
+        'cloudflare': {'rate': 4, 'burst': 50},
+    },
+    'API_RETRY': {
+        'max_attempts': 4,
+        'backoff_base': 0.5,
+        'backoff_max': 30,
+        'statuses': [429, 502, 503, 504],
+    },
+    'API_CIRCUIT_BREAKER': {
+        'failure_threshold': 5,
+        'reset_timeout': 30,
+        'half_open_max_calls': 1,
+    },
+    'ASYNC_API_CONNECTION_LIMIT': 100,
+    'DATA_CACHE_TTLS': {
+        'vultr_plans.json': 86400,
+        'vultr_regions.json': 604800,
+        'vultr_os.json': 604800,
+        'vultr_applications.json': 604800,
+    },
+    'DATA_CACHE_FORMAT': 'json',
+    'DATA_CACHE_STORE': 'file',
+    'API_DISK_CACHE': True,
+    'API_DISK_CACHE_DIR': './data/http_cache',
+    'API_DISK_CACHE_PATTERNS': [r'^plans$', r'^regions$', r'^os$', r'^applications$', r'^firewalls$', r'^zones$'],
+    'API_MEMORY_CACHE_SIZE': 256,
+    'API_MEMORY_CACHE_TTLS': {
+        r'^zones/[^/]+/dns_records': 60,
+        r'^zones': 300,
+        r'^instances': 30,
+        r'^firewalls': 60,
+        r'^snapshots': 30,
+        r'^(plans|regions|os|applications)$': 3600,
+    },
+    'API_BATCH_WORKERS': 8,
+    'API_METRICS_PROMETHEUS_FILE': None,
+    'API_METRICS_JSON_FILE': None,
+    'TRACE_ENABLED': False,
+    'TRACE_FILE': './data/trace.jsonl',
+    'TRACE_FORMAT': 'jsonl',
+    'API_TIMEOUTS': {
+        'default': {'connect': 5, 'read': 30},
+        'vultr': {'connect': 5, 'read': 30},
+        'cloudflare': {'connect': 5, 'read': 30},
+        'ipify': {'connect': 3, 'read': 5},
+    },
+    'OPERATION_DEADLINE': 120,
+    'API_TRANSPORT_MODE': 'live',
+    'API_CASSETTE_FILE': './data/cassette.jsonl',
+    'API_REPLAY_LATENCY_SCALE': 0.0,
+}
+
+def apply_setting_defaults():
+    """
+    Sets a default value for every optional setting missing from settings.py.
+
+    Optional settings only tune how the API clients behave, so they are filled in
+    silently instead of warning like the required settings do in main.py.
+    """
+    for name, value in SETTING_DEFAULTS.items():
+        if not hasattr(settings, name):
+            setattr(settings, name, value)